@@ -0,0 +1,143 @@
+"""
+Adaptive TDEE from weight and intake logs.
+
+Per-user state is a few EWMAs (trend weight, daily trend slope, intake)
+advanced one logged day at a time; energy balance then gives
+
+    estimate = avg_intake - trend_slope * KCAL_PER_KG
+
+Every logged day leaves a row in tdee_checkpoints, so a write on day D
+resumes from the last checkpoint before D and replays only D..latest.
+Logging today is the same replay with a single day in it. The latest state
+is mirrored onto users (adaptive_tdee, weight_trend_kg, adaptive_tdee_on),
+so reading it costs nothing beyond the User row.
+"""
+from datetime import date
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.models.log import IntakeLog, TdeeCheckpoint, WeightLog
+from app.models.user import User
+
+# energy stored in a kilogram of body mass (mixed tissue)
+KCAL_PER_KG = 7700.0
+
+
+def _alpha(base: float, gap_days: int) -> float:
+    # skipped days still count: n daily steps with no new information
+    return 1.0 - (1.0 - base) ** max(1, gap_days)
+
+
+class TdeeState:
+    __slots__ = ("day", "trend_weight", "trend_slope", "avg_intake", "weight_days", "intake_days")
+
+    def __init__(
+        self,
+        day: date | None = None,
+        trend_weight: float | None = None,
+        trend_slope: float | None = None,
+        avg_intake: float | None = None,
+        weight_days: int = 0,
+        intake_days: int = 0,
+    ):
+        self.day = day
+        self.trend_weight = trend_weight
+        self.trend_slope = trend_slope
+        self.avg_intake = avg_intake
+        self.weight_days = weight_days
+        self.intake_days = intake_days
+
+    @classmethod
+    def from_checkpoint(cls, cp: TdeeCheckpoint) -> "TdeeState":
+        return cls(cp.day, cp.trend_weight, cp.trend_slope, cp.avg_intake, cp.weight_days, cp.intake_days)
+
+    @property
+    def estimate(self) -> float | None:
+        if self.trend_slope is None or self.avg_intake is None:
+            return None
+        if min(self.weight_days, self.intake_days) < settings.ADAPTIVE_TDEE_MIN_DAYS:
+            return None
+        return self.avg_intake - self.trend_slope * KCAL_PER_KG
+
+    def step(self, day: date, weight_kg: float | None, kcal: float | None) -> "TdeeState":
+        """State after folding in one logged day (either value may be missing)."""
+        gap = (day - self.day).days if self.day else 1
+        nxt = TdeeState(day, self.trend_weight, self.trend_slope, self.avg_intake, self.weight_days, self.intake_days)
+
+        if weight_kg is not None:
+            nxt.weight_days += 1
+            if nxt.trend_weight is None:
+                nxt.trend_weight = weight_kg
+            else:
+                trend = nxt.trend_weight + _alpha(settings.ADAPTIVE_WEIGHT_ALPHA, gap) * (weight_kg - nxt.trend_weight)
+                daily = (trend - nxt.trend_weight) / max(1, gap)
+                if nxt.trend_slope is None:
+                    nxt.trend_slope = daily
+                else:
+                    nxt.trend_slope += _alpha(settings.ADAPTIVE_SLOPE_ALPHA, gap) * (daily - nxt.trend_slope)
+                nxt.trend_weight = trend
+
+        if kcal is not None:
+            nxt.intake_days += 1
+            if nxt.avg_intake is None:
+                nxt.avg_intake = float(kcal)
+            else:
+                nxt.avg_intake += settings.ADAPTIVE_INTAKE_ALPHA * (kcal - nxt.avg_intake)
+
+        return nxt
+
+    def as_row(self, user_id: int) -> dict:
+        return {
+            "user_id": user_id,
+            "day": self.day,
+            "trend_weight": self.trend_weight,
+            "trend_slope": self.trend_slope,
+            "avg_intake": self.avg_intake,
+            "weight_days": self.weight_days,
+            "intake_days": self.intake_days,
+            "estimate": self.estimate,
+        }
+
+
+def replay_from(db: Session, user_id: int, since: date) -> TdeeState:
+    """
+    Recompute the user's state from `since` forward after a log write on that
+    day (new entry, backfill, edit or delete). Work is bounded by the number
+    of logged days >= since. Doesn't commit.
+    """
+    # one recompute per user at a time; concurrent writers queue on the row lock
+    db.execute(select(User.id).where(User.id == user_id).with_for_update())
+
+    prev = db.execute(
+        select(TdeeCheckpoint)
+        .where(TdeeCheckpoint.user_id == user_id, TdeeCheckpoint.day < since)
+        .order_by(TdeeCheckpoint.day.desc())
+        .limit(1)
+    ).scalar_one_or_none()
+    state = TdeeState.from_checkpoint(prev) if prev is not None else TdeeState()
+
+    weights = dict(db.execute(
+        select(WeightLog.logged_on, WeightLog.weight_kg)
+        .where(WeightLog.user_id == user_id, WeightLog.logged_on >= since)
+    ).all())
+    intakes = dict(db.execute(
+        select(IntakeLog.logged_on, IntakeLog.kcal)
+        .where(IntakeLog.user_id == user_id, IntakeLog.logged_on >= since)
+    ).all())
+
+    rows = []
+    for day in sorted(weights.keys() | intakes.keys()):
+        state = state.step(day, weights.get(day), intakes.get(day))
+        rows.append(state.as_row(user_id))
+
+    db.execute(delete(TdeeCheckpoint).where(TdeeCheckpoint.user_id == user_id, TdeeCheckpoint.day >= since))
+    if rows:
+        db.execute(insert(TdeeCheckpoint), rows)
+    db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(adaptive_tdee=state.estimate, weight_trend_kg=state.trend_weight, adaptive_tdee_on=state.day)
+    )
+    return state
@@ -0,0 +1,55 @@
+import logging
+import threading
+from typing import Callable
+
+log = logging.getLogger(__name__)
+
+
+class PeriodicWorker:
+    """
+    Runs fn() on a daemon thread every `interval` seconds, or sooner when
+    wake() is called. With run_on_stop, stop() runs fn() one last time so
+    buffered work isn't lost on shutdown.
+    """
+
+    def __init__(self, name: str, interval: float, fn: Callable[[], object], *, run_on_stop: bool = True):
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self.run_on_stop = run_on_stop
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        if self.run_on_stop:
+            self._run_once()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            self._run_once()
+
+    def _run_once(self) -> None:
+        try:
+            self.fn()
+        except Exception:
+            log.exception("background task %s failed", self.name)
@@ -1,14 +1,108 @@
+import threading
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from app.core.db_stats import instrument
+from app.core.metrics import watch_pool
 from app.core.settings import settings
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Engines are created on first use (the app's lifespan does it at startup),
+# not on import: importing models or the app stays cheap, and the pool is
+# sized from settings as they are when the worker starts.
+_engine: Engine | None = None
+_async_engine = None
+_lock = threading.Lock()
+
+
+class _LazySessionmaker(sessionmaker):
+    def __call__(self, **local_kw):
+        if _engine is None:
+            get_engine()  # binds this factory
+        return super().__call__(**local_kw)
+
+
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False)
 Base = declarative_base()
 
+
+def get_engine() -> Engine:
+    global _engine
+    if _engine is not None:
+        return _engine
+    with _lock:
+        if _engine is None:
+            _engine = create_engine(
+                settings.DATABASE_URL,
+                pool_pre_ping=True,
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+            )
+            instrument(_engine)
+            watch_pool(_engine, "sync")
+            SessionLocal.configure(bind=_engine)
+        return _engine
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+# Optional asyncio engine (DB_MODE=async). Requires asyncpg.
+AsyncSessionLocal = None
+
+def _async_url(url: str) -> str:
+    scheme, rest = url.split("://", 1)
+    return f"{scheme.split('+')[0]}+asyncpg://{rest}"
+
+def get_async_engine():
+    """The asyncpg engine, or None unless DB_MODE=async."""
+    global _async_engine, AsyncSessionLocal
+    if settings.DB_MODE != "async":
+        return None
+    if _async_engine is not None:
+        return _async_engine
+    with _lock:
+        if _async_engine is None:
+            from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+            _async_engine = create_async_engine(
+                _async_url(settings.DATABASE_URL),
+                pool_pre_ping=True,
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+            )
+            instrument(_async_engine.sync_engine)
+            watch_pool(_async_engine.sync_engine, "async")
+            AsyncSessionLocal = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+        return _async_engine
+
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        get_async_engine()
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def dispose_engines() -> None:
+    """Close both pools; the next use creates fresh engines (e.g. a second create_app() in tests)."""
+    global _engine, _async_engine, AsyncSessionLocal
+    with _lock:
+        engine, _engine = _engine, None
+        async_engine, _async_engine = _async_engine, None
+        AsyncSessionLocal = None
+    if engine is not None:
+        engine.dispose()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+def __getattr__(name: str):
+    # `from app.core.database import engine` still works; it just creates the engine
+    if name == "engine":
+        return get_engine()
+    if name == "async_engine":
+        return get_async_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,206 @@
+"""
+Per-request database instrumentation.
+
+instrument(engine) hooks cursor execution, commits and rollbacks on an
+engine (app.core.database does this for both engines). While a request
+runs, DbStatsMiddleware keeps a QueryStats in a context variable, which is
+copied into the threadpool and into SQLAlchemy's async greenlets, so every
+statement the request causes lands in it: query count, time spent in the
+driver, commits, and how often each statement shape ran. Statements from
+background workers have no request and aren't counted.
+
+A shape is the SQL text with IN-lists collapsed, so "the same SELECT once
+per row" (an N+1) shows up as one shape with a high count and gets logged
+once it reaches DB_STATS_REPEAT_WARN.
+
+With SERVER_TIMING_ENABLED, responses carry the numbers for browser
+devtools:
+
+    Server-Timing: db;dur=3.41;desc="4 queries, 1 commit", total;dur=9.87
+
+Budgets for tests and benchmarks:
+
+    with query_budget(3, commits=0):
+        client.get("/auth/me", headers=h)
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.settings import settings
+
+log = logging.getLogger(__name__)
+
+# "%(id_1_1)s, %(id_1_2)s, ..." (psycopg2) and "$3, $4, ..." (asyncpg) from expanding IN
+_PARAM_LIST = re.compile(r"(?:%\(\w+\)s|\$\d+)(?:\s*,\s*(?:%\(\w+\)s|\$\d+))+")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def statement_shape(statement: str) -> str:
+    return _PARAM_LIST.sub("...", _SPACE.sub(" ", statement).strip())
+
+
+class QueryStats:
+    """What one request did to the database."""
+
+    __slots__ = ("queries", "db_time", "commits", "rollbacks", "shapes", "started", "label")
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.queries = 0
+        self.db_time = 0.0  # seconds
+        self.commits = 0
+        self.rollbacks = 0
+        self.shapes: Counter[str] = Counter()
+        self.started = time.perf_counter()
+
+    def repeated(self, at_least: int = 2) -> list[tuple[str, int]]:
+        """Statement shapes run `at_least` times, most frequent first."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= at_least]
+
+    def server_timing(self) -> str:
+        total = (time.perf_counter() - self.started) * 1000
+        desc = (
+            f"{self.queries} {'query' if self.queries == 1 else 'queries'}, "
+            f"{self.commits} commit{'' if self.commits == 1 else 's'}"
+        )
+        return f'db;dur={self.db_time * 1000:.2f};desc="{desc}", total;dur={total:.2f}'
+
+    def report(self) -> str:
+        lines = [
+            f"{self.label or 'request'}: {self.queries} queries, {self.commits} commits, "
+            f"{self.rollbacks} rollbacks, {self.db_time * 1000:.2f} ms in the database"
+        ]
+        lines += [f"  {n}x {shape}" for shape, n in self.shapes.most_common()]
+        return "\n".join(lines)
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("db_stats", default=None)
+# query_budget() blocks currently collecting finished requests
+_collectors: list[list[QueryStats]] = []
+
+
+def current() -> QueryStats | None:
+    return _current.get()
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        context._db_stats_start = time.perf_counter()
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    start = getattr(context, "_db_stats_start", None)
+    if stats is None or start is None:
+        return
+    stats.db_time += time.perf_counter() - start
+    stats.queries += 1
+    stats.shapes[statement_shape(statement)] += 1
+
+
+def _on_commit(conn):
+    stats = _current.get()
+    if stats is not None:
+        stats.commits += 1
+
+
+def _on_rollback(conn):
+    stats = _current.get()
+    if stats is not None:
+        stats.rollbacks += 1
+
+
+def instrument(engine: Engine) -> None:
+    """Count this engine's statements into the current request's QueryStats."""
+    if not settings.DB_STATS_ENABLED:
+        return
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    event.listen(engine, "after_cursor_execute", _after_execute)
+    event.listen(engine, "commit", _on_commit)
+    event.listen(engine, "rollback", _on_rollback)
+
+
+class DbStatsMiddleware:
+    """
+    Pure ASGI middleware (no extra task per request, unlike BaseHTTPMiddleware)
+    that opens a QueryStats per HTTP request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.DB_STATS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(f"{scope['method']} {scope['path']}")
+        token = _current.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and settings.SERVER_TIMING_ENABLED:
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            _finish(stats)
+
+
+def _finish(stats: QueryStats) -> None:
+    threshold = settings.DB_STATS_REPEAT_WARN
+    if threshold > 0:
+        for shape, n in stats.repeated(threshold):
+            log.warning("%s ran the same statement %s times (N+1?): %.300s", stats.label, n, shape)
+    for collected in _collectors:
+        collected.append(stats)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(queries: int, *, commits: int | None = None, repeats: int | None = None):
+    """
+    Fail with QueryBudgetExceeded if any request made inside the block ran
+    more than `queries` statements, more than `commits` commits, or one
+    statement shape more than `repeats` times. Yields the list of QueryStats
+    collected, one per request, for finer assertions.
+
+    Works with TestClient and against a live app in the same process; the
+    app must have DbStatsMiddleware and DB_STATS_ENABLED on.
+    """
+    collected: list[QueryStats] = []
+    _collectors.append(collected)
+    try:
+        yield collected
+    finally:
+        _collectors.remove(collected)
+
+    failures = []
+    for stats in collected:
+        over = []
+        if stats.queries > queries:
+            over.append(f"{stats.queries} queries > {queries}")
+        if commits is not None and stats.commits > commits:
+            over.append(f"{stats.commits} commits > {commits}")
+        if repeats is not None and stats.shapes and max(stats.shapes.values()) > repeats:
+            over.append(f"a statement repeated {max(stats.shapes.values())} times > {repeats}")
+        if over:
+            failures.append(f"over budget ({'; '.join(over)})\n{stats.report()}")
+    if failures:
+        raise QueryBudgetExceeded("\n\n".join(failures))
@@ -1,11 +1,14 @@
-from datetime import datetime, timezone
-
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session as OrmSession
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session as OrmSession, make_transient_to_detached
 
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 from app.core.jwt_utils import decode_token
+from app.core.last_seen import last_seen_buffer
+from app.core.revocations import revocations
+from app.core.session_cache import session_cache, snapshot_user, user_from_snapshot
 from app.core.settings import settings
 from app.models.user import User
 from app.models.session import Session as SessionModel
@@ -14,11 +17,11 @@ from app.models.session import Session as SessionModel
 bearer_scheme = HTTPBearer(auto_error=False)
 
 
-def get_current_user(
+def _access_claims(
     request: Request,
-    creds: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
-    db: OrmSession = Depends(get_db),
-) -> User:
+    creds: HTTPAuthorizationCredentials | None,
+) -> tuple[int, str, int | None]:
+    """Pull (user_id, jti, iat) out of a valid access token, or raise 401."""
     token: str | None = None
 
     # 1) Prefer Authorization header if present
@@ -59,13 +62,6 @@ def get_current_user(
             detail="Invalid subject in token",
         )
 
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-        )
-
     jti = payload.get("jti")
     if not jti:
         # For our access tokens, we *expect* a JTI now
@@ -74,6 +70,63 @@ def get_current_user(
             detail="Session missing or invalid",
         )
 
+    return user_id, jti, payload.get("iat")
+
+
+def _revocation_check(user_id: int, jti: str, iat: int | None) -> bool | None:
+    # True: not revoked as of the last poll; False: may be revoked; None: no
+    # opinion, the feed isn't running or is stale (see app.core.revocations)
+    return revocations.check(user_id, jti, iat)
+
+
+def _session_revoked(user_id: int, jti: str) -> HTTPException:
+    session_cache.invalidate(user_id, jti)
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Session invalid or expired",
+    )
+
+
+def _user_stub(user_id: int) -> User:
+    # only the id; merged with load=False, the other columns load if a route reads them
+    user = User(id=user_id)
+    make_transient_to_detached(user)
+    return user
+
+
+def get_current_user(
+    request: Request,
+    creds: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+    db: OrmSession = Depends(get_db),
+) -> User:
+    user_id, jti, iat = _access_claims(request, creds)
+    clear = _revocation_check(user_id, jti, iat)
+
+    # a possibly revoked token skips the cache and gets the full check
+    snapshot = session_cache.get(user_id, jti) if clear is not False else None
+    if snapshot is not None:
+        # Cached: no User SELECT. Revocations from other workers reach this one
+        # through the revocation feed; without a fresh feed, check the session
+        # row still exists (one indexed SELECT).
+        if clear is None and db.query(SessionModel.id).filter(SessionModel.jti == jti).first() is None:
+            raise _session_revoked(user_id, jti)
+        last_seen_buffer.touch(jti)
+        request.state.token_jti = jti
+        return db.merge(user_from_snapshot(snapshot), load=False)
+
+    if clear and settings.AUTH_STATELESS:
+        # Stateless: signed, unexpired and not revoked, so no SELECTs either
+        last_seen_buffer.touch(jti)
+        request.state.token_jti = jti
+        return db.merge(_user_stub(user_id), load=False)
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+        )
+
     # Enforce that this JTI corresponds to a valid session
     session_row = (
         db.query(SessionModel)
@@ -89,12 +142,64 @@ def get_current_user(
             detail="Session invalid or expired",
         )
 
-    # Update last_seen_at
-    session_row.last_seen_at = datetime.now(timezone.utc)
-    db.add(session_row)
-    db.commit()
+    session_cache.put(user.id, jti, snapshot_user(user))
+
+    # last_seen_at is written behind in batches, not per request
+    last_seen_buffer.touch(jti)
 
     # Expose JTI for downstream routes (/auth/sessions, /auth/logout, /auth/logout-all)
     request.state.token_jti = jti
 
     return user
+
+
+async def get_current_user_async(
+    request: Request,
+    creds: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    """Same checks as get_current_user, for routes on the asyncio engine."""
+    user_id, jti, iat = _access_claims(request, creds)
+    clear = _revocation_check(user_id, jti, iat)
+
+    snapshot = session_cache.get(user_id, jti) if clear is not False else None
+    if snapshot is not None:
+        if clear is None:
+            found = (await db.execute(select(SessionModel.id).where(SessionModel.jti == jti))).first()
+            if found is None:
+                raise _session_revoked(user_id, jti)
+        last_seen_buffer.touch(jti)
+        request.state.token_jti = jti
+        return await db.merge(user_from_snapshot(snapshot), load=False)
+
+    clear = clear and settings.AUTH_STATELESS
+
+    user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+        )
+
+    # Stateless: no session lookup. The user row is still loaded (and cached
+    # below), since attributes can't lazy-load on an AsyncSession.
+    if not clear:
+        session_id = (
+            await db.execute(
+                select(SessionModel.id).where(
+                    SessionModel.user_id == user.id,
+                    SessionModel.jti == jti,
+                )
+            )
+        ).scalar_one_or_none()
+        if session_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Session invalid or expired",
+            )
+
+    session_cache.put(user.id, jti, snapshot_user(user))
+    last_seen_buffer.touch(jti)
+    request.state.token_jti = jti
+
+    return user
@@ -0,0 +1,115 @@
+import logging
+import random
+import smtplib
+import threading
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from app.core.background import PeriodicWorker
+from app.core.database import SessionLocal
+from app.core.emailer import SmtpConnection, connection_lost
+from app.core.settings import settings
+from app.models.outbox import EmailOutbox
+
+log = logging.getLogger(__name__)
+
+MAX_BACKOFF_SECONDS = 3600
+
+
+class EmailDispatcher:
+    """
+    Drains email_outbox in batches over one persistent SMTP connection.
+
+    Rows are claimed with FOR UPDATE SKIP LOCKED, so several workers can run
+    a dispatcher without double-sending. Failed sends are retried with
+    exponential backoff until EMAIL_MAX_ATTEMPTS, then marked "failed".
+    """
+
+    def __init__(self, interval: float, batch_size: int, max_attempts: int, retry_base: float):
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self._smtp = SmtpConnection()
+        self._lock = threading.Lock()  # one drain at a time per process
+        # rows are durable, nothing to flush on shutdown
+        self._worker = PeriodicWorker("email-dispatcher", interval, self.drain, run_on_stop=False)
+
+    def _backoff(self, attempts: int) -> timedelta:
+        delay = min(self.retry_base * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS)
+        return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+    def _send_batch(self) -> tuple[int, bool]:
+        """Send one batch; returns (rows processed, whether the server is reachable)."""
+        now = datetime.now(timezone.utc)
+        with SessionLocal() as db:
+            rows = db.execute(
+                select(EmailOutbox)
+                .where(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now)
+                .order_by(EmailOutbox.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            ).scalars().all()
+
+            reachable = True
+            for row in rows:
+                try:
+                    self._smtp.send(row.to_addr, row.subject, row.html)
+                except (smtplib.SMTPException, OSError) as exc:
+                    # a rejected message only costs this row; a dead connection
+                    # also leaves the rest of the batch for the next tick
+                    reachable = not connection_lost(exc)
+                    row.attempts += 1
+                    row.last_error = f"{type(exc).__name__}: {exc}"[:1000]
+                    if row.attempts >= self.max_attempts:
+                        row.status = "failed"
+                        log.error("giving up on outbox email %s after %s attempts", row.id, row.attempts)
+                    else:
+                        row.next_attempt_at = now + self._backoff(row.attempts)
+                    if not reachable:
+                        break
+                    continue
+                row.status = "sent"
+                row.sent_at = datetime.now(timezone.utc)
+                row.attempts += 1
+
+            db.commit()
+            return len(rows), reachable
+
+    def drain(self) -> int:
+        """Send everything that is due; returns the number of rows processed."""
+        with self._lock:
+            total = 0
+            while True:
+                n, reachable = self._send_batch()
+                total += n
+                if n < self.batch_size or not reachable:
+                    return total
+
+    def wake(self) -> None:
+        self._worker.wake()
+
+    def start(self) -> None:
+        self._worker.start()
+
+    def stop(self) -> None:
+        self._worker.stop()
+        self._smtp.close()
+
+
+email_dispatcher = EmailDispatcher(
+    interval=settings.EMAIL_POLL_SECONDS,
+    batch_size=settings.EMAIL_BATCH_SIZE,
+    max_attempts=settings.EMAIL_MAX_ATTEMPTS,
+    retry_base=settings.EMAIL_RETRY_BASE_SECONDS,
+)
+
+
+if __name__ == "__main__":
+    # One-shot drain, e.g. against the mailpit service in docker-compose:
+    #   SMTP_HOST=localhost SMTP_PORT=1025 python -m app.core.email_dispatcher
+    logging.basicConfig(level=logging.INFO)
+    try:
+        log.info("processed %s outbox rows", email_dispatcher.drain())
+    finally:
+        email_dispatcher.stop()
@@ -1,23 +1,97 @@
 import smtplib
+import time
 from email.message import EmailMessage
-import os
 
-SMTP_HOST = os.getenv("SMTP_HOST", "localhost")
-SMTP_PORT = int(os.getenv("SMTP_PORT", "1025"))
-SMTP_USER = os.getenv("SMTP_USER", "")
-SMTP_PASS = os.getenv("SMTP_PASS", "")
-EMAIL_FROM = os.getenv("EMAIL_FROM", "FitDojo <noreply@fitdojo.local>")
+from sqlalchemy.orm import Session as OrmSession
 
-def send_email(to: str, subject: str, html: str):
+from app.core.settings import settings
+from app.models.outbox import EmailOutbox
+
+
+def build_message(to: str, subject: str, html: str) -> EmailMessage:
     msg = EmailMessage()
-    msg["From"] = EMAIL_FROM
+    msg["From"] = settings.EMAIL_FROM
     msg["To"] = to
     msg["Subject"] = subject
     msg.set_content("HTML required")
     msg.add_alternative(html, subtype="html")
+    return msg
 
-    with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as s:
-        if SMTP_USER and SMTP_PASS:
+def send_email(to: str, subject: str, html: str):
+    # one-off send on a fresh connection; request handlers use queue_email()
+    with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT) as s:
+        if settings.SMTP_USER and settings.SMTP_PASS:
             s.starttls()
-            s.login(SMTP_USER, SMTP_PASS)
-        s.send_message(msg)
+            s.login(settings.SMTP_USER, settings.SMTP_PASS)
+        s.send_message(build_message(to, subject, html))
+
+def queue_email(db: OrmSession, to: str, subject: str, html: str) -> EmailOutbox:
+    """
+    Add a message to the outbox. Nothing is sent here: the row is committed
+    with the caller's transaction and delivered by the email dispatcher.
+    """
+    row = EmailOutbox(to_addr=to, subject=subject, html=html)
+    db.add(row)
+    return row
+
+
+def connection_lost(exc: Exception) -> bool:
+    """
+    Whether a send failed because the server is unreachable (rather than
+    rejecting this one message). SMTPException subclasses OSError, so test
+    for it explicitly.
+    """
+    if isinstance(exc, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    return isinstance(exc, OSError) and not isinstance(exc, smtplib.SMTPException)
+
+
+class SmtpConnection:
+    """
+    A reusable SMTP connection (STARTTLS + login done once), reopened lazily
+    after errors or when it has been idle for SMTP_IDLE_SECONDS.
+    """
+
+    def __init__(self):
+        self._smtp: smtplib.SMTP | None = None
+        self._last_used = 0.0
+
+    def _connect(self) -> smtplib.SMTP:
+        s = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT)
+        if settings.SMTP_USER and settings.SMTP_PASS:
+            s.starttls()
+            s.login(settings.SMTP_USER, settings.SMTP_PASS)
+        return s
+
+    def _alive(self) -> bool:
+        if self._smtp is None:
+            return False
+        if time.monotonic() - self._last_used < settings.SMTP_IDLE_SECONDS:
+            return True
+        try:
+            return self._smtp.noop()[0] == 250
+        except smtplib.SMTPException:
+            return False
+        except OSError:
+            return False
+
+    def send(self, to: str, subject: str, html: str) -> None:
+        if not self._alive():
+            self.close()
+            self._smtp = self._connect()
+        try:
+            self._smtp.send_message(build_message(to, subject, html))
+        except OSError as exc:
+            # connection is gone: the next send reconnects; a rejected message keeps it
+            if connection_lost(exc):
+                self.close()
+            raise
+        self._last_used = time.monotonic()
+
+    def close(self) -> None:
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
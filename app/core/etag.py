@@ -0,0 +1,46 @@
+"""
+Conditional GETs for endpoints the PWA polls (/auth/me, /auth/sessions, /users/).
+
+Each route builds a weak ETag from a few version columns it already has or
+can aggregate in one small query (updated_at, change_seq, ids), never from
+the serialized body, and asks not_modified() before doing the expensive
+part. A match answers 304 with no body; otherwise the validators are set on
+the normal response. Cache-Control makes the service worker revalidate
+every time instead of serving a stale copy.
+"""
+import hashlib
+
+from fastapi import Request, Response
+
+from app.core.settings import settings
+
+# responses depend on who is asking
+_VARY = "Authorization, Cookie"
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag over the repr of `parts` (ints, strings, datetimes, tuples of those)."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # weak comparison (RFC 9110 13.1.2): the W/ prefix doesn't matter
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Response | None:
+    """
+    A 304 for the route to return when the client already has `etag`, else
+    None after putting the validators on `response`.
+    """
+    headers = {"ETag": etag, "Cache-Control": settings.HTTP_CACHE_CONTROL, "Vary": _VARY}
+    if _matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
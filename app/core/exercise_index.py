@@ -0,0 +1,357 @@
+"""
+In-memory exercise search for autocomplete (GET /exercises/search).
+
+Every worker keeps the whole exercises table in memory, split per owner (the
+catalog, then one small index per user with custom exercises). A keystroke
+is answered from here without touching Postgres:
+
+- each owner index keeps, per field (name, aliases, muscle group), its
+  distinct words in a sorted list, so the words starting with a prefix are
+  a bisect plus a short scan; whole names are kept sorted the same way
+- a trigram inverted index finds entries containing the query anywhere
+  (what LIKE '%foo%' would find)
+- hits are ranked in tiers: exact name / alias / muscle group, name
+  prefix, every query word prefixing a word of the name, of the aliases,
+  of the muscle group, substring, then words spread over fields; inside a
+  tier the user's own exercises come before the catalog, then shorter
+  names first. Tiers are computed lazily, in order, until `limit` results
+  are found, so a typical keystroke never reaches the expensive ones
+
+Freshness: writes in this worker reach the index right after their commit
+(routes call upsert()/remove(), resolve_exercise_names() stages rows that an
+after_commit hook applies). A background poll picks up other workers' writes
+by updated_at, and reloads everything when the row count doesn't match,
+which is how deletes and missed rows are caught.
+"""
+import heapq
+import re
+import threading
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.core.background import PeriodicWorker
+from app.core.database import SessionLocal
+from app.core.settings import settings
+from app.models.workout import Exercise
+
+_WORD = re.compile(r"\w+")
+# commits can land with an updated_at a little older than the newest one already seen
+_LATE_COMMIT_SLACK = timedelta(seconds=60)
+# term fields, in ranking order
+NAME, ALIAS, MUSCLE = 0, 1, 2
+_CATALOG = 0
+INDEXED_COLUMNS = (Exercise.id, Exercise.user_id, Exercise.name, Exercise.aliases, Exercise.muscle_group, Exercise.updated_at)
+
+
+def normalize(text: str) -> str:
+    """Case-folded words joined by single spaces ("Pull-Up " -> "pull up")."""
+    return " ".join(_WORD.findall(text.casefold()))
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+@dataclass(slots=True)
+class IndexedExercise:
+    id: int
+    user_id: int | None
+    name: str
+    aliases: list[str]
+    muscle_group: str | None
+    updated_at: datetime | None
+    terms: list[tuple[int, str]] = field(default_factory=list)  # (field, normalized text); the name always comes first
+    order: tuple = ()  # tie-break inside a rank tier
+
+    @property
+    def custom(self) -> bool:
+        return self.user_id is not None
+
+    @classmethod
+    def from_row(cls, row) -> "IndexedExercise":
+        e = cls(row.id, row.user_id, row.name, list(row.aliases or ()), row.muscle_group, row.updated_at)
+        # kept even when empty (rows from before names were validated), so terms[0] is the name
+        e.terms.append((NAME, normalize(e.name)))
+        for fld, texts in ((ALIAS, e.aliases), (MUSCLE, [e.muscle_group or ""])):
+            for text in texts:
+                term = normalize(text)
+                if term:
+                    e.terms.append((fld, term))
+        e.order = (not e.custom, len(e.name), e.name.casefold(), e.id)
+        return e
+
+
+class _Words:
+    """Distinct words of one field in a sorted list, with the ids using each."""
+
+    def __init__(self):
+        self._words: list[str] = []
+        self._postings: dict[str, set[int]] = {}
+
+    def add(self, ex_id: int, words: Iterable[str]) -> None:
+        for w in words:
+            ids = self._postings.get(w)
+            if ids is None:
+                ids = self._postings[w] = set()
+                insort(self._words, w)
+            ids.add(ex_id)
+
+    def remove(self, ex_id: int, words: Iterable[str]) -> None:
+        for w in words:
+            ids = self._postings.get(w)
+            if ids is None:
+                continue
+            ids.discard(ex_id)
+            if not ids:
+                del self._postings[w]
+                del self._words[bisect_left(self._words, w)]
+
+    def prefixed(self, prefix: str) -> set[int]:
+        out: set[int] = set()
+        words = self._words
+        i = bisect_left(words, prefix)
+        while i < len(words) and words[i].startswith(prefix):
+            out |= self._postings[words[i]]
+            i += 1
+        return out
+
+
+class _OwnerIndex:
+    """Per-field word and exact-term postings, sorted names and trigrams, for one owner's exercises."""
+
+    def __init__(self):
+        self.size = 0
+        self.names: set[str] = set()  # lowered, unique per owner like the table
+        self._words = (_Words(), _Words(), _Words())
+        self._exact: tuple[dict[str, set[int]], ...] = ({}, {}, {})
+        self._name_terms: list[tuple[str, int]] = []  # sorted, for whole-name prefixes
+        self._grams: dict[str, set[int]] = {}
+
+    def add(self, e: IndexedExercise) -> None:
+        self.size += 1
+        self.names.add(e.name.lower())
+        insort(self._name_terms, (e.terms[0][1], e.id))
+        for fld, term in e.terms:
+            self._words[fld].add(e.id, term.split())
+            self._exact[fld].setdefault(term, set()).add(e.id)
+            for g in _trigrams(term):
+                self._grams.setdefault(g, set()).add(e.id)
+
+    def remove(self, e: IndexedExercise) -> None:
+        self.size -= 1
+        self.names.discard(e.name.lower())
+        i = bisect_left(self._name_terms, (e.terms[0][1], e.id))
+        if i < len(self._name_terms) and self._name_terms[i][1] == e.id:
+            del self._name_terms[i]
+        for fld, term in e.terms:
+            self._words[fld].remove(e.id, term.split())
+            for postings, key in ((self._exact[fld], term), *((self._grams, g) for g in _trigrams(term))):
+                ids = postings.get(key)
+                if ids is not None:
+                    ids.discard(e.id)
+                    if not ids:
+                        del postings[key]
+
+    def exact(self, fld: int, query: str) -> set[int]:
+        return self._exact[fld].get(query, set())
+
+    def name_prefixed(self, query: str) -> list[int]:
+        terms = self._name_terms
+        i = bisect_left(terms, (query,))
+        out = []
+        while i < len(terms) and terms[i][0].startswith(query):
+            out.append(terms[i][1])
+            i += 1
+        return out
+
+    def words_in(self, fld: int | None, words: list[str]) -> set[int]:
+        """Ids where every query word prefixes a word of field `fld` (None: of any field)."""
+        fields = self._words if fld is None else (self._words[fld],)
+        ids: set[int] | None = None
+        # longest (likely rarest) word first keeps the intersections small
+        for w in sorted(words, key=len, reverse=True):
+            hits = set().union(*(f.prefixed(w) for f in fields))
+            ids = hits if ids is None else ids & hits
+            if not ids:
+                return set()
+        return ids or set()
+
+    def containing(self, query: str) -> set[int]:
+        """Candidate ids whose terms contain every trigram of `query` (to be verified)."""
+        ids: set[int] | None = None
+        for g in sorted(_trigrams(query), key=lambda g: len(self._grams.get(g, ()))):
+            hits = self._grams.get(g)
+            if not hits:
+                return set()
+            ids = set(hits) if ids is None else ids & hits
+            if not ids:
+                return set()
+        return ids or set()
+
+
+def _build(rows: Iterable) -> tuple[dict[int, IndexedExercise], dict[int, _OwnerIndex]]:
+    entries: dict[int, IndexedExercise] = {}
+    owners: dict[int, _OwnerIndex] = {}
+    for row in rows:
+        e = IndexedExercise.from_row(row)
+        entries[e.id] = e
+        key = e.user_id or _CATALOG
+        if key not in owners:
+            owners[key] = _OwnerIndex()
+        owners[key].add(e)
+    return entries, owners
+
+
+class ExerciseIndex:
+    def __init__(self, interval: float):
+        self._entries: dict[int, IndexedExercise] = {}
+        self._owners: dict[int, _OwnerIndex] = {}
+        self._lock = threading.Lock()
+        self._watermark: datetime | None = None
+        self.loaded = False
+        self._worker = PeriodicWorker("exercise-index-refresh", interval, self.refresh, run_on_stop=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ---------- writes ----------
+
+    def _add(self, e: IndexedExercise) -> None:
+        self._entries[e.id] = e
+        key = e.user_id or _CATALOG
+        if key not in self._owners:
+            self._owners[key] = _OwnerIndex()
+        self._owners[key].add(e)
+
+    def _drop(self, ex_id: int) -> None:
+        old = self._entries.pop(ex_id, None)
+        if old is None:
+            return
+        key = old.user_id or _CATALOG
+        owner = self._owners[key]
+        owner.remove(old)
+        if not owner.size and key != _CATALOG:
+            del self._owners[key]
+
+    def upsert(self, rows: Iterable) -> None:
+        """Add or replace exercises (ORM objects or rows with the indexed columns)."""
+        with self._lock:
+            for row in rows:
+                old = self._entries.get(row.id)
+                if old is not None and old.updated_at and row.updated_at and row.updated_at < old.updated_at:
+                    continue  # an older poll result racing a local write
+                self._drop(row.id)
+                self._add(IndexedExercise.from_row(row))
+
+    def remove(self, ids: Iterable[int]) -> None:
+        with self._lock:
+            for ex_id in ids:
+                self._drop(ex_id)
+
+    def stage(self, db: Session, rows: Iterable) -> None:
+        """Index `rows` once `db` commits (for helpers that don't commit themselves)."""
+        db.info.setdefault("exercise_index_pending", []).extend(rows)
+
+    # ---------- loading ----------
+
+    def load(self) -> int:
+        """(Re)build from the whole table; searches keep using the old index meanwhile."""
+        with SessionLocal() as db:
+            rows = db.execute(select(*INDEXED_COLUMNS)).all()
+        entries, owners = _build(rows)
+        with self._lock:
+            self._entries, self._owners = entries, owners
+            self._watermark = max((r.updated_at for r in rows), default=None)
+            self.loaded = True
+        return len(entries)
+
+    def refresh(self) -> int:
+        """Apply rows changed since the last look; reload when the counts disagree."""
+        if not self.loaded:
+            return self.load()
+        with SessionLocal() as db:
+            stmt = select(*INDEXED_COLUMNS)
+            if self._watermark is not None:
+                stmt = stmt.where(Exercise.updated_at > self._watermark - _LATE_COMMIT_SLACK)
+            changed = db.execute(stmt).all()
+            total = db.execute(select(func.count()).select_from(Exercise)).scalar_one()
+        self.upsert(changed)
+        with self._lock:
+            for r in changed:
+                if self._watermark is None or r.updated_at > self._watermark:
+                    self._watermark = r.updated_at
+            in_sync = len(self._entries) == total
+        if not in_sync:
+            return self.load()
+        return len(changed)
+
+    def start(self) -> None:
+        self._worker.start()
+
+    def stop(self) -> None:
+        self._worker.stop()
+
+    # ---------- reads ----------
+
+    def _tiers(self, o: _OwnerIndex, q: str, words: list[str]):
+        """Candidate ids of one owner, best tier first; an id may repeat in later tiers."""
+        for fld in (NAME, ALIAS, MUSCLE):
+            yield o.exact(fld, q)
+        yield o.name_prefixed(q)
+        for fld in (NAME, ALIAS, MUSCLE):
+            yield o.words_in(fld, words)
+        if len(q) >= 3:
+            # trigrams only narrow it down; check the substring for real
+            yield [i for i in o.containing(q) if any(q in term for _, term in self._entries[i].terms)]
+        else:
+            yield ()
+        yield o.words_in(None, words)
+
+    def search(self, user_id: int, query: str, limit: int) -> list[IndexedExercise]:
+        """Best `limit` catalog + own exercises for `query`; own ones shadow same-named catalog ones."""
+        q = normalize(query)
+        if not q:
+            return []
+        words = q.split()
+        out: list[IndexedExercise] = []
+        taken: set[int] = set()
+
+        def fill(ids: list[int]) -> bool:
+            # best of one tier by the static order, until `limit` is reached
+            fresh = [self._entries[i] for i in ids if i not in taken]
+            if own is not None:
+                fresh = [e for e in fresh if e.custom or e.name.lower() not in own.names]
+            for e in heapq.nsmallest(limit - len(out), fresh, key=lambda e: e.order):
+                out.append(e)
+                taken.add(e.id)
+            return len(out) >= limit
+
+        with self._lock:
+            own = self._owners.get(user_id)
+            owners = [o for o in (own, self._owners.get(_CATALOG)) if o is not None]
+            # generators run in lockstep, so a tier is only computed if the earlier ones fell short
+            for per_owner in zip(*(self._tiers(o, q, words) for o in owners)):
+                ids = [i for t in per_owner for i in t]
+                if ids and fill(ids):
+                    break
+        return out
+
+
+exercise_index = ExerciseIndex(interval=settings.EXERCISE_INDEX_REFRESH_SECONDS)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_staged(db: Session) -> None:
+    pending = db.info.pop("exercise_index_pending", None)
+    if pending:
+        exercise_index.upsert(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_staged(db: Session) -> None:
+    db.info.pop("exercise_index_pending", None)
@@ -0,0 +1,58 @@
+from typing import Iterable
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.exercise_index import INDEXED_COLUMNS, exercise_index, normalize
+from app.models.workout import Exercise
+
+
+def _visible(user_id: int):
+    return or_(Exercise.user_id == user_id, Exercise.user_id.is_(None))
+
+
+def resolve_exercise_names(db: Session, user_id: int, names: Iterable[str]) -> dict[str, int]:
+    """
+    Map exercise names (case-insensitive, keyed by the lowered name) to ids.
+    The user's own exercises shadow catalog ones; unknown names are created
+    as custom exercises for the user. Doesn't commit. Raises ValueError for
+    a name without a letter or digit, which search couldn't index.
+    """
+    wanted = {n.strip().lower(): n.strip() for n in names}
+    for name in wanted.values():
+        if not normalize(name):
+            raise ValueError(f"exercise name {name!r} has no letters or digits")
+    found: dict[str, int] = {}
+
+    def lookup(keys):
+        rows = db.execute(
+            select(Exercise.id, func.lower(Exercise.name), Exercise.user_id)
+            .where(func.lower(Exercise.name).in_(keys), _visible(user_id))
+        ).all()
+        for ex_id, key, owner in rows:
+            if key not in found or owner is not None:
+                found[key] = ex_id
+
+    if wanted:
+        lookup(list(wanted))
+    missing = [k for k in wanted if k not in found]
+    if missing:
+        # a concurrent upload may create the same names; DO NOTHING + re-read
+        created = db.execute(
+            insert(Exercise)
+            .values([{"user_id": user_id, "name": wanted[k]} for k in missing])
+            .on_conflict_do_nothing()
+            .returning(*INDEXED_COLUMNS)
+        ).all()
+        exercise_index.stage(db, created)
+        lookup(missing)
+    return found
+
+
+def visible_exercise_ids(db: Session, user_id: int, ids: Iterable[int]) -> set[int]:
+    """The subset of `ids` that exist and belong to the catalog or the user."""
+    ids = set(ids)
+    if not ids:
+        return set()
+    return set(db.execute(select(Exercise.id).where(Exercise.id.in_(ids), _visible(user_id))).scalars())
@@ -0,0 +1,372 @@
+"""
+Account export: everything a user has logged, as files.
+
+Each dataset is read through a server-side cursor (yield_per) and written
+EXPORT_BATCH_ROWS rows at a time, so memory stays flat however long the
+history is:
+
+- CSV, one file per dataset, optionally gzipped as it streams
+- Parquet (needs pyarrow), one row group per batch
+- "all": every dataset in one ZIP, written to an unseekable stream
+
+All datasets of an export are read in one REPEATABLE READ transaction, so
+they agree with each other. The same byte stream feeds an HTTP response
+(GET /export/{dataset}) or, for big accounts, a file on local disk written
+by ExportRunner (POST /export/jobs), downloadable with the job's token
+until it expires.
+
+EXPORT_DIR must be on the same host as the workers serving downloads.
+"""
+import csv
+import importlib.util
+import io
+import logging
+import os
+import secrets
+import threading
+import zipfile
+import zlib
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterator
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, Numeric, Select, and_, delete, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.background import PeriodicWorker
+from app.core.database import SessionLocal
+from app.core.replica import read_session
+from app.core.settings import settings
+from app.models.export import ExportJob
+from app.models.log import IntakeLog, WeightLog
+from app.models.session import Session as SessionModel
+from app.models.user import User
+from app.models.workout import Exercise, Workout, WorkoutSet
+
+log = logging.getLogger(__name__)
+
+
+def _profile(user_id: int) -> Select:
+    u = User
+    return select(
+        u.id, u.email, u.name, u.age, u.sex, u.height_cm, u.weight_kg, u.activity_level, u.goal,
+        u.adaptive_tdee, u.weight_trend_kg, u.adaptive_tdee_on, u.is_verified, u.created_at, u.updated_at,
+    ).where(u.id == user_id)
+
+
+def _sessions(user_id: int) -> Select:
+    s = SessionModel
+    # no jti: it's half of a live credential
+    return select(s.id, s.ip, s.user_agent, s.created_at, s.last_seen_at).where(s.user_id == user_id).order_by(s.id)
+
+
+def _weight(user_id: int) -> Select:
+    w = WeightLog
+    return select(w.logged_on, w.weight_kg, w.created_at, w.updated_at).where(w.user_id == user_id).order_by(w.logged_on)
+
+
+def _intake(user_id: int) -> Select:
+    i = IntakeLog
+    return select(i.logged_on, i.kcal, i.created_at, i.updated_at).where(i.user_id == user_id).order_by(i.logged_on)
+
+
+def _workouts(user_id: int) -> Select:
+    w = Workout
+    return (
+        select(w.id, w.name, w.notes, w.started_at, w.client_id, w.created_at)
+        .where(w.user_id == user_id)
+        .order_by(w.id)
+    )
+
+
+def _sets(user_id: int) -> Select:
+    s = WorkoutSet
+    return (
+        select(
+            s.id, s.workout_id, s.exercise_id, Exercise.name.label("exercise"), Exercise.muscle_group,
+            s.set_index, s.reps, s.weight_kg, s.rpe, s.performed_at, s.client_id,
+        )
+        .join(Exercise, Exercise.id == s.exercise_id)
+        .where(s.user_id == user_id)
+        .order_by(s.id)
+    )
+
+
+# dataset name -> statement for one user; "all" means every one of them, zipped
+DATASETS = {
+    "profile": _profile,
+    "sessions": _sessions,
+    "weight": _weight,
+    "intake": _intake,
+    "workouts": _workouts,
+    "sets": _sets,
+}
+
+
+def parquet_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def describe(dataset: str, fmt: str, gzip: bool) -> tuple[str, str]:
+    """(download filename, media type) of an export."""
+    if dataset == "all":
+        return "fitdojo-export.zip", "application/zip"
+    if fmt == "parquet":
+        return f"fitdojo-{dataset}.parquet", "application/vnd.apache.parquet"
+    if gzip:
+        return f"fitdojo-{dataset}.csv.gz", "application/gzip"
+    return f"fitdojo-{dataset}.csv", "text/csv; charset=utf-8"
+
+
+class _Sink(io.RawIOBase):
+    """Write-only, unseekable file whose bytes are taken back out with drain()."""
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._buf += b
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        out = bytes(self._buf)
+        self._buf.clear()
+        return out
+
+
+def _batches(db: Session, stmt: Select, stats: dict) -> Iterator[list]:
+    result = db.execute(stmt.execution_options(yield_per=settings.EXPORT_BATCH_ROWS))
+    for rows in result.partitions():
+        stats["rows"] += len(rows)
+        yield rows
+
+
+def _cell(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+def _csv_chunks(db: Session, stmt: Select, stats: dict) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(stmt.selected_columns.keys())
+    for rows in _batches(db, stmt, stats):
+        writer.writerows([_cell(v) for v in row] for row in rows)
+        yield buf.getvalue().encode()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():  # header of an empty dataset
+        yield buf.getvalue().encode()
+
+
+def _arrow_type(pa, sa_type):
+    if isinstance(sa_type, Boolean):
+        return pa.bool_()
+    if isinstance(sa_type, Integer):
+        return pa.int64()
+    if isinstance(sa_type, (Float, Numeric)):
+        return pa.float64()
+    if isinstance(sa_type, DateTime):
+        return pa.timestamp("us", tz="UTC" if sa_type.timezone else None)
+    if isinstance(sa_type, Date):
+        return pa.date32()
+    return pa.string()
+
+
+def _parquet_chunks(db: Session, stmt: Select, stats: dict) -> Iterator[bytes]:
+    # Requires pyarrow; callers check parquet_available() first
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # schema from the column types, so an all-NULL first batch can't pin a column to "null"
+    schema = pa.schema([(c.key, _arrow_type(pa, c.type)) for c in stmt.selected_columns])
+    sink = _Sink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for rows in _batches(db, stmt, stats):
+            columns = zip(*rows)
+            arrays = [pa.array(col, type=field.type) for col, field in zip(columns, schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))  # one row group
+            yield sink.drain()
+    yield sink.drain()
+
+
+_WRITERS = {"csv": _csv_chunks, "parquet": _parquet_chunks}
+
+
+def _zip_chunks(db: Session, user_id: int, fmt: str, stats: dict) -> Iterator[bytes]:
+    sink = _Sink()
+    # the sink can't seek, so zipfile writes sizes in data descriptors after each member
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, build in DATASETS.items():
+            with zf.open(f"{name}.{fmt}", "w", force_zip64=True) as member:
+                for chunk in _WRITERS[fmt](db, build(user_id), stats):
+                    member.write(chunk)
+                    yield sink.drain()
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _gzipped(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    z = zlib.compressobj(wbits=31)  # gzip container
+    for chunk in chunks:
+        out = z.compress(chunk)
+        if out:
+            yield out
+    yield z.flush()
+
+
+def stream(user_id: int, dataset: str, fmt: str, gzip: bool = False, stats: dict | None = None) -> Iterator[bytes]:
+    """
+    The bytes of one export. Opens its own session, so it can outlive the
+    request's (StreamingResponse). `stats["rows"]` counts rows written.
+    """
+    stats = {"rows": 0} if stats is None else stats
+    stats.setdefault("rows", 0)
+    # one snapshot for every dataset of the export; a replica is fine for this
+    with read_session(isolation_level="REPEATABLE READ") as db:
+        if dataset == "all":
+            chunks = _zip_chunks(db, user_id, fmt, stats)
+        else:
+            chunks = _WRITERS[fmt](db, DATASETS[dataset](user_id), stats)
+            if gzip:
+                chunks = _gzipped(chunks)
+        for chunk in chunks:
+            if chunk:
+                yield chunk
+
+
+class ExportRunner:
+    """
+    Runs queued export_jobs into files under EXPORT_DIR and deletes them
+    again once expired.
+
+    Jobs are claimed with FOR UPDATE SKIP LOCKED, so every worker can run
+    one. A job left "running" for EXPORT_STALE_MINUTES (its worker died) is
+    claimed again.
+    """
+
+    def __init__(self, interval: float, directory: str, ttl: timedelta, stale_after: timedelta):
+        self.directory = directory
+        self.ttl = ttl
+        self.stale_after = stale_after
+        self._lock = threading.Lock()  # one job at a time per process
+        # jobs are durable, nothing to flush on shutdown
+        self._worker = PeriodicWorker("export-runner", interval, self.run_pending, run_on_stop=False)
+
+    def enqueue(self, db: Session, user_id: int, dataset: str, fmt: str, gzip: bool) -> ExportJob:
+        """Queue an export; the caller commits, then wake() starts it right away."""
+        job = ExportJob(user_id=user_id, token=secrets.token_urlsafe(32), dataset=dataset, format=fmt, gzip=gzip)
+        db.add(job)
+        return job
+
+    def path_for(self, job: ExportJob) -> str:
+        filename, _ = describe(job.dataset, job.format, job.gzip)
+        return os.path.join(self.directory, f"{job.token}-{filename}")
+
+    def _claim(self) -> ExportJob | None:
+        now = datetime.now(timezone.utc)
+        with SessionLocal() as db:
+            job = db.execute(
+                select(ExportJob)
+                .where(or_(
+                    ExportJob.status == "pending",
+                    and_(ExportJob.status == "running", ExportJob.started_at < now - self.stale_after),
+                ))
+                .order_by(ExportJob.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            ).scalar_one_or_none()
+            if job is None:
+                return None
+            job.status = "running"
+            job.started_at = now
+            db.flush()
+            db.expunge(job)  # keep its attributes readable after the commit
+            db.commit()
+            return job
+
+    def _finish(self, job_id: int, **values) -> None:
+        now = datetime.now(timezone.utc)
+        with SessionLocal() as db:
+            db.execute(
+                update(ExportJob)
+                .where(ExportJob.id == job_id)
+                .values(finished_at=now, expires_at=now + self.ttl, **values)
+            )
+            db.commit()
+
+    def _run(self, job: ExportJob) -> None:
+        path = self.path_for(job)
+        tmp = f"{path}.{os.getpid()}.part"
+        stats = {"rows": 0}
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp, "wb") as f:
+                for chunk in stream(job.user_id, job.dataset, job.format, job.gzip, stats):
+                    f.write(chunk)
+            os.replace(tmp, path)
+        except Exception as exc:
+            log.exception("export job %s failed", job.id)
+            try:
+                os.remove(tmp)
+            except FileNotFoundError:
+                pass
+            self._finish(job.id, status="failed", error=f"{type(exc).__name__}: {exc}"[:1000])
+            return
+        self._finish(job.id, status="done", path=path, size_bytes=os.path.getsize(path), rows=stats["rows"])
+
+    def purge_expired(self) -> int:
+        """Delete expired jobs and their files; returns the number of jobs removed."""
+        with SessionLocal() as db:
+            paths = db.execute(
+                delete(ExportJob)
+                .where(ExportJob.expires_at < datetime.now(timezone.utc))
+                .returning(ExportJob.path)
+            ).scalars().all()
+            db.commit()
+        for path in filter(None, paths):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        return len(paths)
+
+    def run_pending(self) -> int:
+        """Purge expired exports, then run queued jobs until none is left; returns jobs run."""
+        with self._lock:
+            self.purge_expired()
+            n = 0
+            while (job := self._claim()) is not None:
+                self._run(job)
+                n += 1
+            return n
+
+    def wake(self) -> None:
+        self._worker.wake()
+
+    def start(self) -> None:
+        self._worker.start()
+
+    def stop(self) -> None:
+        self._worker.stop()
+
+
+export_runner = ExportRunner(
+    interval=settings.EXPORT_POLL_SECONDS,
+    directory=settings.EXPORT_DIR,
+    ttl=timedelta(hours=settings.EXPORT_TTL_HOURS),
+    stale_after=timedelta(minutes=settings.EXPORT_STALE_MINUTES),
+)
+
+
+if __name__ == "__main__":
+    # One-shot run of whatever is queued:
+    #   python -m app.core.export
+    logging.basicConfig(level=logging.INFO)
+    log.info("ran %s export jobs", export_runner.run_pending())
@@ -0,0 +1,312 @@
+"""
+Bulk NDJSON ingestion of workouts and sets (POST /workouts/ingest).
+
+The request body is read incrementally; at most INGEST_CHUNK_ROWS lines are
+held at once. Each chunk is validated, its references resolved with a few
+set-based queries, loaded into a temp staging table with COPY, and moved
+into workout_sets with one INSERT ... SELECT ... ON CONFLICT DO NOTHING,
+then committed. Only counters and a capped error list outlive a chunk.
+
+Line shapes (see app.schemas.workout):
+
+    {"type": "workout", "client_id": "w1", "started_at": "...", "name": "Push"}
+    {"workout": "w1", "exercise": "Bench Press", "reps": 5, "weight_kg": 100}
+    {"workout_id": 42, "exercise_id": 7, "reps": 8, "weight_kg": 60, "client_id": "s9"}
+
+A workout line must come before the sets that reference it by client_id.
+"""
+import csv
+import io
+import json
+import logging
+from datetime import datetime, timezone
+from typing import AsyncIterator
+
+from pydantic import ValidationError
+from sqlalchemy import (
+    BigInteger, Column, DateTime, Float, Integer, MetaData, String, Table, func, literal, select,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable
+
+from app.core.exercises import resolve_exercise_names, visible_exercise_ids
+from app.core.set_hooks import sets_added
+from app.core.settings import settings
+from app.core.sync import reserve
+from app.models.workout import Workout, WorkoutSet
+from app.schemas.workout import IngestError, IngestReport, IngestSetLine, IngestWorkoutLine
+
+log = logging.getLogger(__name__)
+
+_SET_COLUMNS = [
+    "workout_id", "exercise_id", "set_index", "reps", "weight_kg", "rpe", "performed_at", "client_id", "change_seq",
+]
+
+# per-connection scratch table; emptied by every commit
+_staging = Table(
+    "_ingest_sets",
+    MetaData(),
+    Column("line_no", Integer),
+    Column("workout_id", Integer),
+    Column("exercise_id", Integer),
+    Column("set_index", Integer),
+    Column("reps", Integer),
+    Column("weight_kg", Float),
+    Column("rpe", Float),
+    Column("performed_at", DateTime(timezone=True)),
+    Column("client_id", String(64)),
+    Column("change_seq", BigInteger),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DELETE ROWS",
+)
+
+
+async def iter_ndjson_lines(chunks: AsyncIterator[bytes], max_line_bytes: int):
+    """
+    Yield (line_no, raw_line) from a byte stream without buffering it whole.
+    Over-long lines are skipped and yielded as (line_no, None).
+    """
+    buf = bytearray()
+    line_no = 0
+    skipping = False
+    async for chunk in chunks:
+        buf += chunk
+        *lines, rest = buf.split(b"\n")
+        buf = bytearray(rest)
+        for line in lines:
+            line_no += 1
+            if skipping:
+                # tail of a line that already overflowed
+                skipping = False
+                yield line_no, None
+            elif len(line) > max_line_bytes:
+                yield line_no, None
+            elif line.strip():
+                yield line_no, bytes(line)
+        if len(buf) > max_line_bytes:
+            skipping = True
+            buf.clear()
+    if skipping:
+        yield line_no + 1, None
+    elif buf.strip():
+        yield line_no + 1, bytes(buf)
+
+
+class SetIngestor:
+    def __init__(self, db: Session, user_id: int):
+        self.db = db
+        self.user_id = user_id
+        self.report = IngestReport()
+        self._pending: list[tuple[int, bytes | None]] = []
+        # resolved across chunks: workout client_id -> id, owned ids, visible exercises
+        self._workouts: dict[str, int] = {}
+        self._own_workout_ids: set[int] = set()
+        self._exercise_ids: set[int] = set()
+        self._exercise_names: dict[str, int] = {}
+
+    def add(self, line_no: int, raw: bytes | None) -> int:
+        self.report.lines = line_no
+        self._pending.append((line_no, raw))
+        return len(self._pending)
+
+    def _error(self, line_no: int, message: str) -> None:
+        if len(self.report.errors) < settings.INGEST_MAX_ERRORS:
+            self.report.errors.append(IngestError(line=line_no, error=message))
+        else:
+            self.report.errors_truncated = True
+
+    # ---------- one chunk ----------
+
+    def _parse(self, batch):
+        workouts, sets = [], []
+        for line_no, raw in batch:
+            if raw is None:
+                self._error(line_no, f"line longer than {settings.INGEST_MAX_LINE_BYTES} bytes")
+                continue
+            try:
+                obj = json.loads(raw)
+                if not isinstance(obj, dict):
+                    raise ValueError("expected a JSON object")
+                if obj.get("type") == "workout":
+                    workouts.append((line_no, IngestWorkoutLine.model_validate(obj)))
+                else:
+                    sets.append((line_no, IngestSetLine.model_validate(obj)))
+            except ValidationError as e:
+                err = e.errors()[0]
+                where = ".".join(str(p) for p in err["loc"])
+                self._error(line_no, f"{where}: {err['msg']}" if where else err["msg"])
+            except ValueError as e:
+                self._error(line_no, str(e))
+        return workouts, sets
+
+    def _upsert_workouts(self, workouts) -> None:
+        if not workouts:
+            return
+        now = datetime.now(timezone.utc)
+        # last line wins when a client_id repeats inside the chunk
+        by_client = {
+            w.client_id: {
+                "user_id": self.user_id,
+                "client_id": w.client_id,
+                "name": w.name,
+                "notes": w.notes,
+                "started_at": w.started_at or now,
+            }
+            for _, w in workouts
+        }
+        first_seq = reserve(self.db, self.user_id, len(by_client))
+        for i, row in enumerate(by_client.values()):
+            row["change_seq"] = first_seq + i
+        stmt = insert(Workout).values(list(by_client.values()))
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_workouts_user_id_client_id",
+            set_={
+                "name": stmt.excluded.name,
+                "notes": stmt.excluded.notes,
+                "started_at": stmt.excluded.started_at,
+                "change_seq": stmt.excluded.change_seq,
+            },
+        ).returning(Workout.id, Workout.client_id)
+        for wid, client_id in self.db.execute(stmt).all():
+            self._workouts[client_id] = wid
+            self._own_workout_ids.add(wid)
+        self.report.workouts += len(workouts)
+
+    def _resolve(self, sets) -> None:
+        db, uid = self.db, self.user_id
+
+        unknown_clients = {s.workout for _, s in sets if s.workout and s.workout not in self._workouts}
+        if unknown_clients:
+            rows = db.execute(
+                select(Workout.client_id, Workout.id)
+                .where(Workout.user_id == uid, Workout.client_id.in_(unknown_clients))
+            ).all()
+            for client_id, wid in rows:
+                self._workouts[client_id] = wid
+                self._own_workout_ids.add(wid)
+
+        unknown_ids = {s.workout_id for _, s in sets if s.workout_id and s.workout_id not in self._own_workout_ids}
+        if unknown_ids:
+            self._own_workout_ids |= set(
+                db.execute(select(Workout.id).where(Workout.id.in_(unknown_ids), Workout.user_id == uid)).scalars()
+            )
+
+        unknown_ex = {s.exercise_id for _, s in sets if s.exercise_id and s.exercise_id not in self._exercise_ids}
+        self._exercise_ids |= visible_exercise_ids(db, uid, unknown_ex)
+
+        # only name exercises for sets that will be stored, so typos in a bad line don't leave custom exercises behind
+        names = {
+            s.exercise.strip().lower(): s.exercise
+            for _, s in sets
+            if s.exercise and (self._workouts.get(s.workout) if s.workout else s.workout_id) in self._own_workout_ids
+        }
+        resolved = resolve_exercise_names(db, uid, [n for key, n in names.items() if key not in self._exercise_names])
+        self._exercise_names.update(resolved)
+        self._exercise_ids |= set(resolved.values())
+
+    def _stage(self, sets) -> list[list]:
+        rows, seen_clients = [], set()
+        for line_no, s in sets:
+            wid = self._workouts.get(s.workout) if s.workout else s.workout_id
+            if wid not in self._own_workout_ids:
+                self._error(line_no, f"unknown workout {s.workout or s.workout_id!r}")
+                continue
+            ex_id = self._exercise_names.get(s.exercise.strip().lower()) if s.exercise else s.exercise_id
+            if ex_id not in self._exercise_ids:
+                self._error(line_no, f"unknown exercise {s.exercise or s.exercise_id!r}")
+                continue
+            if s.client_id is not None:
+                if s.client_id in seen_clients:
+                    self.report.duplicates += 1
+                    continue
+                seen_clients.add(s.client_id)
+            rows.append([line_no, wid, ex_id, s.set_index, s.reps, s.weight_kg, s.rpe, s.performed_at, s.client_id])
+        if rows:
+            # duplicates skipped by ON CONFLICT just leave gaps in the numbers
+            first_seq = reserve(self.db, self.user_id, len(rows))
+            for i, row in enumerate(rows):
+                row.append(first_seq + i)
+        return rows
+
+    def _load_staging(self, rows: list[list]) -> None:
+        conn = self.db.connection()
+        conn.execute(CreateTable(_staging, if_not_exists=True))
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            if hasattr(cursor, "copy_expert"):
+                # psycopg2: COPY in CSV, where an unquoted empty field is NULL
+                buf = io.StringIO()
+                writer = csv.writer(buf)
+                for row in rows:
+                    writer.writerow(["" if v is None else v for v in row])
+                buf.seek(0)
+                cols = ", ".join(c.name for c in _staging.columns)
+                copy = f"COPY {_staging.name} ({cols}) FROM STDIN WITH (FORMAT csv)"
+                dbapi_error = conn.dialect.loaded_dbapi.Error
+                try:
+                    cursor.copy_expert(copy, buf)
+                except dbapi_error as e:
+                    # the raw cursor bypasses SQLAlchemy's wrapping; flush() only knows SQLAlchemyError
+                    raise DBAPIError.instance(copy, None, e, dbapi_error) from e
+                return
+        finally:
+            cursor.close()
+        # other drivers: multi-row INSERT
+        keys = [c.name for c in _staging.columns]
+        conn.execute(_staging.insert(), [dict(zip(keys, row)) for row in rows])
+
+    def _insert_sets(self) -> list[int]:
+        s = _staging.c
+        src = (
+            select(
+                literal(self.user_id),
+                s.workout_id,
+                s.exercise_id,
+                s.set_index,
+                s.reps,
+                s.weight_kg,
+                s.rpe,
+                func.coalesce(s.performed_at, Workout.started_at),
+                s.client_id,
+                s.change_seq,
+            )
+            .select_from(_staging.join(Workout, Workout.id == s.workout_id))
+            .order_by(s.line_no)
+        )
+        stmt = (
+            insert(WorkoutSet)
+            .from_select(["user_id", *_SET_COLUMNS], src)
+            .on_conflict_do_nothing(constraint="uq_workout_sets_user_id_client_id")
+            .returning(WorkoutSet.id)
+        )
+        return list(self.db.execute(stmt).scalars())
+
+    def flush(self) -> None:
+        """Validate and write everything buffered so far, in one transaction."""
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        workouts, sets = self._parse(batch)
+        try:
+            self._upsert_workouts(workouts)
+            if sets:
+                self._resolve(sets)
+                rows = self._stage(sets)
+                if rows:
+                    self._load_staging(rows)
+                    inserted = self._insert_sets()
+                    sets_added(self.db, self.user_id, inserted)
+                    self.report.inserted += len(inserted)
+                    self.report.duplicates += len(rows) - len(inserted)
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            log.exception("ingest chunk failed (lines %d-%d)", batch[0][0], batch[-1][0])
+            # ids cached from this chunk may not exist after the rollback
+            self._workouts.clear()
+            self._own_workout_ids.clear()
+            self._exercise_ids.clear()
+            self._exercise_names.clear()
+            self._error(batch[0][0], f"lines {batch[0][0]}-{batch[-1][0]} not stored: {e.__class__.__name__}")
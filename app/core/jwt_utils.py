@@ -1,9 +1,14 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 
 import jwt
 from jwt.exceptions import InvalidTokenError, ExpiredSignatureError
 
+from app.core.metrics import jwt_duration
 from app.core.settings import settings
 
 
@@ -40,7 +45,8 @@ def create_token(
     if jti is not None:
         payload["jti"] = jti
 
-    return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    with jwt_duration.time("create", "ok"):
+        return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
 
 
 # 🔸 Typed/single-use tokens (email verify & password reset)
@@ -66,12 +72,72 @@ def create_typed_token(
         "jti": jti,    # unique token ID for one-time use
     }
 
-    token = jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    with jwt_duration.time("create", "ok"):
+        token = jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
     return token, jti, exp
 
 
-# 🔸 Decode token safely (handles expiry & invalid)
-def decode_token(token: str) -> dict | None:
+# 🔸 Verified-token cache (same token decoded many times per minute by one SPA tab)
+class VerifiedTokenCache:
+    """
+    LRU of already-verified payloads keyed by a SHA-256 digest of the token.
+
+    Entries are only served until the token's own `exp`, so the cache can
+    never extend a token's life; after that the token takes the normal
+    verification path again.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[bytes, tuple[int, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict | None:
+        if self.max_size <= 0:
+            return None
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # callers may mutate what they get back
+        return dict(entry[1])
+
+    def put(self, token: str, payload: dict) -> None:
+        exp = payload.get("exp")
+        if self.max_size <= 0 or not isinstance(exp, int) or exp <= time.time():
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (exp, dict(payload))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "max_size": self.max_size}
+
+
+token_cache = VerifiedTokenCache(settings.JWT_CACHE_SIZE)
+
+
+def _verify_token(token: str) -> dict | None:
     try:
         return jwt.decode(
             token,
@@ -82,3 +148,17 @@ def decode_token(token: str) -> dict | None:
         )
     except (ExpiredSignatureError, InvalidTokenError):
         return None
+
+
+# 🔸 Decode token safely (handles expiry & invalid)
+def decode_token(token: str) -> dict | None:
+    start = time.perf_counter()
+    payload = token_cache.get(token)
+    if payload is not None:
+        jwt_duration.observe(time.perf_counter() - start, "decode", "cached")
+        return payload
+    payload = _verify_token(token)
+    if payload is not None:
+        token_cache.put(token, payload)
+    jwt_duration.observe(time.perf_counter() - start, "decode", "verified" if payload is not None else "invalid")
+    return payload
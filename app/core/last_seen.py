@@ -0,0 +1,86 @@
+import threading
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, String, column, func, update, values
+
+from app.core.background import PeriodicWorker
+from app.core.database import SessionLocal
+from app.core.settings import settings
+from app.models.session import Session as SessionModel
+
+
+class LastSeenBuffer:
+    """
+    Write-behind buffer for sessions.last_seen_at.
+
+    get_current_user only records "jti was seen at t" in memory; a background
+    worker flushes the latest timestamp per JTI in one
+    UPDATE sessions ... FROM (VALUES ...) every `interval` seconds, or early
+    once `max_pending` JTIs are waiting.
+    """
+
+    def __init__(self, interval: float, max_pending: int):
+        if max_pending < 1:
+            raise ValueError("LAST_SEEN_FLUSH_MAX must be at least 1")
+        self.max_pending = max_pending
+        self._pending: dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        self._worker = PeriodicWorker("last-seen-flush", interval, self.flush)
+
+    def touch(self, jti: str, seen_at: datetime | None = None) -> None:
+        seen_at = seen_at or datetime.now(timezone.utc)
+        with self._lock:
+            self._pending[jti] = seen_at
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self._worker.wake()
+
+    def pending(self, jti: str) -> datetime | None:
+        with self._lock:
+            return self._pending.get(jti)
+
+    def discard(self, jti: str) -> None:
+        with self._lock:
+            self._pending.pop(jti, None)
+
+    def flush(self) -> int:
+        with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+
+        items = list(batch.items())
+        try:
+            with SessionLocal() as db:
+                for i in range(0, len(items), self.max_pending):
+                    rows = values(
+                        column("jti", String),
+                        column("seen_at", DateTime(timezone=True)),
+                        name="seen",
+                    ).data(items[i:i + self.max_pending])
+                    db.execute(
+                        update(SessionModel)
+                        .where(SessionModel.jti == rows.c.jti)
+                        .values(last_seen_at=func.greatest(SessionModel.last_seen_at, rows.c.seen_at))
+                    )
+                db.commit()
+        except Exception:
+            # put them back (newer touches win) and retry on the next tick
+            with self._lock:
+                for jti, ts in batch.items():
+                    if jti not in self._pending:
+                        self._pending[jti] = ts
+            raise
+        return len(items)
+
+    def start(self) -> None:
+        self._worker.start()
+
+    def stop(self) -> None:
+        self._worker.stop()
+
+
+last_seen_buffer = LastSeenBuffer(
+    interval=settings.LAST_SEEN_FLUSH_SECONDS,
+    max_pending=settings.LAST_SEEN_FLUSH_MAX,
+)
@@ -0,0 +1,310 @@
+"""
+Prometheus metrics (GET /metrics), without extra dependencies.
+
+Histograms and gauges live in process memory; observe() is a bisect and
+two additions under a lock. The text exposition format is rendered on
+scrape.
+
+Several workers on one host (uvicorn/gunicorn --workers N): set
+METRICS_DIR to a directory all of them can write. Each worker then writes
+a snapshot of its series to METRICS_DIR/<pid>.json every
+METRICS_FLUSH_SECONDS (and on shutdown), and whichever worker answers the
+scrape adds its own live numbers to the other workers' snapshots:
+
+- histograms are summed over every snapshot, including those of workers
+  that have exited, so counts never go backwards while the server runs
+- gauges are summed over live workers only
+
+Empty the directory when the whole server restarts (like
+prometheus_client's multiprocess mode), or exited workers keep counting.
+"""
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable
+
+from app.core.background import PeriodicWorker
+from app.core.settings import settings
+
+log = logging.getLogger(__name__)
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+ARGON2_BUCKETS = (0.025, 0.05, 0.1, 0.15, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0)
+JWT_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _key(self, label_values: tuple) -> tuple:
+        if len(label_values) != len(self.labels):
+            raise ValueError(f"{self.name} takes labels {self.labels}")
+        return tuple(str(v) for v in label_values)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), buckets: Iterable[float] = HTTP_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [count per bucket (non-cumulative, +Inf last)..., sum]
+        self._series: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, *label_values) -> None:
+        key = self._key(label_values)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._series.get(key)
+            if row is None:
+                row = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            row[i] += 1
+            row[-1] += value
+
+    @contextmanager
+    def time(self, *label_values):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return [[list(k), list(v)] for k, v in self._series.items()]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: dict[tuple, float] = {}
+        self._functions: dict[tuple, Callable[[], float]] = {}
+
+    def inc(self, amount: float = 1, *label_values) -> None:
+        key = self._key(label_values)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, *label_values) -> None:
+        self.inc(-amount, *label_values)
+
+    def set_function(self, fn: Callable[[], float], *label_values) -> None:
+        """Read the value from fn() whenever the gauge is collected."""
+        with self._lock:
+            self._functions[self._key(label_values)] = fn
+
+    def snapshot(self) -> list:
+        with self._lock:
+            values = dict(self._values)
+            functions = list(self._functions.items())
+        for key, fn in functions:
+            try:
+                values[key] = float(fn())
+            except Exception:  # a broken callback mustn't break the scrape
+                log.exception("gauge %s%s failed", self.name, key)
+        return [[list(k), v] for k, v in values.items()]
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._worker: PeriodicWorker | None = None
+
+    def register(self, metric: _Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"metric {metric.name} registered twice")
+        self._metrics[metric.name] = metric
+
+    def snapshot(self) -> dict:
+        return {name: m.snapshot() for name, m in self._metrics.items()}
+
+    # multi-worker files
+
+    def _path(self, pid: int) -> str:
+        return os.path.join(settings.METRICS_DIR, f"{pid}.json")
+
+    def flush(self) -> None:
+        """Write this worker's snapshot to METRICS_DIR (no-op without one)."""
+        if not settings.METRICS_DIR:
+            return
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        path = self._path(os.getpid())
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)
+
+    def _other_snapshots(self) -> list[tuple[dict, bool]]:
+        """(snapshot, worker still alive) for every other worker's file."""
+        if not settings.METRICS_DIR or not os.path.isdir(settings.METRICS_DIR):
+            return []
+        out = []
+        for entry in os.scandir(settings.METRICS_DIR):
+            stem, ext = os.path.splitext(entry.name)
+            if ext != ".json" or not stem.isdigit() or int(stem) == os.getpid():
+                continue
+            try:
+                with open(entry.path) as f:
+                    out.append((json.load(f), _pid_alive(int(stem))))
+            except (OSError, ValueError):
+                continue  # half-written or just removed
+        return out
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text format, summed over workers."""
+        snapshots = [(self.snapshot(), True)] + self._other_snapshots()
+        lines = []
+        for name, metric in self._metrics.items():
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            if isinstance(metric, Histogram):
+                lines += self._render_histogram(metric, snapshots)
+            else:
+                lines += self._render_gauge(metric, snapshots)
+        return "\n".join(lines) + "\n"
+
+    def _render_histogram(self, metric: Histogram, snapshots) -> list[str]:
+        width = len(metric.buckets) + 2
+        merged: dict[tuple, list[float]] = {}
+        for snap, _alive in snapshots:
+            for key, row in snap.get(metric.name, []):
+                if len(row) != width:
+                    continue  # written with other buckets by an older build
+                acc = merged.setdefault(tuple(key), [0] * width)
+                for i, v in enumerate(row):
+                    acc[i] += v
+        lines = []
+        for key in sorted(merged):
+            row = merged[key]
+            cumulative = 0
+            for bound, n in zip(metric.buckets + (float("inf"),), row[:-1]):
+                cumulative += n
+                le = 'le="' + _fmt(bound) + '"'
+                lines.append(f"{metric.name}_bucket{_labels(metric.labels, key, le)} {int(cumulative)}")
+            lines.append(f"{metric.name}_sum{_labels(metric.labels, key)} {_fmt(row[-1])}")
+            lines.append(f"{metric.name}_count{_labels(metric.labels, key)} {int(cumulative)}")
+        return lines
+
+    def _render_gauge(self, metric: Gauge, snapshots) -> list[str]:
+        merged: dict[tuple, float] = {}
+        for snap, alive in snapshots:
+            if not alive:
+                continue
+            for key, value in snap.get(metric.name, []):
+                merged[tuple(key)] = merged.get(tuple(key), 0) + value
+        return [f"{metric.name}{_labels(metric.labels, key)} {_fmt(merged[key])}" for key in sorted(merged)]
+
+    def start(self) -> None:
+        if settings.METRICS_DIR and self._worker is None:
+            # run_on_stop: the last numbers of an exiting worker still count
+            self._worker = PeriodicWorker("metrics-flush", settings.METRICS_FLUSH_SECONDS, self.flush)
+            self._worker.start()
+
+    def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.stop()
+            self._worker = None
+
+
+registry = Registry()
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "Time from request start to the end of the response body",
+    ("method", "route", "status"), HTTP_BUCKETS,
+)
+http_requests_in_progress = Gauge("http_requests_in_progress", "Requests being served right now")
+db_pool_checked_out = Gauge("db_pool_checked_out", "Connections lent out by the SQLAlchemy pool", ("pool",))
+db_pool_overflow = Gauge("db_pool_overflow", "Connections open beyond DB_POOL_SIZE", ("pool",))
+db_pool_size = Gauge("db_pool_size", "Configured pool size (DB_POOL_SIZE)", ("pool",))
+password_hash_duration = Histogram(
+    "password_hash_duration_seconds", "Argon2 hash/verify as seen by the caller, queueing included",
+    ("op",), ARGON2_BUCKETS,
+)
+password_hash_queue_wait = Histogram(
+    "password_hash_queue_wait_seconds", "Time Argon2 jobs waited for a hashing pool worker",
+    (), ARGON2_BUCKETS,
+)
+jwt_duration = Histogram(
+    "jwt_duration_seconds", "create_token/decode_token; decode result is cached, verified or invalid",
+    ("op", "result"), JWT_BUCKETS,
+)
+
+
+def watch_pool(engine, name: str) -> None:
+    """Pool gauges for an engine with a QueuePool (read on scrape/flush)."""
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return
+    db_pool_checked_out.set_function(pool.checkedout, name)
+    db_pool_overflow.set_function(lambda: max(0, pool.overflow()), name)
+    db_pool_size.set_function(pool.size, name)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing every HTTP request by route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500  # unless a response starts
+        start = time.perf_counter()
+
+        async def send_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_progress.inc()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            http_requests_in_progress.dec()
+            # the template ("/workouts/{workout_id}"), so ids don't explode the label set
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            http_request_duration.observe(time.perf_counter() - start, scope["method"], route, status)
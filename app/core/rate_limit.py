@@ -0,0 +1,240 @@
+import inspect
+import time
+from math import floor
+
+from limits.storage.base import SlidingWindowCounterSupport, Storage, TimestampedSlidingWindow
+from slowapi import Limiter, _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+from slowapi.middleware import SlowAPIMiddleware, _find_route_handler, _get_route_name, _should_exempt, sync_check_limits
+from slowapi.util import get_remote_address
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import Match
+from sqlalchemy import (
+    Column, Float, Integer, MetaData, String, Table, case, create_engine, delete, event, select, update,
+)
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.settings import settings
+
+# how often (at most) a storage purges expired counters
+_PURGE_EVERY_SECONDS = 60
+
+
+class SqlStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """
+    `limits` storage backed by a SQL table, so every worker process shares
+    the same counters and they survive restarts.
+
+    - ``sqlite:////var/lib/fitdojo/ratelimit.db``: a local file in WAL mode,
+      shared by all workers on one host with no extra service.
+    - ``postgresql://...``: an UNLOGGED table in Postgres, shared across hosts.
+
+    Redis (or a Redis-compatible local stand-in) needs no code here: use a
+    ``redis://`` URI and slowapi's built-in storage.
+
+    Supports the fixed-window and sliding-window-counter strategies. Counters
+    change with one atomic upsert; an acquire that loses a race is rolled back
+    the same way limits' MemoryStorage does it.
+
+    Every call is a blocking round-trip, so requests are checked in the
+    threadpool by RateLimitMiddleware rather than on the event loop.
+    """
+
+    STORAGE_SCHEME = ["sqlite", "postgresql"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, **options):
+        self.engine = create_engine(uri, **options)
+        self.dialect = self.engine.dialect.name
+        if self.dialect == "sqlite":
+            @event.listens_for(self.engine, "connect")
+            def _sqlite_pragmas(dbapi_conn, _):
+                cur = dbapi_conn.cursor()
+                cur.execute("PRAGMA journal_mode=WAL")
+                cur.execute("PRAGMA synchronous=NORMAL")
+                cur.execute("PRAGMA busy_timeout=2000")
+                cur.close()
+
+        self.table = Table(
+            "rate_limit_counters",
+            MetaData(),
+            Column("key", String(255), primary_key=True),
+            Column("value", Integer, nullable=False),
+            Column("expires_at", Float, nullable=False, index=True),
+            # counters are cheap to lose; skip WAL traffic on Postgres
+            prefixes=["UNLOGGED"] if self.dialect == "postgresql" else [],
+        )
+        self.table.metadata.create_all(self.engine)
+        self._next_purge = 0.0
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self):
+        return SQLAlchemyError
+
+    def _insert(self):
+        if self.dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        return insert(self.table)
+
+    def _maybe_purge(self, conn, now: float) -> None:
+        if now >= self._next_purge:
+            self._next_purge = now + _PURGE_EVERY_SECONDS
+            conn.execute(delete(self.table).where(self.table.c.expires_at <= now))
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        t = self.table
+        stmt = self._insert().values(key=key, value=amount, expires_at=now + expiry)
+        expired = t.c.expires_at <= now
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[t.c.key],
+            set_={
+                # an expired counter restarts from this hit
+                "value": case((expired, stmt.excluded.value), else_=t.c.value + stmt.excluded.value),
+                "expires_at": case((expired, stmt.excluded.expires_at), else_=t.c.expires_at),
+            },
+        ).returning(t.c.value)
+        with self.engine.begin() as conn:
+            value = conn.execute(stmt).scalar_one()
+            self._maybe_purge(conn, now)
+        return value
+
+    def decr(self, key: str, amount: int = 1) -> None:
+        t = self.table
+        with self.engine.begin() as conn:
+            conn.execute(update(t).where(t.c.key == key).values(value=t.c.value - amount))
+
+    def _get_many(self, keys: list[str], now: float) -> dict[str, tuple[int, float]]:
+        t = self.table
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                select(t.c.key, t.c.value, t.c.expires_at).where(t.c.key.in_(keys), t.c.expires_at > now)
+            ).all()
+        return {k: (v, exp) for k, v, exp in rows}
+
+    def get(self, key: str) -> int:
+        now = time.time()
+        return self._get_many([key], now).get(key, (0, now))[0]
+
+    def get_expiry(self, key: str) -> float:
+        now = time.time()
+        return self._get_many([key], now).get(key, (0, now))[1]
+
+    def check(self) -> bool:
+        try:
+            with self.engine.connect() as conn:
+                conn.execute(select(1))
+            return True
+        except SQLAlchemyError:
+            return False
+
+    def reset(self) -> int | None:
+        with self.engine.begin() as conn:
+            return conn.execute(delete(self.table)).rowcount
+
+    def clear(self, key: str) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(delete(self.table).where(self.table.c.key == key))
+
+    # sliding window counter
+
+    def _window_info(self, key: str, expiry: int, now: float) -> tuple[int, float, int, float]:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        found = self._get_many([previous_key, current_key], now)
+        previous_count = found.get(previous_key, (0, 0.0))[0]
+        current_count = found.get(current_key, (0, 0.0))[0]
+        previous_ttl = 0.0 if previous_count == 0 else (1 - (((now - expiry) / expiry) % 1)) * expiry
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        now = time.time()
+        previous_count, previous_ttl, current_count, _ = self._window_info(key, expiry, now)
+        if floor(previous_count * previous_ttl / expiry + current_count) + amount > limit:
+            return False
+        _, current_key = self.sliding_window_keys(key, expiry, now)
+        current_count = self.incr(current_key, 2 * expiry, amount=amount)
+        if floor(previous_count * previous_ttl / expiry + current_count) > limit:
+            # another worker won the race; give the slot back
+            self.decr(current_key, amount)
+            return False
+        return True
+
+    def get_sliding_window(self, key: str, expiry: int) -> tuple[int, float, int, float]:
+        return self._window_info(key, expiry, time.time())
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        self.clear(previous_key)
+        self.clear(current_key)
+
+
+# Per-IP limits. Routes can tighten theirs with @limiter.limit(...),
+# e.g. settings.RATE_LIMIT_LOGIN on /auth/login.
+limiter = Limiter(
+    key_func=get_remote_address,
+    default_limits=[settings.RATE_LIMIT_DEFAULT],
+    storage_uri=settings.RATE_LIMIT_STORAGE_URI,
+    strategy=settings.RATE_LIMIT_STRATEGY,
+    enabled=settings.RATE_LIMIT_ENABLED,
+)
+
+
+def _route_endpoint(routes, scope):
+    """The endpoint the request will reach: the first full match, looking inside included routers."""
+    for route in routes:
+        # newer FastAPI keeps included routers as one route each; slowapi's lookup doesn't see into them
+        candidates = route.effective_route_contexts() if hasattr(route, "effective_route_contexts") else (route,)
+        for candidate in candidates:
+            match, _ = candidate.matches(scope)
+            if match == Match.FULL:
+                return getattr(candidate, "endpoint", None)
+    return None
+
+
+class RateLimitMiddleware(SlowAPIMiddleware):
+    """
+    SlowAPIMiddleware that runs the checks in the threadpool when the
+    counters live in SqlStorage. slowapi checks synchronously; on the event
+    loop each database round-trip (up to sqlite's busy_timeout under write
+    contention) would hold up every other request of the worker.
+
+    Async routes with their own @limiter.limit are checked here as well and
+    marked done, so the decorator skips its check on the loop. Sync routes
+    run their check in the threadpool already.
+    """
+
+    async def dispatch(self, request, call_next):
+        app = request.app
+        limiter: Limiter = app.state.limiter
+        if not (limiter.enabled and isinstance(limiter._storage, SqlStorage)):
+            return await super().dispatch(request, call_next)
+
+        handler = _find_route_handler(app.routes, request.scope)
+        if not _should_exempt(limiter, handler):
+            error_response, inject_headers = await run_in_threadpool(
+                sync_check_limits, limiter, request, handler, app
+            )
+            if error_response is not None:
+                return error_response
+            response = await call_next(request)
+            if inject_headers:
+                response = limiter._inject_headers(response, request.state.view_rate_limit)
+            return response
+
+        endpoint = _route_endpoint(app.routes, request.scope)
+        if (
+            limiter._auto_check
+            and inspect.iscoroutinefunction(endpoint)
+            and _get_route_name(endpoint) in limiter._route_limits
+        ):
+            try:
+                await run_in_threadpool(limiter._check_request_limit, request, endpoint, False)
+            except RateLimitExceeded as exc:
+                return _rate_limit_exceeded_handler(request, exc)
+            request.state._rate_limiting_complete = True
+        return await call_next(request)
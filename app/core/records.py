@@ -0,0 +1,164 @@
+"""
+Personal records per user and exercise (app.models.record).
+
+Kept current from the set hooks (app.core.set_hooks), inside the write
+transaction:
+
+- added sets can only raise a record, so the batch's best set per exercise
+  (and per exercise + weight, for rep records) is upserted with a "beats
+  the stored one" condition; one statement per metric
+- removed or edited sets only matter when they hold a record. Those
+  exercises (or exercise + weight pairs) are recomputed from the user's
+  remaining sets of that exercise, through the (user_id, exercise_id, ...)
+  index on workout_sets, so the cost follows that exercise's history and
+  never the whole log
+
+Ties go to the earlier set, then the lower id, on both paths.
+
+A full rebuild from workout_sets, for repairs and backfills:
+
+    python -m app.core.records [--user ID]
+"""
+import argparse
+from typing import Iterable
+
+from sqlalchemy import Float, and_, case, cast, delete, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.models.record import ExerciseRecord, RepRecord
+from app.models.user import User
+from app.models.workout import WorkoutSet
+
+METRICS = ("epley", "brzycki", "volume")
+
+
+def _metric(name: str):
+    """(value per set, which sets count) for an ExerciseRecord metric."""
+    s = WorkoutSet
+    reps = cast(s.reps, Float)
+    # Brzycki divides by 37 - reps; estimates from long sets aren't worth much anyway
+    e1rm_sets = s.reps.between(1, min(settings.PR_E1RM_MAX_REPS, 36))
+    if name == "epley":
+        return case((s.reps == 1, s.weight_kg), else_=s.weight_kg * (1 + reps / 30)), e1rm_sets
+    if name == "brzycki":
+        return case((s.reps == 1, s.weight_kg), else_=s.weight_kg * 36 / (37 - reps)), e1rm_sets
+    return s.reps * s.weight_kg, s.reps >= 1
+
+
+def _beats(new_value, new_at, new_id, value, at, set_id):
+    return or_(
+        value.is_(None),
+        new_value > value,
+        and_(new_value == value, tuple_(new_at, new_id) < tuple_(at, set_id)),
+    )
+
+
+def _upsert_best(db: Session, name: str, set_filter) -> None:
+    s, r = WorkoutSet, ExerciseRecord
+    value, counts = _metric(name)
+    src = (
+        select(s.user_id, s.exercise_id, value, s.id, s.performed_at)
+        .where(set_filter, counts)
+        .distinct(s.exercise_id)
+        .order_by(s.exercise_id, value.desc(), s.performed_at, s.id)
+    )
+    cols = [f"{name}_kg", f"{name}_set_id", f"{name}_at"]
+    stmt = insert(r).from_select(["user_id", "exercise_id", *cols], src)
+    new = [stmt.excluded[c] for c in cols]
+    cur = [getattr(r, c) for c in cols]
+    beats = _beats(new[0], new[2], new[1], cur[0], cur[2], cur[1])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[r.user_id, r.exercise_id],
+        set_={c: case((beats, n), else_=old) for c, n, old in zip(cols, new, cur)},
+    )
+    db.execute(stmt)
+
+
+def _upsert_reps(db: Session, set_filter) -> None:
+    s, r = WorkoutSet, RepRecord
+    src = (
+        select(s.user_id, s.exercise_id, s.weight_kg, s.reps, s.id, s.performed_at)
+        .where(set_filter, s.reps >= 1)
+        .distinct(s.exercise_id, s.weight_kg)
+        .order_by(s.exercise_id, s.weight_kg, s.reps.desc(), s.performed_at, s.id)
+    )
+    cols = ["reps", "set_id", "achieved_at"]
+    stmt = insert(r).from_select(["user_id", "exercise_id", "weight_kg", *cols], src)
+    ex = stmt.excluded
+    beats = _beats(ex.reps, ex.achieved_at, ex.set_id, r.reps, r.achieved_at, r.set_id)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[r.user_id, r.exercise_id, r.weight_kg],
+        set_={c: case((beats, ex[c]), else_=getattr(r, c)) for c in cols},
+    )
+    db.execute(stmt)
+
+
+def _add(db: Session, set_filter) -> None:
+    for name in METRICS:
+        _upsert_best(db, name, set_filter)
+    _upsert_reps(db, set_filter)
+
+
+def apply_added(db: Session, user_id: int, set_ids: Iterable[int]) -> None:
+    """Let the given (new or just updated) sets raise the user's records. Doesn't commit."""
+    set_ids = list(set_ids)
+    if set_ids:
+        _add(db, and_(WorkoutSet.user_id == user_id, WorkoutSet.id.in_(set_ids)))
+
+
+def apply_removing(db: Session, user_id: int, set_ids: Iterable[int]) -> None:
+    """
+    Hand the records held by these sets (about to be deleted or updated) to
+    the best of the user's other sets. Doesn't commit.
+    """
+    set_ids = list(set_ids)
+    if not set_ids:
+        return
+    s, r = WorkoutSet, ExerciseRecord
+    held = or_(r.epley_set_id.in_(set_ids), r.brzycki_set_id.in_(set_ids), r.volume_set_id.in_(set_ids))
+    exercise_ids = db.execute(
+        delete(r).where(r.user_id == user_id, held).returning(r.exercise_id)
+    ).scalars().all()
+    if exercise_ids:
+        for name in METRICS:
+            _upsert_best(db, name, and_(s.user_id == user_id, s.exercise_id.in_(exercise_ids), s.id.notin_(set_ids)))
+
+    pairs = db.execute(
+        delete(RepRecord)
+        .where(RepRecord.user_id == user_id, RepRecord.set_id.in_(set_ids))
+        .returning(RepRecord.exercise_id, RepRecord.weight_kg)
+    ).all()
+    if pairs:
+        _upsert_reps(
+            db,
+            and_(s.user_id == user_id, tuple_(s.exercise_id, s.weight_kg).in_(pairs), s.id.notin_(set_ids)),
+        )
+
+
+def rebuild(db: Session, user_id: int) -> None:
+    """Drop and recompute every record of one user from workout_sets. Doesn't commit."""
+    for model in (ExerciseRecord, RepRecord):
+        db.execute(delete(model).where(model.user_id == user_id))
+    _add(db, WorkoutSet.user_id == user_id)
+
+
+def main() -> None:
+    from app.core.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild personal records from workout sets")
+    parser.add_argument("--user", type=int, action="append", help="only these user ids (repeatable)")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        user_ids = args.user or db.execute(select(User.id).order_by(User.id)).scalars().all()
+        for uid in user_ids:
+            rebuild(db, uid)
+            # one transaction per user keeps locks short
+            db.commit()
+        print(f"rebuilt records for {len(user_ids)} user(s)")
+
+
+if __name__ == "__main__":
+    main()
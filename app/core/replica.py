@@ -0,0 +1,290 @@
+"""
+Read replica routing.
+
+With DATABASE_REPLICA_URL set, read-only endpoints take their session from
+get_read_db (or read_session() outside a dependency) instead of get_db, and
+get the replica when all of these hold:
+
+- the replica monitor's last check found it up, and its replay lag under
+  REPLICA_MAX_LAG_SECONDS (checked every REPLICA_CHECK_SECONDS)
+- a connection could be checked out just now; if not, the replica is marked
+  down until the next check and the request reads from the primary
+- the client hasn't written recently. Any request that commits on the
+  primary gets a short-lived cookie (READ_YOUR_WRITES_COOKIE) and an
+  X-Read-Your-Writes response header holding the same expiry, and for
+  READ_YOUR_WRITES_SECONDS after it that client's reads stay on the primary,
+  whichever worker serves them
+
+The pin belongs to the client, not the user: browsers get it through the
+cookie, while bearer-token clients have to send the last X-Read-Your-Writes
+they received back as a request header. A bearer client that doesn't may
+read its own write from a replica up to REPLICA_MAX_LAG_SECONDS late.
+
+Everything else (writes, auth, sync) keeps using get_db and the primary.
+Replica sessions are read-only at the database level, so a write that
+slips into a read route fails loudly instead of landing on the wrong
+server.
+
+Trying it locally:
+
+- simulated replica: point DATABASE_REPLICA_URL at the primary itself
+  (same server, another role or the same URL). The lag check reads 0 on a
+  server that isn't in recovery, so every read route goes to the "replica"
+  pool, which shows up separately in db_pool_* on /metrics.
+- two instances: a streaming standby (pg_basebackup -R). On the standby,
+  SELECT pg_wal_replay_pause() makes it fall behind, and reads move to the
+  primary once the lag passes REPLICA_MAX_LAG_SECONDS;
+  pg_wal_replay_resume() brings them back. Stopping the standby does the
+  same for outages.
+"""
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.background import PeriodicWorker
+from app.core.database import SessionLocal
+from app.core.db_stats import instrument
+from app.core.metrics import Gauge, watch_pool
+from app.core.settings import settings
+
+log = logging.getLogger(__name__)
+
+# Seconds behind the primary. A standby that has replayed everything it
+# received is current, however old its last replayed transaction is (an
+# idle primary sends nothing new); a server not in recovery is 0.
+_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+_engine: Engine | None = None
+_lock = threading.Lock()
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, info={"replica": True})
+
+
+def enabled() -> bool:
+    return bool(settings.DATABASE_REPLICA_URL)
+
+
+def get_replica_engine() -> Engine | None:
+    """The replica engine, or None without DATABASE_REPLICA_URL."""
+    global _engine
+    if not enabled():
+        return None
+    if _engine is not None:
+        return _engine
+    with _lock:
+        if _engine is None:
+            _engine = create_engine(
+                settings.DATABASE_REPLICA_URL,
+                pool_pre_ping=True,
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                # a dead replica should cost a request this long at most, then it's skipped
+                connect_args={"connect_timeout": settings.REPLICA_CONNECT_TIMEOUT_SECONDS},
+                execution_options={"postgresql_readonly": True},
+            )
+            instrument(_engine)
+            watch_pool(_engine, "replica")
+            ReplicaSessionLocal.configure(bind=_engine)
+        return _engine
+
+
+def dispose_replica_engine() -> None:
+    global _engine
+    with _lock:
+        engine, _engine = _engine, None
+    if engine is not None:
+        engine.dispose()
+
+
+class ReplicaMonitor:
+    """Tracks whether the replica is up and how far behind it is."""
+
+    def __init__(self):
+        self.healthy = False
+        self.lag: float | None = None  # seconds, as of the last check
+        self.checked_at: float | None = None
+        self._worker: PeriodicWorker | None = None
+
+    @property
+    def available(self) -> bool:
+        return self.healthy and enabled()
+
+    def check(self) -> bool:
+        engine = get_replica_engine()
+        if engine is None:
+            return False
+        try:
+            with engine.connect() as conn:
+                lag = float(conn.execute(_LAG_SQL).scalar())
+        except DBAPIError as exc:
+            self.mark_down(exc)
+            return False
+        self.lag = lag
+        self.checked_at = time.monotonic()
+        healthy = lag <= settings.REPLICA_MAX_LAG_SECONDS
+        if healthy != self.healthy:
+            log.warning("read replica %s (lag %.1fs)", "in use" if healthy else "lagging, reads go to the primary", lag)
+        self.healthy = healthy
+        return healthy
+
+    def mark_down(self, exc: Exception) -> None:
+        """Stop using the replica until the next successful check."""
+        if self.healthy:
+            log.warning("read replica unavailable, reads go to the primary: %s", exc)
+        self.healthy = False
+        self.checked_at = time.monotonic()
+
+    def start(self) -> None:
+        if enabled() and self._worker is None:
+            self._worker = PeriodicWorker(
+                "replica-monitor", settings.REPLICA_CHECK_SECONDS, self.check, run_on_stop=False
+            )
+            self._worker.start()
+
+    def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.stop()
+            self._worker = None
+        self.healthy = False
+
+
+replica_monitor = ReplicaMonitor()
+
+db_replica_lag = Gauge("db_replica_lag_seconds", "Replay lag of the read replica at the last check (-1 = down)")
+db_replica_lag.set_function(
+    lambda: -1 if not replica_monitor.healthy or replica_monitor.lag is None else replica_monitor.lag
+)
+
+
+# per-request routing state, set by ReadYourWritesMiddleware:
+# {"pinned": client wrote recently, "wrote": this request committed on the primary}
+_request: ContextVar[dict | None] = ContextVar("replica_request", default=None)
+
+
+def _use_replica() -> bool:
+    state = _request.get()
+    return replica_monitor.available and not (state and state["pinned"])
+
+
+def read_session(**execution_options) -> Session:
+    """
+    A session for reads that can tolerate REPLICA_MAX_LAG_SECONDS of
+    staleness: on the replica when it's usable, else on the primary.
+    execution_options apply to its connection (e.g. isolation_level).
+    """
+    if _use_replica():
+        db = ReplicaSessionLocal()
+        try:
+            # check out now, so an unreachable replica falls back here rather than failing the route
+            db.connection(execution_options=execution_options or None)
+            return db
+        except DBAPIError as exc:
+            db.close()
+            replica_monitor.mark_down(exc)
+    db = SessionLocal()
+    if execution_options:
+        db.connection(execution_options=execution_options)
+    return db
+
+
+def get_read_db():
+    """get_db for read-only routes; see read_session()."""
+    db = read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@event.listens_for(Session, "after_commit")
+def _note_write(session: Session) -> None:
+    state = _request.get()
+    if state is not None and not session.info.get("replica"):
+        state["wrote"] = True
+
+
+# response header carrying the pin, for clients without cookies; they send it back as is
+PIN_HEADER = "X-Read-Your-Writes"
+_PIN_HEADER = PIN_HEADER.lower().encode()
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pure ASGI middleware: pins a client's reads to the primary for
+    READ_YOUR_WRITES_SECONDS after a request of theirs commits, through the
+    cookie or PIN_HEADER. No-op without a replica.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not enabled():
+            await self.app(scope, receive, send)
+            return
+
+        state = {"pinned": _pinned_until(scope) > time.time(), "wrote": False}
+        token = _request.set(state)
+
+        async def send_with_pin(message):
+            if message["type"] == "http.response.start" and state["wrote"]:
+                until = _pin_expiry()
+                headers = list(message.get("headers", []))
+                headers.append((b"set-cookie", _pin_cookie(until).encode("latin-1")))
+                headers.append((_PIN_HEADER, str(until).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_pin)
+        finally:
+            _request.reset(token)
+
+
+def _pinned_until(scope) -> float:
+    name = settings.READ_YOUR_WRITES_COOKIE.encode()
+    until = 0.0
+    for key, value in scope.get("headers", ()):
+        if key == _PIN_HEADER:
+            until = max(until, _parse_pin(value))
+        elif key == b"cookie":
+            for part in value.split(b";"):
+                k, _, v = part.strip().partition(b"=")
+                if k == name:
+                    until = max(until, _parse_pin(v))
+    # both come from the client; don't let one pin itself to the primary for longer than a write would
+    return min(until, _pin_expiry())
+
+
+def _parse_pin(value: bytes) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return 0.0
+
+
+def _pin_expiry() -> int:
+    return int(time.time() + settings.READ_YOUR_WRITES_SECONDS) + 1
+
+
+def _pin_cookie(until: int) -> str:
+    parts = [
+        f"{settings.READ_YOUR_WRITES_COOKIE}={until}",
+        f"Max-Age={int(settings.READ_YOUR_WRITES_SECONDS) + 1}",
+        "Path=/",
+        "HttpOnly",
+        f"SameSite={settings.COOKIE_SAMESITE}",
+    ]
+    if settings.COOKIE_DOMAIN:
+        parts.append(f"Domain={settings.COOKIE_DOMAIN}")
+    if settings.COOKIE_SECURE:
+        parts.append("Secure")
+    return "; ".join(parts)
@@ -0,0 +1,241 @@
+"""
+Revoked access tokens, so valid ones can be accepted without a query.
+
+Access tokens live ACCESS_TOKEN_EXPIRE_MINUTES and sessions rarely end
+before that, yet get_current_user looks the session up (on a session cache
+miss) just to catch the few that did. With AUTH_STATELESS it asks this
+module first. The session cache relies on it too, so a cached session
+revoked on another worker stops working after the next poll rather than
+when the cache entry expires:
+
+- logout, logout-all, password reset and the expiry sweeper publish() what
+  they revoke into revoked_tokens, in the same transaction as the session
+  delete: one row per JTI, or a user-wide epoch (jti NULL) meaning "every
+  token of this user issued before revoked_at"
+- every worker keeps the live rows in memory: JTIs in a Bloom filter,
+  rebuilt every REVOCATION_REBUILD_SECONDS, plus an exact set of those
+  published since the last rebuild, and epochs in a dict. A poll every
+  REVOCATION_POLL_SECONDS picks up other workers' rows; this worker's own
+  apply right after their commit
+- check() says True when a token's JTI misses the filter and it was issued
+  after its user's epoch: authenticated, no query. False (revoked, or one
+  of the ~1% Bloom false positives at 10 bits per entry) sends the request
+  down the usual session lookup, which has the final word
+
+A row only matters until every access token it can cover has expired, and
+the sweeper drops it after that, so the filter only ever holds the last
+ACCESS_TOKEN_EXPIRE_MINUTES of revocations.
+
+Revocations from other workers are seen after the next poll. When polling
+has failed for REVOCATION_MAX_STALE_SECONDS, check() returns None and every
+token is looked up in the database again until a poll succeeds.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+
+from sqlalchemy import Connection, event, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.background import PeriodicWorker
+from app.core.database import SessionLocal
+from app.core.settings import settings
+from app.models.revocation import RevokedToken
+
+# commits can land with a revoked_at a little older than the newest one already seen
+_LATE_COMMIT_SLACK = timedelta(seconds=60)
+# iat is whole seconds from whichever server issued the token; tokens issued
+# this close after an epoch are checked in the database rather than trusted
+_CLOCK_SKEW_SECONDS = 5.0
+# decode_token's leeway, and then some
+_EXPIRY_SLACK = timedelta(seconds=60)
+
+
+def coverage() -> timedelta:
+    """How long a revocation can matter: the longest an access token issued before it stays valid."""
+    return timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES) + _EXPIRY_SLACK
+
+
+class BloomFilter:
+    """Set of strings with false positives but no false negatives."""
+
+    __slots__ = ("size", "hashes", "bits")
+
+    def __init__(self, capacity: int, bits_per_entry: int = 10):
+        self.size = max(64, capacity * bits_per_entry)
+        self.hashes = max(1, round(bits_per_entry * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> list[int]:
+        # double hashing: k positions from one 128-bit digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        a = int.from_bytes(digest[:8], "little")
+        b = int.from_bytes(digest[8:], "little") | 1
+        return [(a + i * b) % self.size for i in range(self.hashes)]
+
+    def add(self, key: str) -> None:
+        for p in self._positions(key):
+            self.bits[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+
+class RevocationList:
+    def __init__(self, interval: float):
+        self._bloom = BloomFilter(0)
+        self._recent: dict[str, float] = {}  # jti -> when it was added (monotonic)
+        self._epochs: dict[int, float] = {}  # user_id -> tokens with an iat below this may be revoked
+        self._lock = threading.Lock()
+        self._watermark: datetime | None = None
+        self._loaded_at = 0.0
+        self._synced_at: float | None = None
+        self.loaded = False
+        self.passes = 0
+        self.hits = 0
+        self.unknown = 0
+        self._worker = PeriodicWorker("revocation-poll", interval, self.refresh, run_on_stop=False)
+
+    @property
+    def fresh(self) -> bool:
+        synced = self._synced_at
+        return synced is not None and time.monotonic() - synced <= settings.REVOCATION_MAX_STALE_SECONDS
+
+    def check(self, user_id: int, jti: str, iat: int | None) -> bool | None:
+        """
+        True: not revoked as of the last poll. False: may be revoked (ask
+        the database). None: no verdict, the list is stale or the token
+        has no iat.
+        """
+        if iat is None or not self.fresh:
+            self.unknown += 1
+            return None
+        epoch = self._epochs.get(user_id)
+        if (epoch is not None and iat < epoch) or jti in self._recent or jti in self._bloom:
+            self.hits += 1
+            return False
+        self.passes += 1
+        return True
+
+    def add(self, user_id: int, jti: str | None, revoked_at: float) -> None:
+        """Apply one revocation locally; revoked_at is a Unix timestamp."""
+        with self._lock:
+            if jti is None:
+                epoch = revoked_at + _CLOCK_SKEW_SECONDS
+                if epoch > self._epochs.get(user_id, 0.0):
+                    self._epochs[user_id] = epoch
+            else:
+                self._recent[jti] = time.monotonic()
+
+    def _rows(self, since: datetime | None = None):
+        stmt = select(RevokedToken.user_id, RevokedToken.jti, RevokedToken.revoked_at).where(
+            RevokedToken.expires_at > datetime.now(timezone.utc)
+        )
+        if since is not None:
+            stmt = stmt.where(RevokedToken.revoked_at > since)
+        with SessionLocal() as db:
+            return db.execute(stmt).all()
+
+    def load(self) -> int:
+        """Rebuild the filter from every live row; checks keep using the old one meanwhile."""
+        started = time.monotonic()
+        rows = self._rows()
+        jtis = [r.jti for r in rows if r.jti is not None]
+        bloom = BloomFilter(len(jtis), settings.REVOCATION_BLOOM_BITS_PER_ENTRY)
+        for jti in jtis:
+            bloom.add(jti)
+        epochs: dict[int, float] = {}
+        for r in rows:
+            if r.jti is None:
+                epochs[r.user_id] = max(epochs.get(r.user_id, 0.0), r.revoked_at.timestamp() + _CLOCK_SKEW_SECONDS)
+
+        oldest_live = time.time() - coverage().total_seconds()
+        with self._lock:
+            # keep what this worker published while the SELECT ran, and epochs still in force
+            recent = {j: t for j, t in self._recent.items() if t >= started}
+            for user_id, epoch in self._epochs.items():
+                if epoch >= oldest_live and epoch > epochs.get(user_id, 0.0):
+                    epochs[user_id] = epoch
+            self._bloom, self._recent, self._epochs = bloom, recent, epochs
+            self._watermark = max((r.revoked_at for r in rows), default=self._watermark)
+            self._loaded_at = self._synced_at = time.monotonic()
+            self.loaded = True
+        return len(rows)
+
+    def refresh(self) -> int:
+        """Apply rows published since the last look; rebuild when it's time."""
+        due = time.monotonic() - self._loaded_at >= settings.REVOCATION_REBUILD_SECONDS
+        if not self.loaded or due or len(self._recent) > settings.REVOCATION_RECENT_MAX:
+            return self.load()
+        since = self._watermark - _LATE_COMMIT_SLACK if self._watermark is not None else None
+        rows = self._rows(since)
+        for r in rows:
+            self.add(r.user_id, r.jti, r.revoked_at.timestamp())
+        with self._lock:
+            self._watermark = max((r.revoked_at for r in rows), default=self._watermark)
+            self._synced_at = time.monotonic()
+        return len(rows)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "passes": self.passes,
+                "hits": self.hits,
+                "unknown": self.unknown,
+                "recent": len(self._recent),
+                "epochs": len(self._epochs),
+                "bloom_bits": self._bloom.size,
+            }
+
+    def start(self) -> None:
+        self._worker.start()
+
+    def stop(self) -> None:
+        self._worker.stop()
+
+
+revocations = RevocationList(interval=settings.REVOCATION_POLL_SECONDS)
+
+
+def publish(db: Session, user_id: int, jtis: Iterable[str] | None = None) -> None:
+    """
+    Record revoked sessions in db's transaction: the given JTIs, or with
+    jtis=None every token of the user issued until now. This worker applies
+    them right after the commit; others on their next poll.
+    """
+    now = datetime.now(timezone.utc)
+    expires = now + coverage()
+    revoked = [None] if jtis is None else list(jtis)
+    db.add_all(RevokedToken(user_id=user_id, jti=jti, revoked_at=now, expires_at=expires) for jti in revoked)
+    pending = db.info.setdefault("revocations_pending", [])
+    pending += [(user_id, jti, now.timestamp()) for jti in revoked]
+
+
+def publish_sessions(conn: Connection, rows: Iterable[tuple[int, str]]) -> None:
+    """publish() for (user_id, jti) pairs on a Core connection; applied locally right away."""
+    now = datetime.now(timezone.utc)
+    values = [
+        {"user_id": user_id, "jti": jti, "revoked_at": now, "expires_at": now + coverage()}
+        for user_id, jti in rows
+    ]
+    if not values:
+        return
+    conn.execute(insert(RevokedToken), values)
+    # a rollback leaves extra entries here, which only costs those tokens a lookup
+    for v in values:
+        revocations.add(v["user_id"], v["jti"], now.timestamp())
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_published(db: Session) -> None:
+    for user_id, jti, revoked_at in db.info.pop("revocations_pending", ()):
+        revocations.add(user_id, jti, revoked_at)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_published(db: Session) -> None:
+    db.info.pop("revocations_pending", None)
@@ -0,0 +1,261 @@
+"""
+Daily and weekly progress rollups (app.models.rollup).
+
+Daily rows are the source of truth for weekly ones:
+
+- set changes add or subtract their volume / set counts on the daily rows
+  (one grouped upsert, see apply_sets); callers go through app.core.set_hooks
+- log changes rewrite the weight / intake / target columns of the daily rows
+  from the changed day on, the same window replay_from() recomputes
+- every touched week is then re-summed from its (at most 7) daily rows
+
+A full rebuild from the raw tables, for repairs:
+
+    python -m app.core.rollups [--user ID]
+"""
+import argparse
+from datetime import date, timedelta
+from typing import Iterable
+
+from sqlalchemy import Date, and_, case, cast, delete, func, literal_column, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.core.tdee import compute_tdee, GOAL_ADJUSTMENTS
+from app.models.log import IntakeLog, TdeeCheckpoint, WeightLog
+from app.models.rollup import DailyMuscleRollup, DailyRollup, WeeklyMuscleRollup, WeeklyRollup
+from app.models.user import User
+from app.models.workout import Exercise, WorkoutSet
+
+OTHER_MUSCLE_GROUP = "other"
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+# constants are inlined (not bound) so the same expression can sit in SELECT and GROUP BY
+
+def _set_day():
+    return cast(func.timezone(literal_column("'UTC'"), WorkoutSet.performed_at), Date)
+
+
+def _week(col):
+    return cast(func.date_trunc(literal_column("'week'"), col), Date)
+
+
+# ---------- sets ----------
+
+def _set_deltas(set_filter, sign: int, muscle: bool):
+    day = _set_day()
+    cols = [WorkoutSet.user_id, day]
+    if muscle:
+        cols.append(func.coalesce(Exercise.muscle_group, literal_column(f"'{OTHER_MUSCLE_GROUP}'")))
+    stmt = select(
+        *cols,
+        (sign * func.sum(WorkoutSet.reps * WorkoutSet.weight_kg)),
+        (sign * func.count()),
+    ).where(set_filter)
+    if muscle:
+        stmt = stmt.join(Exercise, Exercise.id == WorkoutSet.exercise_id)
+    return stmt.group_by(*cols)
+
+
+def _add_daily(db: Session, set_filter, sign: int) -> set[date]:
+    stmt = insert(DailyRollup).from_select(
+        ["user_id", "day", "volume_kg", "set_count"], _set_deltas(set_filter, sign, muscle=False)
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyRollup.user_id, DailyRollup.day],
+        set_={
+            "volume_kg": DailyRollup.volume_kg + stmt.excluded.volume_kg,
+            "set_count": DailyRollup.set_count + stmt.excluded.set_count,
+        },
+    ).returning(DailyRollup.day)
+    days = set(db.execute(stmt).scalars())
+
+    stmt = insert(DailyMuscleRollup).from_select(
+        ["user_id", "day", "muscle_group", "volume_kg", "set_count"], _set_deltas(set_filter, sign, muscle=True)
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyMuscleRollup.user_id, DailyMuscleRollup.day, DailyMuscleRollup.muscle_group],
+        set_={
+            "volume_kg": DailyMuscleRollup.volume_kg + stmt.excluded.volume_kg,
+            "set_count": DailyMuscleRollup.set_count + stmt.excluded.set_count,
+        },
+    )
+    db.execute(stmt)
+    return days
+
+
+def apply_sets(db: Session, user_id: int, set_ids: Iterable[int], sign: int) -> None:
+    """
+    Add (sign=1, after insert/update) or remove (sign=-1, before update/delete)
+    the given sets' contribution to the user's rollups. Doesn't commit.
+    """
+    set_ids = list(set_ids)
+    if not set_ids:
+        return
+    days = _add_daily(db, and_(WorkoutSet.user_id == user_id, WorkoutSet.id.in_(set_ids)), sign)
+    if sign < 0:
+        db.execute(
+            delete(DailyMuscleRollup).where(
+                DailyMuscleRollup.user_id == user_id,
+                DailyMuscleRollup.day.in_(days),
+                DailyMuscleRollup.set_count <= 0,
+            )
+        )
+    refresh_weeks(db, user_id, {week_start(d) for d in days})
+
+
+# ---------- weight / intake ----------
+
+def _target_factor(user: User) -> tuple[float | None, float]:
+    """(formula TDEE fallback, goal multiplier) for turning a day's TDEE into a target."""
+    result = compute_tdee(
+        weight_kg=[user.weight_kg],
+        height_cm=[user.height_cm],
+        age=[user.age],
+        sex=[user.sex],
+        activity_level=[user.activity_level],
+        goal=[user.goal],
+    )
+    tdee = result["tdee"][0]
+    fallback = None if tdee != tdee else float(tdee)  # NaN
+    return fallback, 1.0 + GOAL_ADJUSTMENTS.get((user.goal or "").strip().lower(), 0.0)
+
+
+def apply_logs(db: Session, user_id: int, since: date) -> None:
+    """
+    Rewrite body weight, intake and target on daily rows >= since from the
+    logs and the adaptive TDEE checkpoints (call after replay_from(since)).
+    A day's target is that day's adaptive estimate, or the formula TDEE
+    while there isn't one yet, adjusted for the goal. Doesn't commit.
+    """
+    user = db.get(User, user_id)
+    fallback, factor = _target_factor(user)
+
+    db.execute(
+        update(DailyRollup)
+        .where(DailyRollup.user_id == user_id, DailyRollup.day >= since)
+        .values(weight_kg=None, intake_kcal=None, target_kcal=None)
+    )
+    cp = TdeeCheckpoint
+    target = case(
+        (IntakeLog.kcal.isnot(None), func.coalesce(cp.estimate, fallback) * factor),
+        else_=None,
+    )
+    src = (
+        select(cp.user_id, cp.day, WeightLog.weight_kg, IntakeLog.kcal, target)
+        .outerjoin(WeightLog, and_(WeightLog.user_id == cp.user_id, WeightLog.logged_on == cp.day))
+        .outerjoin(IntakeLog, and_(IntakeLog.user_id == cp.user_id, IntakeLog.logged_on == cp.day))
+        .where(cp.user_id == user_id, cp.day >= since)
+    )
+    stmt = insert(DailyRollup).from_select(["user_id", "day", "weight_kg", "intake_kcal", "target_kcal"], src)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyRollup.user_id, DailyRollup.day],
+        set_={
+            "weight_kg": stmt.excluded.weight_kg,
+            "intake_kcal": stmt.excluded.intake_kcal,
+            "target_kcal": stmt.excluded.target_kcal,
+        },
+    )
+    db.execute(stmt)
+    refresh_weeks(db, user_id, since=week_start(since))
+
+
+# ---------- weeks ----------
+
+def refresh_weeks(db: Session, user_id: int, weeks: set[date] | None = None, since: date | None = None) -> None:
+    """Re-sum the given weeks (or every week from `since` on) from the daily rows."""
+    if weeks is not None and not weeks:
+        return
+    d = DailyRollup
+    week = _week(d.day)
+    in_scope = [d.user_id == user_id]
+    if weeks is not None:
+        in_scope.append(week.in_(weeks))
+    if since is not None:
+        in_scope.append(d.day >= since)
+
+    tol = settings.ROLLUP_ADHERENCE_TOLERANCE
+    has_intake = d.intake_kcal.isnot(None)
+    src = (
+        select(
+            d.user_id,
+            week,
+            func.sum(d.volume_kg),
+            func.sum(d.set_count),
+            func.avg(d.weight_kg),
+            func.count(d.weight_kg),
+            func.coalesce(func.sum(d.intake_kcal), 0),
+            func.coalesce(func.sum(d.target_kcal).filter(has_intake), 0),
+            func.count(d.intake_kcal),
+            func.count().filter(func.abs(d.intake_kcal - d.target_kcal) <= d.target_kcal * tol),
+        )
+        .where(*in_scope)
+        .group_by(d.user_id, week)
+    )
+    cols = [
+        "user_id", "week_start", "volume_kg", "set_count", "weight_avg_kg", "weight_days",
+        "intake_kcal", "target_kcal", "intake_days", "on_target_days",
+    ]
+    stmt = insert(WeeklyRollup).from_select(cols, src)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[WeeklyRollup.user_id, WeeklyRollup.week_start],
+        set_={c: getattr(stmt.excluded, c) for c in cols[2:]},
+    )
+    db.execute(stmt)
+
+    m = DailyMuscleRollup
+    m_week = _week(m.day)
+    m_scope = [m.user_id == user_id]
+    w_scope = [WeeklyMuscleRollup.user_id == user_id]
+    if weeks is not None:
+        m_scope.append(m_week.in_(weeks))
+        w_scope.append(WeeklyMuscleRollup.week_start.in_(weeks))
+    if since is not None:
+        m_scope.append(m.day >= since)
+        w_scope.append(WeeklyMuscleRollup.week_start >= since)
+    db.execute(delete(WeeklyMuscleRollup).where(*w_scope))
+    db.execute(
+        insert(WeeklyMuscleRollup).from_select(
+            ["user_id", "week_start", "muscle_group", "set_count", "volume_kg"],
+            select(m.user_id, m_week, m.muscle_group, func.sum(m.set_count), func.sum(m.volume_kg))
+            .where(*m_scope)
+            .group_by(m.user_id, m_week, m.muscle_group)
+            .having(func.sum(m.set_count) > 0),
+        )
+    )
+
+
+# ---------- repair ----------
+
+def rebuild(db: Session, user_id: int) -> None:
+    """Drop and recompute every rollup row of one user from the raw tables. Doesn't commit."""
+    for model in (WeeklyMuscleRollup, WeeklyRollup, DailyMuscleRollup, DailyRollup):
+        db.execute(delete(model).where(model.user_id == user_id))
+    _add_daily(db, WorkoutSet.user_id == user_id, 1)
+    apply_logs(db, user_id, date.min)
+    refresh_weeks(db, user_id, since=date.min)
+
+
+def main() -> None:
+    from app.core.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild progress rollups from workout sets and logs")
+    parser.add_argument("--user", type=int, action="append", help="only these user ids (repeatable)")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        user_ids = args.user or db.execute(select(User.id).order_by(User.id)).scalars().all()
+        for uid in user_ids:
+            rebuild(db, uid)
+            # one transaction per user keeps locks short
+            db.commit()
+        print(f"rebuilt rollups for {len(user_ids)} user(s)")
+
+
+if __name__ == "__main__":
+    main()
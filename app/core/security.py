@@ -1,8 +1,19 @@
-from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from functools import lru_cache
+from typing import Callable, TypeVar
+
+from fastapi import HTTPException, status
+
+from app.core.metrics import password_hash_duration, password_hash_queue_wait
+from app.core.settings import settings
+
+T = TypeVar("T")
 
 # OWASP-friendly starting params (tune later after perf testing)
-ph = PasswordHasher(
+ARGON2_PARAMS = dict(
     time_cost=3,         # iterations
     memory_cost=131072,  # KiB (128 MiB)
     parallelism=2,
@@ -10,17 +21,171 @@ ph = PasswordHasher(
     salt_len=16,
 )
 
-def hash_password(password: str) -> str:
-    # returns a full hash string: $argon2id$v=19$m=...,t=...,p=...$<salt>$<hash>
-    return ph.hash(password)
 
-def verify_password(plain: str, hashed: str) -> bool:
+@lru_cache(maxsize=None)
+def get_hasher():
+    # imported on first use: workers that never hash don't load argon2-cffi
+    from argon2 import PasswordHasher
+
+    return PasswordHasher(**ARGON2_PARAMS)
+
+
+class HashingPool:
+    """
+    Dedicated executor for Argon2 work.
+
+    Every hash/verify allocates memory_cost KiB, so the number of workers is
+    derived from a memory budget instead of the request threadpool size.
+    Callers beyond `max_queue` waiting jobs, or that wait longer than
+    `queue_timeout` seconds for a worker, get a 503 instead of piling up.
+    argon2-cffi releases the GIL, so threads are enough here.
+    """
+
+    def __init__(self, memory_budget_mb: int, per_hash_kib: int, max_queue: int, queue_timeout: float):
+        self.per_hash_kib = per_hash_kib
+        self.configure(memory_budget_mb, max_queue, queue_timeout)
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def configure(self, memory_budget_mb: int, max_queue: int, queue_timeout: float) -> None:
+        """Resize before first use (the app's lifespan calls this with the current settings)."""
+        if getattr(self, "_executor", None) is not None:
+            raise RuntimeError("hashing pool already started")
+        self.workers = max(1, (memory_budget_mb * 1024) // self.per_hash_kib)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="argon2")
+            return self._executor
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=True)
+
+    def _busy(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    def _call(self, submitted: float, fn: Callable[..., T], *args) -> T:
+        waited = time.monotonic() - submitted
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        password_hash_queue_wait.observe(waited)
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self.completed += 1
+
+    def submit(self, fn: Callable[..., T], *args):
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self.rejected += 1
+                raise self._busy()
+            self._queued += 1
+        try:
+            return self._get_executor().submit(self._call, time.monotonic(), fn, *args)
+        except RuntimeError:
+            with self._lock:
+                self._queued -= 1
+            raise
+
+    def _timed_out(self, future) -> None:
+        # Only give up if the job never started; once running, let it finish.
+        if future.cancel():
+            with self._lock:
+                self._queued -= 1
+                self.timeouts += 1
+            raise self._busy()
+
+    def run(self, fn: Callable[..., T], *args) -> T:
+        future = self.submit(fn, *args)
+        try:
+            return future.result(timeout=self.queue_timeout)
+        except FutureTimeout:
+            self._timed_out(future)
+            return future.result()
+
+    async def run_async(self, fn: Callable[..., T], *args) -> T:
+        # Same admission rules as run(), awaited instead of blocking a thread
+        future = self.submit(fn, *args)
+        try:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._timed_out(future)
+            return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            started = self.completed + self._running
+            return {
+                "workers": self.workers,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": (self._wait_total / started * 1000) if started else 0.0,
+                "wait_max_ms": self._wait_max * 1000,
+            }
+
+
+hashing_pool = HashingPool(
+    memory_budget_mb=settings.HASH_MEMORY_BUDGET_MB,
+    per_hash_kib=ARGON2_PARAMS["memory_cost"],
+    max_queue=settings.HASH_QUEUE_MAX,
+    queue_timeout=settings.HASH_QUEUE_TIMEOUT_SECONDS,
+)
+
+
+def _hash(password: str) -> str:
+    return get_hasher().hash(password)
+
+def _verify(plain: str, hashed: str) -> bool:
+    from argon2.exceptions import VerifyMismatchError
+
     try:
-        ph.verify(hashed, plain)
+        get_hasher().verify(hashed, plain)
         return True
     except VerifyMismatchError:
         return False
 
+def hash_password(password: str) -> str:
+    # returns a full hash string: $argon2id$v=19$m=...,t=...,p=...$<salt>$<hash>
+    with password_hash_duration.time("hash"):
+        return hashing_pool.run(_hash, password)
+
+def verify_password(plain: str, hashed: str) -> bool:
+    with password_hash_duration.time("verify"):
+        return hashing_pool.run(_verify, plain, hashed)
+
+async def hash_password_async(password: str) -> str:
+    with password_hash_duration.time("hash"):
+        return await hashing_pool.run_async(_hash, password)
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    with password_hash_duration.time("verify"):
+        return await hashing_pool.run_async(_verify, plain, hashed)
+
 def needs_rehash(hashed: str) -> bool:
     # if you later bump time_cost/memory_cost, this will tell you to re-hash
-    return ph.check_needs_rehash(hashed)
+    return get_hasher().check_needs_rehash(hashed)
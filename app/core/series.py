@@ -0,0 +1,86 @@
+"""
+Downsampling and smoothing for chart series.
+
+Both take plain NumPy arrays so the endpoint can feed them straight from a
+query result. LTTB has to pick buckets left to right (each choice depends on
+the previous one), so it loops once per *output* point with the work inside
+a bucket vectorized; cost follows the requested size, not the history.
+NumPy is imported on first call, like app.core.tdee.
+"""
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# block length for the EWMA power trick, shortened for large alpha so that
+# (1 - alpha) ** k stays above e**_EWMA_MIN_LOG_POWER (about 1e-150): no
+# underflow, and y / (1 - alpha) ** k stays far from overflow
+_EWMA_BLOCK = 256
+_EWMA_MIN_LOG_POWER = -345.0
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of `n_out` points (first and last
+    always kept) that best preserve the visual shape of y(x). `x` must be
+    increasing. Returns every index when the series is already small enough.
+    """
+    import numpy as np
+
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # bucket i (1..n_out-2) covers [edges[i-1], edges[i]) of the interior points
+    edges = np.floor(np.linspace(1, n - 1, n_out - 1)).astype(int)
+    # averages of every bucket at once; the last "next bucket" is the final point
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, x[-1])
+    avg_y = np.append(sums_y / counts, y[-1])
+
+    out = np.empty(n_out, dtype=int)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        bx, by = x[lo:hi], y[lo:hi]
+        cx, cy = avg_x[i + 1], avg_y[i + 1]
+        # twice the triangle area (a, candidate, next-bucket average)
+        area = np.abs((x[a] - cx) * (by - y[a]) - (x[a] - bx) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def ewma(y: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Exponentially weighted moving average, s[t] = s[t-1] + alpha * (y[t] - s[t-1]),
+    seeded with y[0]. Vectorized per block as a scaled cumulative sum.
+    """
+    import numpy as np
+
+    y = np.asarray(y, dtype=float)
+    out = np.empty_like(y)
+    if not len(y):
+        return out
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        out[:] = y  # alpha = 1: no smoothing
+        return out
+    size = max(1, min(_EWMA_BLOCK, int(_EWMA_MIN_LOG_POWER / math.log(decay)))) if decay < 1.0 else _EWMA_BLOCK
+    prev = y[0]
+    for start in range(0, len(y), size):
+        block = y[start:start + size]
+        k = np.arange(1, len(block) + 1)
+        powers = decay ** k
+        # s[k] = decay^k * prev + alpha * sum_{j<=k} decay^(k-j) * y[j]
+        out[start:start + len(block)] = powers * (prev + alpha * np.cumsum(block / powers))
+        prev = out[start + len(block) - 1]
+    return out
@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.settings import settings
+from app.models.user import User
+
+# never keep password hashes in the cache; loaded lazily if something asks
+_SNAPSHOT_EXCLUDE = {"hashed_password"}
+
+
+class SessionCache:
+    """
+    Bounded LRU + TTL cache of validated (user_id, jti) pairs.
+
+    An entry means "this session existed and belonged to this user when we
+    last checked", and holds a snapshot of the user's columns so
+    get_current_user can skip both the User and the Session lookup.
+
+    Anything that deletes sessions or changes the user row must call one
+    of the invalidate_* methods. That only reaches this worker: revocations
+    elsewhere are caught on a hit by get_current_user, through the
+    revocation feed (app.core.revocations) or a session lookup.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple[int, str], tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    def get(self, user_id: int, jti: str) -> dict | None:
+        if not self.enabled:
+            return None
+        key = (user_id, jti)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user_id: int, jti: str, user_snapshot: dict) -> None:
+        if not self.enabled:
+            return
+        key = (user_id, jti)
+        expires = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires, user_snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: int, jti: str) -> None:
+        with self._lock:
+            self._entries.pop((user_id, jti), None)
+
+    def invalidate_user(self, user_id: int) -> None:
+        # drops every session of the user (logout-all, password reset, profile changes)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+
+session_cache = SessionCache(
+    max_size=settings.SESSION_CACHE_SIZE,
+    ttl_seconds=settings.SESSION_CACHE_TTL_SECONDS,
+)
+
+
+def snapshot_user(user: User) -> dict:
+    return {
+        c.key: getattr(user, c.key)
+        for c in User.__table__.columns
+        if c.key not in _SNAPSHOT_EXCLUDE
+    }
+
+
+def user_from_snapshot(snapshot: dict) -> User:
+    # Rebuild the row as a detached instance; callers merge(load=False) it into
+    # their session to get a normal persistent User without a SELECT
+    # (excluded columns load on access).
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return user
@@ -1,15 +1,165 @@
+import logging
+import random
+import time
 from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import BigInteger, Connection, Integer, column, delete, func, or_, select, text, update, values
 from sqlalchemy.orm import Session as OrmSession
+
+from app.core.background import PeriodicWorker
+from app.core.database import get_engine
+from app.core.revocations import coverage, publish_sessions
+from app.core.session_cache import session_cache
+from app.core.settings import settings
+from app.models.revocation import RevokedToken
 from app.models.session import Session as SessionModel
+from app.models.sync import SyncTombstone
+from app.models.token import EmailVerificationToken, PasswordResetToken
+from app.models.user import User
 
-SESSION_TTL_DAYS = 30
+log = logging.getLogger(__name__)
 
+# arbitrary constant so only one worker sweeps at a time
+_SWEEP_LOCK_KEY = 0x66645F7377656570  # "fd_sweep"
 
-def cleanup_old_sessions(db: OrmSession) -> None:
-    cutoff = datetime.now(timezone.utc) - timedelta(days=SESSION_TTL_DAYS)
-    (
-        db.query(SessionModel)
-        .filter(SessionModel.last_seen_at < cutoff)
-        .delete(synchronize_session=False)
+
+def _purge(conn: Connection, model, condition, *, batch_size: int, pause: float, on_deleted=None, returning=()) -> dict:
+    """
+    DELETE ... WHERE id IN (SELECT id ... LIMIT batch_size) until nothing is
+    left, committing after each batch and sleeping (with jitter) in between,
+    so no single statement holds row locks on a hot table for long.
+
+    on_deleted(conn, rows) gets the `returning` columns of each batch and runs
+    inside that batch's transaction.
+    """
+    rows = batches = 0
+    slowest = 0.0
+    started = time.perf_counter()
+    while True:
+        ids = select(model.id).where(condition).limit(batch_size).scalar_subquery()
+        stmt = delete(model).where(model.id.in_(ids))
+        if on_deleted is not None:
+            stmt = stmt.returning(*returning)
+
+        t0 = time.perf_counter()
+        result = conn.execute(stmt)
+        deleted = result.all() if on_deleted is not None else None
+        if deleted:
+            on_deleted(conn, deleted)
+        conn.commit()
+        slowest = max(slowest, time.perf_counter() - t0)
+
+        n = len(deleted) if deleted is not None else result.rowcount
+        rows += n
+        batches += 1
+        if n < batch_size:
+            break
+        if pause:
+            time.sleep(pause * random.uniform(0.5, 1.5))
+
+    return {
+        "rows": rows,
+        "batches": batches,
+        "max_batch_ms": round(slowest * 1000, 2),
+        "total_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def _forget_sessions(conn: Connection, deleted) -> None:
+    # a session idle for longer than an access token lives has none left to revoke
+    live_since = datetime.now(timezone.utc) - coverage()
+    for user_id, jti, _ in deleted:
+        session_cache.invalidate(user_id, jti)
+    publish_sessions(conn, [(user_id, jti) for user_id, jti, last_seen in deleted if last_seen >= live_since])
+
+
+def _raise_sync_floors(conn: Connection, deleted) -> None:
+    # cursors below a purged tombstone can no longer be served incrementally
+    floors: dict[int, int] = {}
+    for user_id, seq in deleted:
+        floors[user_id] = max(floors.get(user_id, 0), seq)
+    v = values(column("user_id", Integer), column("seq", BigInteger), name="floors").data(list(floors.items()))
+    conn.execute(
+        update(User)
+        .where(User.id == v.c.user_id)
+        .values(sync_floor=func.greatest(User.sync_floor, v.c.seq))
     )
-    db.commit()
+
+
+def sweep_expired(conn: Connection, *, batch_size: int | None = None, pause: float | None = None) -> dict:
+    """Purge idle sessions, used/expired one-time tokens, old sync tombstones and revocations; returns per-table stats."""
+    batch_size = batch_size or settings.SWEEP_BATCH_SIZE
+    pause = settings.SWEEP_PAUSE_SECONDS if pause is None else pause
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(days=settings.SESSION_TTL_DAYS)
+
+    report = {
+        "sessions": _purge(
+            conn, SessionModel, SessionModel.last_seen_at < cutoff,
+            batch_size=batch_size, pause=pause,
+            on_deleted=_forget_sessions, returning=(SessionModel.user_id, SessionModel.jti, SessionModel.last_seen_at),
+        ),
+        "sync_tombstones": _purge(
+            conn, SyncTombstone,
+            SyncTombstone.created_at < now - timedelta(days=settings.SYNC_TOMBSTONE_TTL_DAYS),
+            batch_size=batch_size, pause=pause,
+            on_deleted=_raise_sync_floors, returning=(SyncTombstone.user_id, SyncTombstone.change_seq),
+        ),
+        "revoked_tokens": _purge(
+            conn, RevokedToken, RevokedToken.expires_at < now,
+            batch_size=batch_size, pause=pause,
+        ),
+    }
+    for model in (EmailVerificationToken, PasswordResetToken):
+        report[model.__tablename__] = _purge(
+            conn, model, or_(model.used_at.isnot(None), model.expires_at < now),
+            batch_size=batch_size, pause=pause,
+        )
+    return report
+
+
+def cleanup_old_sessions(db: OrmSession) -> None:
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.SESSION_TTL_DAYS)
+    # batches commit on their own, so use a separate connection from db's pool
+    with db.get_bind().connect() as conn:
+        _purge(
+            conn, SessionModel, SessionModel.last_seen_at < cutoff,
+            batch_size=settings.SWEEP_BATCH_SIZE, pause=settings.SWEEP_PAUSE_SECONDS,
+            on_deleted=_forget_sessions, returning=(SessionModel.user_id, SessionModel.jti, SessionModel.last_seen_at),
+        )
+
+
+class ExpirySweeper:
+    """Runs sweep_expired every SWEEP_INTERVAL_SECONDS in one worker at a time."""
+
+    def __init__(self, interval: float):
+        self.last_report: dict | None = None
+        self._worker = PeriodicWorker("expiry-sweeper", interval, self.run, run_on_stop=False)
+
+    def run(self) -> dict | None:
+        with get_engine().connect() as conn:
+            if conn.dialect.name == "postgresql":
+                got_lock = conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": _SWEEP_LOCK_KEY}).scalar()
+                conn.commit()
+                if not got_lock:
+                    return None  # another worker is sweeping
+            try:
+                report = sweep_expired(conn)
+            finally:
+                if conn.dialect.name == "postgresql":
+                    conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": _SWEEP_LOCK_KEY})
+                    conn.commit()
+
+        self.last_report = report
+        if any(r["rows"] for r in report.values()):
+            log.info("expiry sweep: %s", report)
+        return report
+
+    def start(self) -> None:
+        self._worker.start()
+
+    def stop(self) -> None:
+        self._worker.stop()
+
+
+expiry_sweeper = ExpirySweeper(interval=settings.SWEEP_INTERVAL_SECONDS)
@@ -0,0 +1,27 @@
+"""
+Single place where everything derived from workout_sets hears about changes.
+
+Routers and the bulk ingest call these inside the write transaction:
+
+- sets_added(ids) after new rows are flushed, or after an update is flushed
+- sets_removing(ids) before rows are deleted, or before they are updated
+
+so an edit is "removing" + update + "added".
+"""
+from typing import Iterable
+
+from sqlalchemy.orm import Session
+
+from app.core import records, rollups
+
+
+def sets_added(db: Session, user_id: int, set_ids: Iterable[int]) -> None:
+    set_ids = list(set_ids)
+    rollups.apply_sets(db, user_id, set_ids, 1)
+    records.apply_added(db, user_id, set_ids)
+
+
+def sets_removing(db: Session, user_id: int, set_ids: Iterable[int]) -> None:
+    set_ids = list(set_ids)
+    rollups.apply_sets(db, user_id, set_ids, -1)
+    records.apply_removing(db, user_id, set_ids)
@@ -0,0 +1,143 @@
+"""
+Per-user change feed for offline clients (GET /sync, POST /sync/push).
+
+Every write to a synced row stamps it with a change number from the user's
+own counter (users.sync_seq), and deletes leave a tombstone with one. The
+counter is bumped with an UPDATE on the user's row, which holds the row lock
+until commit, so a user's changes become visible in number order and a
+client that has seen everything up to N never misses a later commit below N.
+
+A client keeps the highest number it has applied as its cursor and asks for
+everything above it: cost follows the number of changes, not the history.
+Old tombstones are purged by the expiry sweeper; a cursor older than the
+newest purged one (users.sync_floor) gets a full resync instead.
+
+A full sync can take several pages. Its cursors are positions in the
+snapshot and may well sit below the floor, so each page also returns a
+snapshot token (the counter when the snapshot started) to send back with
+them. The snapshot only needs the deletes made after it started, so it is
+restarted only if the floor passes that point, not its position.
+"""
+from typing import Iterable
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.log import IntakeLog, WeightLog
+from app.models.sync import SyncTombstone
+from app.models.user import User
+from app.models.workout import Workout, WorkoutSet
+from app.schemas.log import IntakeLogOut, WeightLogOut
+from app.schemas.user import UserOut
+from app.schemas.workout import SetOut, WorkoutOut
+
+# entity name -> (model, schema); tombstone keys are ids, or the day for logs
+ENTITIES = {
+    "workout": (Workout, WorkoutOut),
+    "set": (WorkoutSet, SetOut),
+    "weight": (WeightLog, WeightLogOut),
+    "intake": (IntakeLog, IntakeLogOut),
+}
+
+
+def reserve(db: Session, user_id: int, n: int = 1) -> int:
+    """
+    Reserve `n` consecutive change numbers for the user and return the first.
+    Takes the user's row lock until the transaction ends. Doesn't commit.
+    """
+    last = db.execute(
+        update(User)
+        .where(User.id == user_id)
+        # updated_at stays: it means "profile changed", and onupdate would bump it on every write
+        .values(sync_seq=User.sync_seq + n, updated_at=User.updated_at)
+        .returning(User.sync_seq)
+        .execution_options(synchronize_session=False)
+    ).scalar_one()
+    return last - n + 1
+
+
+def touch_profile(db: Session, user_id: int) -> int:
+    """Mark the user's own row (profile, adaptive TDEE) as changed."""
+    seq = reserve(db, user_id)
+    db.execute(
+        update(User).where(User.id == user_id).values(change_seq=seq).execution_options(synchronize_session=False)
+    )
+    return seq
+
+
+def tombstone(db: Session, user_id: int, entity: str, keys: Iterable) -> None:
+    """Record deletions (row ids, or days for logs), one change number each."""
+    keys = [str(k) for k in keys]
+    if not keys:
+        return
+    first = reserve(db, user_id, len(keys))
+    db.execute(
+        insert(SyncTombstone),
+        [
+            {"user_id": user_id, "entity": entity, "key": k, "change_seq": first + i}
+            for i, k in enumerate(keys)
+        ],
+    )
+
+
+def changes_since(db: Session, user_id: int, since: int | None, limit: int, snapshot: int | None = None) -> dict:
+    """
+    Up to `limit` changes with a number above `since` (everything when None),
+    oldest first; `snapshot` is the token of the full sync `since` came from. Each table contributes at most limit + 1 rows through its
+    (user_id, change_seq) index, then the lists are merged.
+
+    The tables are read by separate statements, each with its own snapshot
+    under READ COMMITTED, so every read is capped at the sync_seq committed
+    when the first one ran: everything up to it is committed (see above),
+    and anything a push commits meanwhile waits for the next pull instead of
+    showing up in one table but not another.
+    """
+    change_seq, floor, upto = db.execute(
+        select(User.change_seq, User.sync_floor, User.sync_seq).where(User.id == user_id)
+    ).one()
+    if since is None:
+        snapshot = None
+    # tombstones up to the floor are gone; a snapshot in progress only needs those after its start
+    reset = since is not None and (snapshot if snapshot is not None else since) < floor
+    if reset:
+        since = snapshot = None
+
+    def newer(model):
+        stmt = select(model).where(model.user_id == user_id, model.change_seq <= upto)
+        if since is not None:
+            stmt = stmt.where(model.change_seq > since)
+        return db.execute(stmt.order_by(model.change_seq).limit(limit + 1)).scalars().all()
+
+    found = []
+    for entity, (model, schema) in ENTITIES.items():
+        for row in newer(model):
+            found.append((row.change_seq, entity, "upsert", schema.model_validate(row).model_dump(mode="json")))
+    # the first page of a full sync: nothing to delete on the client yet
+    if since is not None:
+        for t in newer(SyncTombstone):
+            found.append((t.change_seq, t.entity, "delete", {"key": t.key}))
+
+    found.sort(key=lambda c: c[0])
+    page = found[:limit]
+    has_more = len(found) > limit
+
+    out = {
+        "reset": reset,
+        "changes": [{"seq": seq, "entity": e, "op": op, "data": data} for seq, e, op, data in page],
+        "profile": None,
+    }
+    if since is None or change_seq > since:
+        user = db.get(User, user_id, populate_existing=True)
+        out["profile"] = UserOut.model_validate(user).model_dump(mode="json")
+
+    if page:
+        out["cursor"] = page[-1][0]
+    else:
+        out["cursor"] = since if since is not None else 0
+    if not has_more:
+        # everything up to the cap has been seen, the profile included
+        out["cursor"] = max(out["cursor"], upto)
+    elif since is None or snapshot is not None:
+        out["snapshot"] = upto if snapshot is None else snapshot
+    out["has_more"] = has_more
+    return out
@@ -0,0 +1,132 @@
+"""
+BMR / TDEE engine.
+
+Everything works column-wise on NumPy arrays, so scoring one profile or the
+whole user table is the same single pass. Missing or unknown inputs give NaN
+in that row instead of raising; callers turn NaN into None.
+
+NumPy is imported on first use rather than with the module, which keeps it
+out of app startup.
+"""
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, Sequence
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Standard activity factors applied to BMR
+ACTIVITY_MULTIPLIERS = {
+    "sedentary": 1.2,
+    "light": 1.375,
+    "moderate": 1.55,
+    "active": 1.725,
+    "athlete": 1.9,
+}
+
+# Calorie target relative to TDEE
+GOAL_ADJUSTMENTS = {
+    "cut": -0.20,
+    "maintain": 0.0,
+    "bulk": 0.10,
+}
+
+SEX_OFFSETS = {"male": 5.0, "female": -161.0}
+
+
+def _as_float(values: Sequence[float | None]) -> np.ndarray:
+    import numpy as np
+
+    return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+
+def _lookup(values: Sequence[str | None], table: dict[str, float]) -> np.ndarray:
+    import numpy as np
+
+    # map the distinct labels once, then broadcast back over the column
+    labels = np.array([(v or "").strip().lower() for v in values], dtype=object)
+    if labels.size == 0:
+        return np.empty(0)
+    uniq, inverse = np.unique(labels, return_inverse=True)
+    mapped = np.array([table.get(u, np.nan) for u in uniq], dtype=float)
+    return mapped[inverse]
+
+
+def mifflin_st_jeor(weight_kg: np.ndarray, height_cm: np.ndarray, age: np.ndarray, sex_offset: np.ndarray) -> np.ndarray:
+    return 10.0 * weight_kg + 6.25 * height_cm - 5.0 * age + sex_offset
+
+
+def katch_mcardle(weight_kg: np.ndarray, body_fat_pct: np.ndarray) -> np.ndarray:
+    lean_mass = weight_kg * (1.0 - body_fat_pct / 100.0)
+    return 370.0 + 21.6 * lean_mass
+
+
+def compute_tdee(
+    *,
+    weight_kg: Sequence[float | None],
+    height_cm: Sequence[float | None],
+    age: Sequence[float | None],
+    sex: Sequence[str | None],
+    activity_level: Sequence[str | None],
+    goal: Sequence[str | None],
+    body_fat_pct: Sequence[float | None] | None = None,
+) -> dict[str, np.ndarray]:
+    """
+    Score N profiles at once. Katch-McArdle is used where body_fat_pct is
+    known (it needs no height/age/sex), Mifflin-St Jeor everywhere else.
+
+    Returns arrays of length N: bmr, tdee, target_kcal, activity_multiplier,
+    goal_adjustment and katch (True where Katch-McArdle was used).
+    """
+    import numpy as np
+
+    weight = _as_float(weight_kg)
+    height = _as_float(height_cm)
+    years = _as_float(age)
+    body_fat = _as_float(body_fat_pct) if body_fat_pct is not None else np.full(weight.shape, np.nan)
+
+    katch = ~np.isnan(body_fat)
+    bmr = np.where(
+        katch,
+        katch_mcardle(weight, body_fat),
+        mifflin_st_jeor(weight, height, years, _lookup(sex, SEX_OFFSETS)),
+    )
+    multiplier = _lookup(activity_level, ACTIVITY_MULTIPLIERS)
+    adjustment = _lookup(goal, GOAL_ADJUSTMENTS)
+    tdee = bmr * multiplier
+
+    return {
+        "bmr": bmr,
+        "tdee": tdee,
+        "target_kcal": tdee * (1.0 + adjustment),
+        "activity_multiplier": multiplier,
+        "goal_adjustment": adjustment,
+        "katch": katch,
+    }
+
+
+def rows_from_result(result: dict[str, np.ndarray]) -> list[dict]:
+    """Turn compute_tdee() columns into per-profile dicts (NaN -> None, kcal rounded, formula None without a BMR)."""
+    def clean(x: float, digits: int) -> float | None:
+        return None if math.isnan(x) else round(x, digits)
+
+    return [
+        {
+            "bmr": clean(bmr, 0),
+            "tdee": clean(tdee, 0),
+            "target_kcal": clean(target, 0),
+            "activity_multiplier": clean(mult, 3),
+            "goal_adjustment": clean(adj, 3),
+            # only name a formula when it produced a BMR
+            "formula": None if math.isnan(bmr) else "katch_mcardle" if katch else "mifflin_st_jeor",
+        }
+        for bmr, tdee, target, mult, adj, katch in zip(
+            result["bmr"].tolist(),
+            result["tdee"].tolist(),
+            result["target_kcal"].tolist(),
+            result["activity_multiplier"].tolist(),
+            result["goal_adjustment"].tolist(),
+            result["katch"].tolist(),
+        )
+    ]
@@ -1,34 +1,181 @@
+"""
+FitDojo API.
+
+create_app() builds the application; nothing heavy happens on import.
+Routers (and with them SQLAlchemy models, schemas, NumPy users) are
+imported inside it, and per-process resources (engines, the Argon2 pool,
+background workers) are created in the lifespan, from settings as they are
+when the worker starts. Keyword arguments override settings for this app,
+e.g. a smaller pool for one worker:
+
+    uvicorn --factory app.main:create_app
+    create_app(DB_POOL_SIZE=2)
+
+Overrides go into the shared settings object (one app per process at a
+time) and the previous values come back when the app shuts down. Settings in
+IMPORT_TIME_SETTINGS (page size bounds, rate limits, worker intervals, cache
+sizes) are read when their module is first imported; an override there
+only takes effect before that, stays for the life of the process, and is a
+ValueError afterwards. Set those in the environment.
+
+`app.main:app` still works: the default app is built on first access.
+"""
+import sys
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from app.routers import users
-from app.routers import auth
 
-from fastapi.middleware.cors import CORSMiddleware
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-from slowapi.middleware import SlowAPIMiddleware
+from app.core.settings import IMPORT_TIME_SETTINGS, settings
+
 
-from app.core.settings import settings
+async def _warm_up(app: FastAPI) -> None:
+    # FastAPI builds route tables and dependency graphs on the first request;
+    # pay for that here, before traffic, with one in-process GET /
+    scope = {
+        "type": "http", "method": "GET", "path": "/", "raw_path": b"/", "root_path": "",
+        "query_string": b"", "headers": [], "http_version": "1.1", "scheme": "http",
+        "server": ("warmup", 80), "client": ("127.0.0.1", 0),
+    }
 
-app = FastAPI(title="FitDojo API")
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
 
-# CORS for the frontend
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:5173"],  # 👈 hard-code for now
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
-    allow_headers=["*"],
-)
+    async def send(message):
+        pass
 
-# Basic rate limiting (per IP)
-limiter = Limiter(key_func=get_remote_address, default_limits=["200/minute"])
-app.state.limiter = limiter
-app.add_middleware(SlowAPIMiddleware)
+    await app(scope, receive, send)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from fastapi.concurrency import run_in_threadpool
+
+    from app.core.database import dispose_engines, get_async_engine, get_engine
+    from app.core.email_dispatcher import email_dispatcher
+    from app.core.exercise_index import exercise_index
+    from app.core.export import export_runner
+    from app.core.last_seen import last_seen_buffer
+    from app.core.metrics import registry
+    from app.core.replica import dispose_replica_engine, get_replica_engine, replica_monitor
+    from app.core.revocations import revocations
+    from app.core.security import hashing_pool
+    from app.core.session_cache import session_cache
+    from app.core.session_cleanup import expiry_sweeper
+
+    get_engine()
+    get_async_engine()
+    if get_replica_engine() is not None:
+        # know whether the replica is usable before the first read comes in
+        await run_in_threadpool(replica_monitor.check)
+        replica_monitor.start()
+    hashing_pool.configure(settings.HASH_MEMORY_BUDGET_MB, settings.HASH_QUEUE_MAX, settings.HASH_QUEUE_TIMEOUT_SECONDS)
+    registry.start()
+    last_seen_buffer.start()
+    email_dispatcher.start()
+    expiry_sweeper.start()
+    export_runner.start()
+    if settings.AUTH_STATELESS or session_cache.enabled:
+        # the session cache and stateless checks both learn of other workers' revocations
+        # here; until the first load, every token is checked in the database
+        await run_in_threadpool(revocations.load)
+        revocations.start()
+    # autocomplete is served from memory; load it before taking traffic
+    await run_in_threadpool(exercise_index.load)
+    exercise_index.start()
+    await _warm_up(app)
+    yield
+    exercise_index.stop()
+    revocations.stop()
+    export_runner.stop()
+    expiry_sweeper.stop()
+    email_dispatcher.stop()
+    # final flush so buffered last_seen_at values survive a restart
+    last_seen_buffer.stop()
+    hashing_pool.shutdown()
+    replica_monitor.stop()
+    dispose_replica_engine()
+    await dispose_engines()
+    registry.stop()
+    for name, value in app.state.settings_restore.items():
+        setattr(settings, name, value)
 
-app.include_router(users.router)
-app.include_router(auth.router)
 
-@app.get("/")
 def root():
     return {"message":"Welcome to FitDojo"}
 
+
+def create_app(**overrides) -> FastAPI:
+    restore = {}
+    for name, value in overrides.items():
+        if name not in type(settings).model_fields:
+            raise TypeError(f"unknown setting {name!r}")
+        module = IMPORT_TIME_SETTINGS.get(name)
+        if module is None:
+            restore[name] = getattr(settings, name)
+        elif module in sys.modules and getattr(settings, name) != value:
+            raise ValueError(f"{name} was read when {module} was imported; set it in the environment instead")
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+    from fastapi.middleware.cors import CORSMiddleware
+    from slowapi import _rate_limit_exceeded_handler
+    from slowapi.errors import RateLimitExceeded
+
+    from app.core.db_stats import DbStatsMiddleware
+    from app.core.metrics import MetricsMiddleware
+    from app.core.rate_limit import RateLimitMiddleware, limiter
+    from app.core.replica import PIN_HEADER, ReadYourWritesMiddleware
+    from app.routers import auth, exercises, export, logs, metrics, progress, records, sync, users, workouts
+
+    app = FastAPI(title="FitDojo API", lifespan=lifespan)
+    # overrides last as long as this app; the lifespan puts these back
+    app.state.settings_restore = restore
+
+    # CORS for the frontend
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:5173"],  # 👈 hard-code for now
+        allow_credentials=True,
+        allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+        allow_headers=["*"],
+        expose_headers=[PIN_HEADER],
+    )
+
+    # Rate limiting (per IP); storage/strategy/limits come from settings. SQL-backed
+    # counters are checked in the threadpool, off the event loop
+    app.state.limiter = limiter
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+    app.add_middleware(RateLimitMiddleware)
+
+    # Read-your-writes pinning for replica reads (app.core.replica); a no-op without a replica
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    # Query count / DB time per request (app.core.db_stats); outside rate limiting, so it sees everything
+    app.add_middleware(DbStatsMiddleware)
+    # Latency histograms / in-flight gauge for /metrics (app.core.metrics)
+    app.add_middleware(MetricsMiddleware)
+
+    app.include_router(users.router)
+    if settings.DB_MODE == "async":
+        from app.routers import auth_async
+
+        # registered first, so the async hot routes shadow their sync twins
+        app.include_router(auth_async.router)
+    app.include_router(auth.router)
+    app.include_router(logs.router)
+    app.include_router(workouts.router)
+    app.include_router(progress.router)
+    app.include_router(sync.router)
+    app.include_router(exercises.router)
+    app.include_router(records.router)
+    app.include_router(export.router)
+    app.include_router(metrics.router)
+    app.get("/")(root)
+    return app
+
+
+def __getattr__(name: str):
+    if name == "app":
+        app = globals()["app"] = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
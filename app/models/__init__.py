@@ -1,3 +1,11 @@
 from .user import User  # noqa
 from .session import Session
-from .token import EmailVerificationToken, PasswordResetToken
\ No newline at end of file
+from .token import EmailVerificationToken, PasswordResetToken
+from .outbox import EmailOutbox
+from .log import WeightLog, IntakeLog, TdeeCheckpoint
+from .workout import Exercise, Workout, WorkoutSet
+from .rollup import DailyRollup, DailyMuscleRollup, WeeklyRollup, WeeklyMuscleRollup
+from .sync import SyncTombstone
+from .record import ExerciseRecord, RepRecord
+from .export import ExportJob
+from .revocation import RevokedToken
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, BigInteger, String, Text, Boolean, DateTime, ForeignKey, Index, func
+from app.core.database import Base
+
+class ExportJob(Base):
+    # account exports run in the background (app.core.export); the file lives on local disk
+    __tablename__ = "export_jobs"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    token = Column(String(64), unique=True, nullable=False)  # download token, handed to the client
+    dataset = Column(String(16), nullable=False)             # a key of app.core.export.DATASETS or "all"
+    format = Column(String(16), nullable=False)              # "csv" | "parquet"
+    gzip = Column(Boolean, nullable=False, server_default="false")
+
+    status = Column(String(16), nullable=False, server_default="pending")  # "pending" | "running" | "done" | "failed"
+    path = Column(String(500), nullable=True)
+    size_bytes = Column(BigInteger, nullable=True)
+    rows = Column(BigInteger, nullable=True)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True, index=True)
+
+    __table_args__ = (
+        # the runner polls for pending (and stuck running) jobs
+        Index("ix_export_jobs_status_created_at", "status", "created_at"),
+    )
@@ -0,0 +1,48 @@
+from sqlalchemy import Column, Integer, BigInteger, Float, Date, DateTime, ForeignKey, Index, UniqueConstraint, func
+from app.core.database import Base
+
+class WeightLog(Base):
+    __tablename__ = "weight_logs"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    logged_on = Column(Date, nullable=False)
+    weight_kg = Column(Float, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    change_seq = Column(BigInteger, nullable=False, server_default="0")  # see app.core.sync
+
+    __table_args__ = (
+        # one entry per day; also the (user, date range) index
+        UniqueConstraint("user_id", "logged_on", name="uq_weight_logs_user_id_logged_on"),
+        Index("ix_weight_logs_user_id_change_seq", "user_id", "change_seq"),
+    )
+
+class IntakeLog(Base):
+    __tablename__ = "intake_logs"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    logged_on = Column(Date, nullable=False)
+    kcal = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    change_seq = Column(BigInteger, nullable=False, server_default="0")
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "logged_on", name="uq_intake_logs_user_id_logged_on"),
+        Index("ix_intake_logs_user_id_change_seq", "user_id", "change_seq"),
+    )
+
+class TdeeCheckpoint(Base):
+    # adaptive TDEE state after each logged day; see app.core.adaptive_tdee
+    __tablename__ = "tdee_checkpoints"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    trend_weight = Column(Float, nullable=True)   # EWMA of logged weight, kg
+    trend_slope = Column(Float, nullable=True)    # EWMA of daily trend change, kg/day
+    avg_intake = Column(Float, nullable=True)     # EWMA of logged intake, kcal
+    weight_days = Column(Integer, nullable=False, server_default="0")
+    intake_days = Column(Integer, nullable=False, server_default="0")
+    estimate = Column(Float, nullable=True)       # None until there is enough data
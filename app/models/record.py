@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from app.core.database import Base
+
+# Personal records per user and exercise, maintained by app.core.records.
+# *_set_id point at the set holding the record (no FK: the hooks run before
+# a set is deleted and repoint or clear them first).
+
+class ExerciseRecord(Base):
+    __tablename__ = "exercise_records"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    exercise_id = Column(Integer, ForeignKey("exercises.id", ondelete="CASCADE"), primary_key=True)
+    # estimated one-rep max, weight * (1 + reps / 30)
+    epley_kg = Column(Float, nullable=True)
+    epley_set_id = Column(Integer, nullable=True)
+    epley_at = Column(DateTime(timezone=True), nullable=True)
+    # estimated one-rep max, weight * 36 / (37 - reps)
+    brzycki_kg = Column(Float, nullable=True)
+    brzycki_set_id = Column(Integer, nullable=True)
+    brzycki_at = Column(DateTime(timezone=True), nullable=True)
+    # reps * weight of a single set
+    volume_kg = Column(Float, nullable=True)
+    volume_set_id = Column(Integer, nullable=True)
+    volume_at = Column(DateTime(timezone=True), nullable=True)
+
+class RepRecord(Base):
+    __tablename__ = "rep_records"
+
+    # most reps done at exactly this weight
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    exercise_id = Column(Integer, ForeignKey("exercises.id", ondelete="CASCADE"), primary_key=True)
+    weight_kg = Column(Float, primary_key=True)
+    reps = Column(Integer, nullable=False)
+    set_id = Column(Integer, nullable=False)
+    achieved_at = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
+from app.core.database import Base
+
+class RevokedToken(Base):
+    # revocations published for stateless access-token checks (app.core.revocations);
+    # a row only matters until every access token it can cover has expired
+    __tablename__ = "revoked_tokens"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    jti = Column(String(64), nullable=True)  # NULL: every token of the user issued before revoked_at
+    revoked_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
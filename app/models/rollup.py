@@ -0,0 +1,48 @@
+from sqlalchemy import Column, Integer, Float, String, Date, ForeignKey
+from app.core.database import Base
+
+# Pre-aggregated chart data, maintained by app.core.rollups.
+# Days are UTC calendar days, weeks start on Monday.
+
+class DailyRollup(Base):
+    __tablename__ = "daily_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    volume_kg = Column(Float, nullable=False, server_default="0")   # sum(reps * weight_kg)
+    set_count = Column(Integer, nullable=False, server_default="0")
+    weight_kg = Column(Float, nullable=True)
+    intake_kcal = Column(Integer, nullable=True)
+    target_kcal = Column(Float, nullable=True)  # only set on days with intake
+
+class DailyMuscleRollup(Base):
+    __tablename__ = "daily_muscle_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    muscle_group = Column(String(30), primary_key=True)
+    set_count = Column(Integer, nullable=False, server_default="0")
+    volume_kg = Column(Float, nullable=False, server_default="0")
+
+class WeeklyRollup(Base):
+    __tablename__ = "weekly_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    week_start = Column(Date, primary_key=True)
+    volume_kg = Column(Float, nullable=False, server_default="0")
+    set_count = Column(Integer, nullable=False, server_default="0")
+    weight_avg_kg = Column(Float, nullable=True)
+    weight_days = Column(Integer, nullable=False, server_default="0")
+    intake_kcal = Column(Integer, nullable=False, server_default="0")
+    target_kcal = Column(Float, nullable=False, server_default="0")
+    intake_days = Column(Integer, nullable=False, server_default="0")
+    on_target_days = Column(Integer, nullable=False, server_default="0")
+
+class WeeklyMuscleRollup(Base):
+    __tablename__ = "weekly_muscle_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    week_start = Column(Date, primary_key=True)
+    muscle_group = Column(String(30), primary_key=True)
+    set_count = Column(Integer, nullable=False, server_default="0")
+    volume_kg = Column(Float, nullable=False, server_default="0")
@@ -35,6 +35,7 @@ class Session(Base):
         DateTime(timezone=True),
         server_default=func.now(),
         nullable=False,
+        index=True,  # expiry sweeper
     )
 
     user = relationship("User", back_populates="sessions")
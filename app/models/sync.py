@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Index, func
+from app.core.database import Base
+
+class SyncTombstone(Base):
+    # deleted rows, so /sync can tell clients to drop them
+    __tablename__ = "sync_tombstones"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    entity = Column(String(16), nullable=False)   # "workout" | "set" | "weight" | "intake"
+    key = Column(String(64), nullable=False)      # row id, or the day for logs
+    change_seq = Column(BigInteger, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+
+    __table_args__ = (
+        Index("ix_sync_tombstones_user_id_change_seq", "user_id", "change_seq"),
+    )
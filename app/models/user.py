@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean
+from sqlalchemy import Column, Integer, BigInteger, String, Float, Date, DateTime, Boolean
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -19,11 +19,22 @@ class User(Base):
     activity_level = Column(String(20), nullable=True) # "sedentary", "light", "moderate", "active", "athlete"
     goal = Column(String(20), nullable=True)           # "cut" | "maintain" | "bulk"
 
+    # Latest adaptive TDEE state, mirrored from tdee_checkpoints on every log write
+    adaptive_tdee = Column(Float, nullable=True)
+    weight_trend_kg = Column(Float, nullable=True)
+    adaptive_tdee_on = Column(Date, nullable=True)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     is_verified = Column(Boolean, nullable=False, server_default="false")
     password_changed_at = Column(DateTime(timezone=True), nullable=True)
 
+    # Delta sync (app.core.sync): last change number handed out, when this
+    # profile last changed, and the newest purged tombstone
+    sync_seq = Column(BigInteger, nullable=False, server_default="0")
+    change_seq = Column(BigInteger, nullable=False, server_default="0")
+    sync_floor = Column(BigInteger, nullable=False, server_default="0")
+
     sessions = relationship(
         "Session",
         back_populates="user",
@@ -0,0 +1,83 @@
+from sqlalchemy import (
+    Column,
+    Integer,
+    BigInteger,
+    String,
+    Float,
+    Text,
+    DateTime,
+    ForeignKey,
+    Index,
+    UniqueConstraint,
+    func,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+class Exercise(Base):
+    __tablename__ = "exercises"
+
+    id = Column(Integer, primary_key=True)
+    # NULL owner = shared catalog entry, otherwise a user's custom exercise
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    name = Column(String(100), nullable=False)
+    aliases = Column(ARRAY(String(100)), nullable=False, server_default="{}")  # other names search should find
+    muscle_group = Column(String(30), nullable=True)  # "chest", "back", "legs", ...; rollups use "other" when unset
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # the in-memory search index polls for rows changed since its last look
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False, index=True)
+
+    __table_args__ = (
+        # names are unique per owner, case-insensitively (catalog counts as owner 0)
+        Index("uq_exercises_owner_name", func.coalesce(user_id, 0), func.lower(name), unique=True),
+    )
+
+    @property
+    def custom(self) -> bool:
+        return self.user_id is not None
+
+class Workout(Base):
+    __tablename__ = "workouts"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    name = Column(String(100), nullable=True)
+    notes = Column(Text, nullable=True)
+    started_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # id assigned by an offline client / importer, makes re-uploads idempotent
+    client_id = Column(String(64), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    change_seq = Column(BigInteger, nullable=False, server_default="0")  # see app.core.sync
+
+    sets = relationship("WorkoutSet", back_populates="workout", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "client_id", name="uq_workouts_user_id_client_id"),
+        Index("ix_workouts_user_id_change_seq", "user_id", "change_seq"),
+    )
+
+class WorkoutSet(Base):
+    __tablename__ = "workout_sets"
+
+    id = Column(Integer, primary_key=True)
+    workout_id = Column(Integer, ForeignKey("workouts.id", ondelete="CASCADE"), nullable=False, index=True)
+    # denormalized from the workout so per-user queries skip the join
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    exercise_id = Column(Integer, ForeignKey("exercises.id"), nullable=False)
+    set_index = Column(Integer, nullable=True)
+    reps = Column(Integer, nullable=False)
+    weight_kg = Column(Float, nullable=False, server_default="0")
+    rpe = Column(Float, nullable=True)
+    performed_at = Column(DateTime(timezone=True), nullable=False)
+    client_id = Column(String(64), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    change_seq = Column(BigInteger, nullable=False, server_default="0")
+
+    workout = relationship("Workout", back_populates="sets")
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "client_id", name="uq_workout_sets_user_id_client_id"),
+        Index("ix_workout_sets_user_id_exercise_id_performed_at", "user_id", "exercise_id", "performed_at"),
+        Index("ix_workout_sets_user_id_change_seq", "user_id", "change_seq"),
+    )
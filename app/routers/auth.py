@@ -3,15 +3,23 @@ from uuid import uuid4
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Request
+from sqlalchemy import delete, func, update
 from sqlalchemy.orm import Session
 
 from app.core.cookies import set_cookie, issue_csrf, require_csrf_if_cookie_auth, clear_cookie
 from app.core.database import get_db
-from app.core.emailer import send_email
+from app.core.emailer import queue_email
+from app.core.etag import make_etag, not_modified
+from app.core.email_dispatcher import email_dispatcher
 from app.core.security import hash_password, verify_password, needs_rehash
 from app.core.jwt_utils import create_token, create_typed_token, decode_token
 from app.core.settings import settings
+from app.core.session_cache import session_cache
+from app.core.last_seen import last_seen_buffer
 from app.core.deps import get_current_user
+from app.core.rate_limit import limiter
+from app.core.replica import get_read_db
+from app.core.revocations import publish
 from app.models import EmailVerificationToken, PasswordResetToken
 from app.schemas.auth import Login, Token
 from app.schemas.user import UserCreate, UserOut
@@ -23,6 +31,98 @@ from pydantic import BaseModel
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+
+def new_session_row(request: Request, user_id: int) -> SessionModel:
+    # Create a session JTI
+    session_jti = uuid4().hex
+
+    # Capture IP + user agent
+    ip = request.client.host if request.client else None
+    user_agent = request.headers.get("user-agent")
+    if user_agent and len(user_agent) > 255:
+        user_agent = user_agent[:255]
+
+    return SessionModel(
+        user_id=user_id,
+        jti=session_jti,
+        ip=ip,
+        user_agent=user_agent,
+    )
+
+
+def issue_session_tokens(response: Response, subject: str, jti: str | None) -> tuple[str, str, str]:
+    """Issue access + refresh with the same JTI, set the cookies, return (access, refresh, csrf)."""
+    # subject = user.id (as string), type = "access"/"refresh"
+    access_token = create_token(
+        subject=subject,
+        expires_minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES,
+        jti=jti,
+        typ="access",
+    )
+    refresh_token = create_token(
+        subject=subject,
+        expires_minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES,
+        jti=jti,
+        typ="refresh",
+    )
+
+    set_cookie(response, settings.ACCESS_TOKEN_COOKIE, access_token, settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    set_cookie(response, settings.REFRESH_TOKEN_COOKIE, refresh_token, settings.REFRESH_TOKEN_EXPIRE_MINUTES)
+    csrf = issue_csrf(response)
+    return access_token, refresh_token, csrf
+
+
+def read_refresh_claims(request: Request, body: "RefreshIn | None") -> tuple[str, str | None]:
+    """CSRF-check a refresh call and return (sub, jti) from its refresh token."""
+    # Enforce CSRF for cookie flow
+    require_csrf_if_cookie_auth(request)
+
+    # Prefer cookie token; fallback to body for Swagger/manual tests
+    rt = request.cookies.get(settings.REFRESH_TOKEN_COOKIE)
+    if not rt and body and body.refresh_token:
+        rt = body.refresh_token
+    if not rt:
+        raise HTTPException(status_code=401, detail="Missing refresh token")
+
+    payload = decode_token(rt)
+    if not payload or payload.get("type") != "refresh" or "sub" not in payload:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    sub = payload["sub"]          # should be user id as string
+    jti = payload.get("jti")      # session id
+    return sub, jti
+
+
+def _last_seen(s: SessionModel) -> datetime:
+    # include activity still waiting in the write-behind buffer
+    seen = max(s.last_seen_at, last_seen_buffer.pending(s.jti) or s.last_seen_at)
+    step = settings.SESSION_LAST_SEEN_RESOLUTION_SECONDS
+    if step > 0:
+        seen = datetime.fromtimestamp(seen.timestamp() // step * step, seen.tzinfo)
+    return seen
+
+
+def session_out(s: SessionModel, current_jti: str | None) -> SessionOut:
+    return SessionOut(
+        id=s.id,
+        ip=s.ip,
+        user_agent=s.user_agent,
+        created_at=s.created_at,
+        last_seen_at=_last_seen(s),
+        is_current=(s.jti == current_jti),
+    )
+
+
+def user_etag(user: User) -> str:
+    # every write to a UserOut field goes through the ORM (updated_at) or touch_profile (change_seq)
+    return make_etag(user.id, user.updated_at, user.change_seq)
+
+
+def sessions_etag(sessions: list[SessionModel], current_jti: str | None) -> str:
+    # ip / user_agent / created_at never change for a given id
+    return make_etag(current_jti, [(s.id, _last_seen(s)) for s in sessions])
+
+
 @router.post("/register", response_model=UserOut, status_code=201)
 def register(payload: UserCreate, db: Session = Depends(get_db)):
     if db.query(User).filter(User.email == payload.email).first():
@@ -42,6 +142,7 @@ def register(payload: UserCreate, db: Session = Depends(get_db)):
     return u
 
 @router.post("/login")
+@limiter.limit(settings.RATE_LIMIT_LOGIN)
 def login(
     payload: Login,
     response: Response,
@@ -66,43 +167,12 @@ def login(
         db.add(user)
         db.commit()
 
-    # Create a session JTI
-    session_jti = uuid4().hex
-
-    # Capture IP + user agent
-    ip = request.client.host if request.client else None
-    user_agent = request.headers.get("user-agent")
-    if user_agent and len(user_agent) > 255:
-        user_agent = user_agent[:255]
-
-    # Insert Session row
-    session_row = SessionModel(
-        user_id=user.id,
-        jti=session_jti,
-        ip=ip,
-        user_agent=user_agent,
-    )
+    session_row = new_session_row(request, user.id)
+    session_jti = session_row.jti
     db.add(session_row)
     db.commit()
 
-    # Issue access + refresh with same JTI
-    # subject = user.id (as string), type = "access"/"refresh"
-    access_token = create_token(
-        subject=str(user.id),
-        expires_minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES,
-        jti=session_jti,
-        typ="access",
-    )
-    refresh_token = create_token(
-        subject=str(user.id),
-        expires_minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES,
-        jti=session_jti,
-        typ="refresh",
-    )
-
-    set_cookie(response, settings.ACCESS_TOKEN_COOKIE, access_token, settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    set_cookie(response, settings.REFRESH_TOKEN_COOKIE, refresh_token, settings.REFRESH_TOKEN_EXPIRE_MINUTES)
-    csrf = issue_csrf(response)
+    access_token, refresh_token, csrf = issue_session_tokens(response, str(user.id), session_jti)
 
     # Can still return refresh_token for Swagger/manual tests
     return {
@@ -114,11 +184,12 @@ def login(
 
 
 @router.get("/me", response_model=UserOut)
-def me(current_user: User = Depends(get_current_user)):
-    return current_user
+def me(request: Request, response: Response, current_user: User = Depends(get_current_user)):
+    return not_modified(request, response, user_etag(current_user)) or current_user
 
 @router.post("/request-verify", status_code=200)
-def request_verify(email: str, db: Session = Depends(get_db)):
+@limiter.limit(settings.RATE_LIMIT_EMAIL)
+def request_verify(request: Request, email: str, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.email == email).first()
     if not user:
         return {"status": "ok"}  # don't leak accounts
@@ -127,11 +198,13 @@ def request_verify(email: str, db: Session = Depends(get_db)):
 
     token, jti, exp = create_typed_token(user.email, settings.VERIFY_TOKEN_EXPIRE_MINUTES, "verify")
     db.add(EmailVerificationToken(user_id=user.id, jti=jti, expires_at=exp))
-    db.commit()
 
     link = f"{settings.APP_BASE_URL}/auth/verify?token={token}"
     html = f"<p>Welcome to FitDojo!</p><p>Verify your email: <a href='{link}'>Verify</a></p>"
-    send_email(user.email, "Verify your FitDojo email", html)
+    # token row + outbox row commit together; delivery happens off-request
+    queue_email(db, user.email, "Verify your FitDojo email", html)
+    db.commit()
+    email_dispatcher.wake()
     return {"status": "sent"}
 
 @router.get("/verify", status_code=200)
@@ -154,17 +227,19 @@ def verify(token: str = Query(...), db: Session = Depends(get_db)):
     return {"status": "verified"}
 
 @router.post("/forgot-password", status_code=200)
-def forgot_password(email: str, db: Session = Depends(get_db)):
+@limiter.limit(settings.RATE_LIMIT_EMAIL)
+def forgot_password(request: Request, email: str, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.email == email).first()
     if not user:
         return {"status": "ok"}
     token, jti, exp = create_typed_token(user.email, settings.RESET_TOKEN_EXPIRE_MINUTES, "reset")
     db.add(PasswordResetToken(user_id=user.id, jti=jti, expires_at=exp))
-    db.commit()
 
     link = f"{settings.APP_BASE_URL}/auth/reset-password?token={token}"
     html = f"<p>Reset your FitDojo password:</p><p><a href='{link}'>Set a new password</a></p>"
-    send_email(user.email, "Reset your FitDojo password", html)
+    queue_email(db, user.email, "Reset your FitDojo password", html)
+    db.commit()
+    email_dispatcher.wake()
     return {"status": "sent"}
 
 class ResetPasswordIn(BaseModel):
@@ -188,7 +263,11 @@ def reset_password(payload: ResetPasswordIn, db: Session = Depends(get_db)):
     user.hashed_password = hash_password(payload.new_password)
     user.password_changed_at = datetime.now(timezone.utc)
     rec.used_at = datetime.now(timezone.utc)
+    # a new password ends every session, along with the access tokens already out there
+    db.query(SessionModel).filter(SessionModel.user_id == user.id).delete(synchronize_session=False)
+    publish(db, user.id)
     db.add_all([user, rec]); db.commit()
+    session_cache.invalidate_user(user.id)
     return {"status": "password_updated"}
 
 class RefreshIn(BaseModel):
@@ -202,53 +281,24 @@ def refresh(
     body: RefreshIn | None = None,
     db: Session = Depends(get_db),
 ):
-    # Enforce CSRF for cookie flow
-    require_csrf_if_cookie_auth(request)
+    sub, jti = read_refresh_claims(request, body)
 
-    # Prefer cookie token; fallback to body for Swagger/manual tests
-    rt = request.cookies.get(settings.REFRESH_TOKEN_COOKIE)
-    if not rt and body and body.refresh_token:
-        rt = body.refresh_token
-    if not rt:
-        raise HTTPException(status_code=401, detail="Missing refresh token")
-
-    payload = decode_token(rt)
-    if not payload or payload.get("type") != "refresh" or "sub" not in payload:
-        raise HTTPException(status_code=401, detail="Invalid refresh token")
-
-    sub = payload["sub"]          # should be user id as string
-    jti = payload.get("jti")      # session id
-
-    # Optional: ensure session still exists (defensive)
     if jti:
-        session_row = (
-            db.query(SessionModel)
-            .filter(
-                SessionModel.jti == jti,
-                SessionModel.user_id == int(sub),
-            )
-            .first()
-        )
-        if not session_row:
+        # the session must still exist; stamp it seen in the same statement. Written now rather
+        # than through last_seen_buffer: the sweeper only publishes recently seen sessions as
+        # revoked, so it must not purge this one as idle while the new access token is valid
+        session_id = db.execute(
+            update(SessionModel)
+            .where(SessionModel.jti == jti, SessionModel.user_id == int(sub))
+            .values(last_seen_at=func.now())
+            .returning(SessionModel.id)
+        ).scalar_one_or_none()
+        if session_id is None:
             raise HTTPException(status_code=401, detail="Session invalid or expired")
+        db.commit()
 
     # Issue new access + refresh with same JTI
-    new_access_token = create_token(
-        subject=sub,
-        expires_minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES,
-        jti=jti,
-        typ="access",
-    )
-    new_refresh_token = create_token(
-        subject=sub,
-        expires_minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES,
-        jti=jti,
-        typ="refresh",
-    )
-
-    set_cookie(response, settings.ACCESS_TOKEN_COOKIE, new_access_token, settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    set_cookie(response, settings.REFRESH_TOKEN_COOKIE, new_refresh_token, settings.REFRESH_TOKEN_EXPIRE_MINUTES)
-    issue_csrf(response)
+    new_access_token, new_refresh_token, _ = issue_session_tokens(response, sub, jti)
 
     return {
         "access_token": new_access_token,
@@ -259,7 +309,8 @@ def refresh(
 @router.get("/sessions", response_model=List[SessionOut])
 def list_sessions(
     request: Request,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     current_jti = getattr(request.state, "token_jti", None)
@@ -271,17 +322,10 @@ def list_sessions(
         .all()
     )
 
-    return [
-        SessionOut(
-            id=s.id,
-            ip=s.ip,
-            user_agent=s.user_agent,
-            created_at=s.created_at,
-            last_seen_at=s.last_seen_at,
-            is_current=(s.jti == current_jti),
-        )
-        for s in sessions
-    ]
+    unchanged = not_modified(request, response, sessions_etag(sessions, current_jti))
+    if unchanged:
+        return unchanged
+    return [session_out(s, current_jti) for s in sessions]
 
 
 @router.post("/logout")
@@ -304,7 +348,10 @@ def logout(
             )
             .delete(synchronize_session=False)
         )
+        publish(db, current_user.id, [jti])
         db.commit()
+        session_cache.invalidate(current_user.id, jti)
+        last_seen_buffer.discard(jti)
 
     # Clear cookies
     clear_cookie(response, settings.ACCESS_TOKEN_COOKIE)
@@ -324,13 +371,17 @@ def logout_all(
 
     current_jti = getattr(request.state, "token_jti", None)
 
-    q = db.query(SessionModel).filter(SessionModel.user_id == current_user.id)
+    stmt = delete(SessionModel).where(SessionModel.user_id == current_user.id)
     if current_jti:
         # Keep current session, drop all others
-        q = q.filter(SessionModel.jti != current_jti)
+        stmt = stmt.where(SessionModel.jti != current_jti)
 
-    q.delete(synchronize_session=False)
+    # per-JTI rather than a user-wide epoch, so this device's token stays on the fast path
+    revoked = db.execute(stmt.returning(SessionModel.jti)).scalars().all()
+    publish(db, current_user.id, revoked)
     db.commit()
+    # current session is re-validated on its next request
+    session_cache.invalidate_user(current_user.id)
 
     # We intentionally do NOT clear current cookies here:
     # this endpoint logs you out of other devices, not this one.
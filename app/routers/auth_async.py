@@ -0,0 +1,128 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db
+from app.core.deps import get_current_user_async
+from app.core.etag import not_modified
+from app.core.rate_limit import limiter
+from app.core.settings import settings
+from app.core.security import hash_password_async, verify_password_async, needs_rehash
+from app.models.user import User
+from app.models.session import Session as SessionModel
+from app.routers.auth import (
+    RefreshIn,
+    issue_session_tokens,
+    new_session_row,
+    read_refresh_claims,
+    session_out,
+    sessions_etag,
+    user_etag,
+)
+from app.schemas.auth import Login
+from app.schemas.session import SessionOut
+from app.schemas.user import UserOut
+
+# asyncio versions of the hot /auth routes, mounted ahead of app.routers.auth
+# when DB_MODE=async. Same paths and shapes, so they stay out of the schema.
+router = APIRouter(prefix="/auth", tags=["auth"], include_in_schema=False)
+
+
+@router.post("/login")
+@limiter.limit(settings.RATE_LIMIT_LOGIN)
+async def login(
+    payload: Login,
+    response: Response,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+):
+    # Normalize email
+    email = payload.email.strip().lower()
+    user = (await db.execute(select(User).where(User.email == email))).scalar_one_or_none()
+
+    if not user or not await verify_password_async(payload.password, user.hashed_password):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+        )
+    if not user.is_verified:
+        raise HTTPException(status_code=403, detail="Email not verified")
+
+    # Optional: upgrade hash if needed
+    if needs_rehash(user.hashed_password):
+        user.hashed_password = await hash_password_async(payload.password)
+
+    session_row = new_session_row(request, user.id)
+    db.add(session_row)
+    await db.commit()
+
+    access_token, refresh_token, csrf = issue_session_tokens(response, str(user.id), session_row.jti)
+
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "csrf": csrf,
+    }
+
+
+@router.get("/me", response_model=UserOut)
+async def me(request: Request, response: Response, current_user: User = Depends(get_current_user_async)):
+    return not_modified(request, response, user_etag(current_user)) or current_user
+
+
+@router.post("/refresh")
+async def refresh(
+    request: Request,
+    response: Response,
+    body: RefreshIn | None = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    sub, jti = read_refresh_claims(request, body)
+
+    if jti:
+        # exists + seen now, as in the sync route
+        session_id = (
+            await db.execute(
+                update(SessionModel)
+                .where(SessionModel.jti == jti, SessionModel.user_id == int(sub))
+                .values(last_seen_at=func.now())
+                .returning(SessionModel.id)
+            )
+        ).scalar_one_or_none()
+        if session_id is None:
+            raise HTTPException(status_code=401, detail="Session invalid or expired")
+        await db.commit()
+
+    new_access_token, new_refresh_token, _ = issue_session_tokens(response, sub, jti)
+
+    return {
+        "access_token": new_access_token,
+        "refresh_token": new_refresh_token,
+        "token_type": "bearer",
+    }
+
+
+@router.get("/sessions", response_model=List[SessionOut])
+async def list_sessions(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    current_jti = getattr(request.state, "token_jti", None)
+
+    sessions = (
+        await db.execute(
+            select(SessionModel)
+            .where(SessionModel.user_id == current_user.id)
+            .order_by(SessionModel.created_at.desc())
+        )
+    ).scalars().all()
+
+    unchanged = not_modified(request, response, sessions_etag(sessions, current_jti))
+    if unchanged:
+        return unchanged
+    return [session_out(s, current_jti) for s in sessions]
@@ -0,0 +1,126 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import exists, func, select
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.deps import get_current_user
+from app.core.exercise_index import exercise_index
+from app.core.rollups import rebuild
+from app.core.settings import settings
+from app.models.user import User
+from app.models.workout import Exercise, WorkoutSet
+from app.schemas.exercise import ExerciseIn, ExerciseOut, ExercisePatch
+
+# The shared catalog plus each user's custom exercises; search is served from memory
+router = APIRouter(prefix="/exercises", tags=["exercises"])
+
+
+def _own_exercise(db: Session, user_id: int, exercise_id: int) -> Exercise:
+    ex = db.query(Exercise).filter(Exercise.id == exercise_id, Exercise.user_id == user_id).first()
+    if not ex:
+        raise HTTPException(status_code=404, detail="Exercise not found")
+    return ex
+
+
+def _name_taken(db: Session, user_id: int, name: str, exclude_id: int | None = None) -> bool:
+    q = db.query(Exercise.id).filter(Exercise.user_id == user_id, func.lower(Exercise.name) == name.lower())
+    if exclude_id is not None:
+        q = q.filter(Exercise.id != exclude_id)
+    return q.first() is not None
+
+
+def _clean_aliases(aliases: list[str]) -> list[str]:
+    # trimmed, no blanks or case-insensitive repeats, order kept
+    out, seen = [], set()
+    for a in (a.strip()[:100] for a in aliases):
+        if a and a.lower() not in seen:
+            seen.add(a.lower())
+            out.append(a)
+    return out
+
+
+@router.get("/search", response_model=list[ExerciseOut])
+def search_exercises(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(settings.EXERCISE_SEARCH_LIMIT, ge=1, le=settings.EXERCISE_SEARCH_LIMIT_MAX),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Ranked autocomplete over names, aliases and muscle groups of the catalog
+    and the user's own exercises. Answered from the in-memory index
+    (app.core.exercise_index), so it's fine to call on every keystroke.
+    """
+    return exercise_index.search(current_user.id, q, limit)
+
+
+@router.post("/", response_model=ExerciseOut, status_code=201)
+def create_exercise(
+    payload: ExerciseIn,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    name = payload.name.strip()
+    if not name:
+        raise HTTPException(status_code=422, detail="Name is empty")
+    if _name_taken(db, current_user.id, name):
+        raise HTTPException(status_code=409, detail="You already have an exercise with this name")
+
+    ex = Exercise(
+        user_id=current_user.id,
+        name=name,
+        aliases=_clean_aliases(payload.aliases),
+        muscle_group=payload.muscle_group,
+    )
+    db.add(ex)
+    db.commit()
+    db.refresh(ex)
+    exercise_index.upsert([ex])
+    return ex
+
+
+@router.patch("/{exercise_id}", response_model=ExerciseOut)
+def update_exercise(
+    exercise_id: int,
+    payload: ExercisePatch,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    ex = _own_exercise(db, current_user.id, exercise_id)
+    changes = payload.model_dump(exclude_unset=True)
+
+    if changes.get("name") is not None:
+        name = changes["name"].strip()
+        if not name:
+            raise HTTPException(status_code=422, detail="Name is empty")
+        if _name_taken(db, current_user.id, name, exclude_id=ex.id):
+            raise HTTPException(status_code=409, detail="You already have an exercise with this name")
+        ex.name = name
+    if changes.get("aliases") is not None:
+        ex.aliases = _clean_aliases(changes["aliases"])
+    regroup = "muscle_group" in changes and changes["muscle_group"] != ex.muscle_group
+    if regroup:
+        ex.muscle_group = changes["muscle_group"]
+
+    db.flush()
+    if regroup:
+        # per-muscle rollups were summed under the old group; rare enough to redo in full
+        rebuild(db, current_user.id)
+    db.commit()
+    db.refresh(ex)
+    exercise_index.upsert([ex])
+    return ex
+
+
+@router.delete("/{exercise_id}", status_code=204)
+def delete_exercise(
+    exercise_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    ex = _own_exercise(db, current_user.id, exercise_id)
+    if db.scalar(select(exists().where(WorkoutSet.exercise_id == ex.id))):
+        raise HTTPException(status_code=409, detail="Exercise is used by logged sets")
+    db.delete(ex)
+    db.commit()
+    exercise_index.remove([exercise_id])
+    return Response(status_code=204)
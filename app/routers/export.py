@@ -0,0 +1,104 @@
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.deps import get_current_user
+from app.core.export import describe, export_runner, parquet_available, stream
+from app.models.export import ExportJob
+from app.models.user import User
+from app.schemas.export import ExportDataset, ExportFormat, ExportJobIn, ExportJobOut
+
+# Account export (app.core.export): streamed right away, or as a background job for big accounts
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+def _check(fmt: str, gzip: bool, dataset: str) -> None:
+    if fmt == "parquet" and not parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export is not available on this server")
+    if gzip and (fmt != "csv" or dataset == "all"):
+        raise HTTPException(status_code=422, detail="gzip applies to single-dataset CSV exports")
+
+
+def _own_job(db: Session, user_id: int, token: str) -> ExportJob:
+    job = db.query(ExportJob).filter(ExportJob.token == token, ExportJob.user_id == user_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return job
+
+
+@router.post("/jobs", response_model=ExportJobOut, status_code=202)
+def create_export_job(
+    payload: ExportJobIn,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Queue an export to disk; poll GET /export/jobs/{token}, then download it with the token."""
+    _check(payload.format, payload.gzip, payload.dataset)
+    busy = db.query(ExportJob.id).filter(
+        ExportJob.user_id == current_user.id, ExportJob.status.in_(("pending", "running"))
+    ).first()
+    if busy:
+        raise HTTPException(status_code=409, detail="An export is already in progress")
+
+    job = export_runner.enqueue(db, current_user.id, payload.dataset, payload.format, payload.gzip)
+    db.commit()
+    db.refresh(job)
+    export_runner.wake()
+    return job
+
+
+@router.get("/jobs", response_model=list[ExportJobOut])
+def list_export_jobs(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return db.query(ExportJob).filter(ExportJob.user_id == current_user.id).order_by(ExportJob.id.desc()).all()
+
+
+@router.get("/jobs/{token}", response_model=ExportJobOut)
+def get_export_job(
+    token: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return _own_job(db, current_user.id, token)
+
+
+@router.get("/jobs/{token}/download")
+def download_export(token: str, db: Session = Depends(get_db)):
+    """
+    The finished file. The token alone authorizes the download, so it works
+    as a plain link; it is unguessable and dies with the job (EXPORT_TTL_HOURS).
+    """
+    job = db.query(ExportJob).filter(ExportJob.token == token).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Export not found")
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Export is {job.status}")
+    if not job.path or not os.path.exists(job.path):
+        raise HTTPException(status_code=404, detail="Export file is gone")
+    filename, media_type = describe(job.dataset, job.format, job.gzip)
+    return FileResponse(job.path, media_type=media_type, filename=filename)
+
+
+@router.get("/{dataset}")
+def export_dataset(
+    dataset: ExportDataset,
+    format: ExportFormat = Query("csv"),
+    gzip: bool = Query(False, description="gzip a single-dataset CSV as it streams"),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Stream one dataset (or "all", as a ZIP) of the current user. Rows are
+    read and written in batches, so this is safe for any account size.
+    """
+    _check(format, gzip, dataset)
+    filename, media_type = describe(dataset, format, gzip)
+    return StreamingResponse(
+        stream(current_user.id, dataset, format, gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
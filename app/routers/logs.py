@@ -0,0 +1,140 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.adaptive_tdee import replay_from
+from app.core.rollups import apply_logs
+from app.core.database import get_db
+from app.core.deps import get_current_user
+from app.core.session_cache import session_cache
+from app.core.sync import reserve, tombstone, touch_profile
+from app.models.log import IntakeLog, WeightLog
+from app.models.user import User
+from app.schemas.log import (
+    AdaptiveTdeeOut,
+    IntakeLogIn,
+    IntakeLogOut,
+    WeightLogIn,
+    WeightLogOut,
+)
+
+router = APIRouter(prefix="/logs", tags=["logs"])
+
+
+# Write helpers are shared with POST /sync/push: they don't commit, and
+# after_log_writes() folds everything from the earliest touched day on into
+# the derived state once per transaction.
+
+def after_log_writes(db: Session, user_id: int, since: date) -> None:
+    # adaptive TDEE, progress rollups, and the profile's change number
+    replay_from(db, user_id, since)
+    apply_logs(db, user_id, since)
+    touch_profile(db, user_id)
+
+
+def upsert_log(db: Session, model, user_id: int, day: date, values: dict) -> None:
+    values = {**values, "change_seq": reserve(db, user_id)}
+    stmt = insert(model).values(user_id=user_id, logged_on=day, **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[model.user_id, model.logged_on],
+        set_={**values, "updated_at": func.now()},
+    )
+    db.execute(stmt)
+
+
+def delete_log(db: Session, model, entity: str, user_id: int, day: date) -> bool:
+    deleted = db.execute(
+        delete(model).where(model.user_id == user_id, model.logged_on == day)
+    ).rowcount
+    if deleted:
+        tombstone(db, user_id, entity, [day])
+    return bool(deleted)
+
+
+def _commit(db: Session, user_id: int, day: date) -> None:
+    after_log_writes(db, user_id, day)
+    db.commit()
+    # so /auth/me picks up the new adaptive_tdee
+    session_cache.invalidate_user(user_id)
+
+
+def _list(db: Session, model, user_id: int, start: date | None, end: date | None):
+    stmt = select(model).where(model.user_id == user_id).order_by(model.logged_on.asc())
+    if start is not None:
+        stmt = stmt.where(model.logged_on >= start)
+    if end is not None:
+        stmt = stmt.where(model.logged_on <= end)
+    return db.execute(stmt).scalars().all()
+
+
+@router.put("/weight/{day}", response_model=WeightLogOut)
+def put_weight(
+    day: date,
+    payload: WeightLogIn,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    upsert_log(db, WeightLog, current_user.id, day, {"weight_kg": payload.weight_kg})
+    _commit(db, current_user.id, day)
+    return {"logged_on": day, "weight_kg": payload.weight_kg}
+
+
+@router.get("/weight", response_model=list[WeightLogOut])
+def list_weight(
+    start: date | None = Query(None),
+    end: date | None = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return _list(db, WeightLog, current_user.id, start, end)
+
+
+@router.delete("/weight/{day}", status_code=204)
+def delete_weight(day: date, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    if not delete_log(db, WeightLog, "weight", current_user.id, day):
+        raise HTTPException(status_code=404, detail="No entry for that day")
+    _commit(db, current_user.id, day)
+    return Response(status_code=204)
+
+
+@router.put("/intake/{day}", response_model=IntakeLogOut)
+def put_intake(
+    day: date,
+    payload: IntakeLogIn,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    upsert_log(db, IntakeLog, current_user.id, day, {"kcal": payload.kcal})
+    _commit(db, current_user.id, day)
+    return {"logged_on": day, "kcal": payload.kcal}
+
+
+@router.get("/intake", response_model=list[IntakeLogOut])
+def list_intake(
+    start: date | None = Query(None),
+    end: date | None = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return _list(db, IntakeLog, current_user.id, start, end)
+
+
+@router.delete("/intake/{day}", status_code=204)
+def delete_intake(day: date, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    if not delete_log(db, IntakeLog, "intake", current_user.id, day):
+        raise HTTPException(status_code=404, detail="No entry for that day")
+    _commit(db, current_user.id, day)
+    return Response(status_code=204)
+
+
+@router.get("/tdee", response_model=AdaptiveTdeeOut)
+def adaptive_tdee(current_user: User = Depends(get_current_user)):
+    # mirrored columns on the (usually cached) User row; no log scan
+    return {
+        "adaptive_tdee": current_user.adaptive_tdee,
+        "weight_trend_kg": current_user.weight_trend_kg,
+        "as_of": current_user.adaptive_tdee_on,
+    }
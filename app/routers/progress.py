@@ -0,0 +1,145 @@
+from datetime import date, timedelta
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.deps import get_current_user
+from app.core.replica import get_read_db
+from app.core.rollups import week_start
+from app.core.series import ewma, lttb_indices
+from app.models.rollup import DailyMuscleRollup, DailyRollup, WeeklyMuscleRollup, WeeklyRollup
+from app.models.user import User
+from app.schemas.progress import DailyProgressOut, SeriesOut, WeeklyProgressOut
+
+# Chart data, read straight from the rollup tables (app.core.rollups)
+router = APIRouter(prefix="/progress", tags=["progress"])
+
+
+def _muscle_sets(db: Session, model, key, user_id: int, start: date, end: date) -> dict[date, dict[str, int]]:
+    out: dict[date, dict[str, int]] = {}
+    rows = db.execute(
+        select(key, model.muscle_group, model.set_count)
+        .where(model.user_id == user_id, key >= start, key <= end)
+    ).all()
+    for k, group, count in rows:
+        out.setdefault(k, {})[group] = count
+    return out
+
+
+@router.get("/daily", response_model=list[DailyProgressOut])
+def daily(
+    start: date | None = Query(None, description="Defaults to 90 days before `end`"),
+    end: date | None = Query(None, description="Defaults to today"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    end = end or date.today()
+    start = start or end - timedelta(days=90)
+    rows = db.execute(
+        select(DailyRollup)
+        .where(DailyRollup.user_id == current_user.id, DailyRollup.day >= start, DailyRollup.day <= end)
+        .order_by(DailyRollup.day)
+    ).scalars().all()
+    muscles = _muscle_sets(db, DailyMuscleRollup, DailyMuscleRollup.day, current_user.id, start, end)
+    return [
+        DailyProgressOut(
+            day=r.day,
+            volume_kg=r.volume_kg,
+            set_count=r.set_count,
+            weight_kg=r.weight_kg,
+            intake_kcal=r.intake_kcal,
+            target_kcal=r.target_kcal,
+            muscle_sets=muscles.get(r.day, {}),
+        )
+        for r in rows
+    ]
+
+
+@router.get("/weekly", response_model=list[WeeklyProgressOut])
+def weekly(
+    start: date | None = Query(None, description="Defaults to 26 weeks before `end`"),
+    end: date | None = Query(None, description="Defaults to today"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    end = end or date.today()
+    start = week_start(start or end - timedelta(weeks=26))
+    rows = db.execute(
+        select(WeeklyRollup)
+        .where(WeeklyRollup.user_id == current_user.id, WeeklyRollup.week_start >= start, WeeklyRollup.week_start <= end)
+        .order_by(WeeklyRollup.week_start)
+    ).scalars().all()
+    muscles = _muscle_sets(db, WeeklyMuscleRollup, WeeklyMuscleRollup.week_start, current_user.id, start, end)
+    return [
+        WeeklyProgressOut(
+            week_start=r.week_start,
+            volume_kg=r.volume_kg,
+            set_count=r.set_count,
+            weight_avg_kg=r.weight_avg_kg,
+            weight_days=r.weight_days,
+            intake_kcal=r.intake_kcal,
+            target_kcal=r.target_kcal,
+            intake_days=r.intake_days,
+            on_target_days=r.on_target_days,
+            adherence=round(r.intake_kcal / r.target_kcal, 3) if r.target_kcal else None,
+            muscle_sets=muscles.get(r.week_start, {}),
+        )
+        for r in rows
+    ]
+
+
+# metric -> (daily_rollups column, only days where the metric was recorded)
+_SERIES = {
+    "weight": (DailyRollup.weight_kg, DailyRollup.weight_kg.isnot(None)),
+    "intake": (DailyRollup.intake_kcal, DailyRollup.intake_kcal.isnot(None)),
+    "volume": (DailyRollup.volume_kg, DailyRollup.set_count > 0),
+    "sets": (DailyRollup.set_count, DailyRollup.set_count > 0),
+}
+
+
+@router.get("/series", response_model=SeriesOut)
+def series(
+    metric: Literal["weight", "intake", "volume", "sets"] = Query("weight"),
+    points: int = Query(200, ge=3, le=2000, description="Upper bound on returned points"),
+    trend: bool = Query(False, description="Add an EWMA trend line sampled at the same days"),
+    trend_alpha: float = Query(0.1, gt=0, le=1),
+    start: date | None = Query(None),
+    end: date | None = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Whole-history series downsampled with LTTB, so the payload is at most
+    `points` long however many days are logged. Columnar: x[i] is the day of y[i].
+    """
+    column, recorded = _SERIES[metric]
+    stmt = (
+        select(DailyRollup.day, column)
+        .where(DailyRollup.user_id == current_user.id, recorded)
+        .order_by(DailyRollup.day)
+    )
+    if start is not None:
+        stmt = stmt.where(DailyRollup.day >= start)
+    if end is not None:
+        stmt = stmt.where(DailyRollup.day <= end)
+    rows = db.execute(stmt).all()
+    if not rows:
+        return SeriesOut(metric=metric, total=0, x=[], y=[], trend=[] if trend else None)
+
+    import numpy as np  # only this route needs it; kept out of app startup
+
+    days, values = zip(*rows)
+    x = np.fromiter((d.toordinal() for d in days), dtype=float, count=len(days))
+    y = np.asarray(values, dtype=float)
+    keep = lttb_indices(x, y, points)
+
+    return SeriesOut(
+        metric=metric,
+        total=len(rows),
+        x=[days[i] for i in keep],
+        y=np.round(y[keep], 2).tolist(),
+        # smoothed over the full series, then sampled at the kept days
+        trend=np.round(ewma(y, trend_alpha)[keep], 2).tolist() if trend else None,
+    )
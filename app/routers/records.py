@@ -0,0 +1,85 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app.core.deps import get_current_user
+from app.core.records import METRICS
+from app.core.replica import get_read_db
+from app.models.record import ExerciseRecord, RepRecord
+from app.models.user import User
+from app.models.workout import Exercise, Workout, WorkoutSet
+from app.schemas.record import ExerciseRecordDetailOut, ExerciseRecordOut, RepRecordOut, SetRecordsOut
+
+# Personal records, read straight from the record tables (app.core.records)
+router = APIRouter(prefix="/records", tags=["records"])
+
+
+def _records(db: Session, user_id: int, exercise_id: int | None = None) -> list[ExerciseRecordOut]:
+    stmt = (
+        select(ExerciseRecord, Exercise.name)
+        .join(Exercise, Exercise.id == ExerciseRecord.exercise_id)
+        .where(ExerciseRecord.user_id == user_id)
+        .order_by(Exercise.name)
+    )
+    if exercise_id is not None:
+        stmt = stmt.where(ExerciseRecord.exercise_id == exercise_id)
+    fields = [c for c in ExerciseRecordOut.model_fields if c != "exercise"]
+    return [
+        ExerciseRecordOut(exercise=name, **{c: getattr(rec, c) for c in fields})
+        for rec, name in db.execute(stmt).all()
+    ]
+
+
+@router.get("/", response_model=list[ExerciseRecordOut])
+def list_records(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    return _records(db, current_user.id)
+
+
+@router.get("/workouts/{workout_id}", response_model=list[SetRecordsOut])
+def workout_records(
+    workout_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """PR badges for one workout: the records each of its sets currently holds (only sets with any)."""
+    uid = current_user.id
+    if not db.query(Workout.id).filter(Workout.id == workout_id, Workout.user_id == uid).first():
+        raise HTTPException(status_code=404, detail="Workout not found")
+    ids = set(db.execute(
+        select(WorkoutSet.id).where(WorkoutSet.workout_id == workout_id, WorkoutSet.user_id == uid)
+    ).scalars())
+    if not ids:
+        return []
+
+    held: dict[int, list[str]] = {}
+    r = ExerciseRecord
+    holders = [getattr(r, f"{m}_set_id") for m in METRICS]
+    for row in db.execute(select(*holders).where(r.user_id == uid, or_(*(h.in_(ids) for h in holders)))):
+        for metric, set_id in zip(METRICS, row):
+            if set_id in ids:
+                held.setdefault(set_id, []).append(metric)
+    for set_id in db.execute(
+        select(RepRecord.set_id).where(RepRecord.user_id == uid, RepRecord.set_id.in_(ids))
+    ).scalars():
+        held.setdefault(set_id, []).append("reps")
+    return [SetRecordsOut(set_id=k, records=v) for k, v in sorted(held.items())]
+
+
+@router.get("/{exercise_id}", response_model=ExerciseRecordDetailOut)
+def exercise_records(
+    exercise_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    found = _records(db, current_user.id, exercise_id)
+    if not found:
+        raise HTTPException(status_code=404, detail="No records for this exercise")
+    reps = db.execute(
+        select(RepRecord)
+        .where(RepRecord.user_id == current_user.id, RepRecord.exercise_id == exercise_id)
+        .order_by(RepRecord.weight_kg)
+    ).scalars().all()
+    return ExerciseRecordDetailOut(**found[0].model_dump(), reps=[RepRecordOut.model_validate(r) for r in reps])
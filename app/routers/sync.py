@@ -0,0 +1,172 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.deps import get_current_user
+from app.core.session_cache import session_cache
+from app.core.settings import settings
+from app.core.sync import changes_since, reserve
+from app.models.log import IntakeLog, WeightLog
+from app.models.user import User
+from app.models.workout import Workout, WorkoutSet
+from app.routers.logs import after_log_writes, delete_log, upsert_log
+from app.routers.workouts import (
+    _own_workout,
+    change_set,
+    new_set,
+    new_workout,
+    remove_set,
+    remove_workout,
+)
+from app.schemas.log import IntakeLogIn, WeightLogIn
+from app.schemas.sync import PushIn, PushOp, PushOut, PushResult, SyncOut
+from app.schemas.workout import SetIn, SetPatch, WorkoutIn
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@router.get("", response_model=SyncOut)
+def pull(
+    since: int | None = Query(None, ge=0, description="Cursor from the previous response; omit for a full snapshot"),
+    limit: int = Query(settings.SYNC_PAGE_SIZE, ge=1, le=settings.SYNC_PAGE_SIZE * 10),
+    snapshot: int | None = Query(None, ge=0, description="Snapshot token from the previous page, while paging a full sync"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Changes above `since`, oldest first. Repeat with the new cursor (and the
+    snapshot token, when there is one) while has_more.
+    """
+    return changes_since(db, current_user.id, since, limit, snapshot)
+
+
+# ---------- push ----------
+
+_LOGS = {"weight": (WeightLog, WeightLogIn), "intake": (IntakeLog, IntakeLogIn)}
+
+
+def _apply_log(db: Session, user_id: int, op: PushOp) -> None:
+    if op.day is None:
+        raise HTTPException(status_code=422, detail="day is required")
+    model, schema = _LOGS[op.entity]
+    if op.op == "delete":
+        # already gone counts as done, so retries are harmless
+        delete_log(db, model, op.entity, user_id, op.day)
+    else:
+        upsert_log(db, model, user_id, op.day, schema.model_validate(op.data).model_dump())
+
+
+def _apply_workout(db: Session, user_id: int, op: PushOp) -> int | None:
+    if op.op == "delete":
+        w = db.query(Workout).filter(Workout.id == op.id, Workout.user_id == user_id).first()
+        if w:
+            remove_workout(db, user_id, w)
+        return op.id
+
+    payload = WorkoutIn.model_validate(op.data)
+    w = None
+    if op.id is not None:
+        w = _own_workout(db, user_id, op.id)
+    elif payload.client_id is not None:
+        w = db.query(Workout).filter(Workout.user_id == user_id, Workout.client_id == payload.client_id).first()
+    if w is None:
+        return new_workout(db, user_id, payload).id
+
+    for field, value in payload.model_dump(exclude_unset=True).items():
+        if value is not None or field in ("name", "notes"):
+            setattr(w, field, value)
+    w.change_seq = reserve(db, user_id)
+    db.flush()
+    return w.id
+
+
+def _apply_set(db: Session, user_id: int, op: PushOp) -> int | None:
+    if op.op == "delete":
+        s = db.query(WorkoutSet).filter(WorkoutSet.id == op.id, WorkoutSet.user_id == user_id).first()
+        if s:
+            remove_set(db, user_id, s)
+        return op.id
+
+    if op.id is not None:
+        s = db.query(WorkoutSet).filter(WorkoutSet.id == op.id, WorkoutSet.user_id == user_id).first()
+        if not s:
+            raise HTTPException(status_code=404, detail="Set not found")
+        return change_set(db, user_id, s, SetPatch.model_validate(op.data)).id
+
+    payload = SetIn.model_validate(op.data)
+    if payload.client_id is not None:
+        # a retried push: report the stored row instead of a conflict
+        existing = db.query(WorkoutSet.id).filter(
+            WorkoutSet.user_id == user_id, WorkoutSet.client_id == payload.client_id
+        ).scalar()
+        if existing:
+            return existing
+
+    ref = op.data.get("workout_id") or op.data.get("workout")
+    if isinstance(ref, str):
+        w = db.query(Workout).filter(Workout.user_id == user_id, Workout.client_id == ref).first()
+        if not w:
+            raise HTTPException(status_code=404, detail="Workout not found")
+    elif isinstance(ref, int):
+        w = _own_workout(db, user_id, ref)
+    else:
+        raise HTTPException(status_code=422, detail="workout_id or workout (client id) is required")
+    return new_set(db, user_id, w, payload).id
+
+
+@router.post("/push", response_model=PushOut)
+def push(
+    payload: PushIn,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Apply a batch of offline writes in order, in one transaction. Each op runs
+    in its own savepoint, so a bad op is reported and skipped without losing
+    the rest. Log changes are folded into adaptive TDEE and rollups once, from
+    the earliest day touched.
+    """
+    if len(payload.ops) > settings.SYNC_PUSH_MAX_OPS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.SYNC_PUSH_MAX_OPS} ops per push")
+
+    user_id = current_user.id
+    results: list[PushResult] = []
+    logs_since: date | None = None
+
+    for op in payload.ops:
+        savepoint = db.begin_nested()
+        try:
+            if op.entity in _LOGS:
+                _apply_log(db, user_id, op)
+                logs_since = op.day if logs_since is None else min(logs_since, op.day)
+                row_id = None
+            elif op.entity == "workout":
+                row_id = _apply_workout(db, user_id, op)
+            else:
+                row_id = _apply_set(db, user_id, op)
+            savepoint.commit()
+            results.append(PushResult(ok=True, id=row_id))
+        except HTTPException as e:
+            savepoint.rollback()
+            results.append(PushResult(ok=False, error=str(e.detail)))
+        except ValidationError as e:
+            savepoint.rollback()
+            err = e.errors()[0]
+            where = ".".join(str(p) for p in err["loc"])
+            results.append(PushResult(ok=False, error=f"{where}: {err['msg']}" if where else err["msg"]))
+        except SQLAlchemyError as e:
+            savepoint.rollback()
+            results.append(PushResult(ok=False, error=e.__class__.__name__))
+
+    if logs_since is not None:
+        after_log_writes(db, user_id, logs_since)
+    db.commit()
+    if logs_since is not None:
+        session_cache.invalidate_user(user_id)
+    # no cursor here: other devices may have written since the last pull,
+    # so the client pulls next and gets these changes echoed with their seqs
+    return PushOut(results=results)
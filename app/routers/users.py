@@ -1,8 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
+from app.core.deps import get_current_user
+from app.core.etag import make_etag, not_modified
+from app.core.replica import get_read_db, read_session
+from app.core.settings import settings
+from app.core.tdee import compute_tdee, rows_from_result
 from app.models.user import User
+from app.schemas.tdee import TdeeBatchIn, TdeeOut
 from app.schemas.user import UserCreate, UserOut
 from app.core.security import hash_password
 
@@ -30,6 +40,90 @@ def create_user(payload: UserCreate, db: Session = Depends(get_db)):
     db.refresh(u)
     return u
 
+# plain columns are enough for the listing; no ORM objects in the export path
+_USER_OUT_COLUMNS = [getattr(User, name) for name in UserOut.model_fields]
+
+
+def _stream_users_ndjson(after_id: int | None):
+    # Own session: the request's get_db session is closed before the body streams.
+    # yield_per makes psycopg2 use a server-side cursor, so memory stays flat.
+    with read_session() as db:
+        stmt = select(*_USER_OUT_COLUMNS).order_by(User.id.asc())
+        if after_id is not None:
+            stmt = stmt.where(User.id > after_id)
+        result = db.execute(stmt.execution_options(yield_per=settings.USERS_STREAM_BATCH))
+        for rows in result.partitions():
+            yield "".join(UserOut.model_validate(r._mapping).model_dump_json() + "\n" for r in rows)
+
+
 @router.get("/", response_model=list[UserOut])
-def list_users(db: Session = Depends(get_db)):
-    return db.query(User).order_by(User.id.asc()).all()
+def list_users(
+    request: Request,
+    response: Response,
+    after_id: int | None = Query(None, description="Keyset cursor: the X-Next-Cursor of the previous page"),
+    limit: int | None = Query(
+        None, ge=1, le=settings.USERS_PAGE_SIZE_MAX,
+        description="Page size (default USERS_PAGE_SIZE); format=ndjson streams every user instead",
+    ),
+    format: Literal["json", "ndjson"] = Query("json", description="ndjson streams every user after `after_id`"),
+    db: Session = Depends(get_read_db),
+):
+    if format == "ndjson":
+        return StreamingResponse(_stream_users_ndjson(after_id), media_type="application/x-ndjson")
+
+    # always one bounded page, so memory and the ETag summary stay O(page); the full dump is ndjson
+    limit = limit or settings.USERS_PAGE_SIZE
+    q = db.query(User).order_by(User.id.asc())
+    if after_id is not None:
+        q = q.filter(User.id > after_id)
+
+    # validate against a one-row summary of the page before loading it: updated_at
+    # and change_seq only grow, so any edit, insert or delete in the window shows up
+    window = q.with_entities(User.id, User.updated_at, User.change_seq).limit(limit).subquery()
+    count, last_id, updated, seq_sum = db.query(
+        func.count(), func.max(window.c.id), func.max(window.c.updated_at), func.sum(window.c.change_seq)
+    ).one()
+
+    # a full page means there may be more; the client passes this back as after_id
+    full_page = count == limit
+    if full_page:
+        response.headers["X-Next-Cursor"] = str(last_id)
+    unchanged = not_modified(request, response, make_etag(after_id, limit, count, last_id, updated, seq_sum))
+    if unchanged:
+        if full_page:
+            unchanged.headers["X-Next-Cursor"] = str(last_id)
+        return unchanged
+    return q.limit(limit).all()
+
+
+@router.get("/me/tdee", response_model=TdeeOut)
+def my_tdee(
+    body_fat_pct: float | None = Query(None, gt=0, lt=100, description="Use Katch-McArdle with this body fat %"),
+    current_user: User = Depends(get_current_user),
+):
+    result = compute_tdee(
+        weight_kg=[current_user.weight_kg],
+        height_cm=[current_user.height_cm],
+        age=[current_user.age],
+        sex=[current_user.sex],
+        activity_level=[current_user.activity_level],
+        goal=[current_user.goal],
+        body_fat_pct=[body_fat_pct],
+    )
+    return rows_from_result(result)[0]
+
+
+@router.post("/tdee/batch", response_model=list[TdeeOut])
+def tdee_batch(payload: TdeeBatchIn, current_user: User = Depends(get_current_user)):
+    # one vectorized pass over all submitted profiles; order is preserved
+    p = payload.profiles
+    result = compute_tdee(
+        weight_kg=[x.weight_kg for x in p],
+        height_cm=[x.height_cm for x in p],
+        age=[x.age for x in p],
+        sex=[x.sex for x in p],
+        activity_level=[x.activity_level for x in p],
+        goal=[x.goal for x in p],
+        body_fat_pct=[x.body_fat_pct for x in p],
+    )
+    return rows_from_result(result)
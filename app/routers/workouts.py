@@ -0,0 +1,234 @@
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.deps import get_current_user
+from app.core.exercises import resolve_exercise_names, visible_exercise_ids
+from app.core.ingest import SetIngestor, iter_ndjson_lines
+from app.core.set_hooks import sets_added, sets_removing
+from app.core.settings import settings
+from app.core.sync import reserve, tombstone
+from app.models.user import User
+from app.models.workout import Workout, WorkoutSet
+from app.schemas.workout import IngestReport, SetIn, SetOut, SetPatch, WorkoutDetailOut, WorkoutIn, WorkoutOut
+
+router = APIRouter(prefix="/workouts", tags=["workouts"])
+
+
+def _own_workout(db: Session, user_id: int, workout_id: int) -> Workout:
+    w = db.query(Workout).filter(Workout.id == workout_id, Workout.user_id == user_id).first()
+    if not w:
+        raise HTTPException(status_code=404, detail="Workout not found")
+    return w
+
+
+def _own_set(db: Session, user_id: int, workout_id: int, set_id: int) -> WorkoutSet:
+    s = db.query(WorkoutSet).filter(
+        WorkoutSet.id == set_id, WorkoutSet.workout_id == workout_id, WorkoutSet.user_id == user_id
+    ).first()
+    if not s:
+        raise HTTPException(status_code=404, detail="Set not found")
+    return s
+
+
+def _exercise_id(db: Session, user_id: int, exercise_id: int | None, name: str | None) -> int:
+    if name is not None:
+        return resolve_exercise_names(db, user_id, [name])[name.strip().lower()]
+    if exercise_id in visible_exercise_ids(db, user_id, [exercise_id]):
+        return exercise_id
+    raise HTTPException(status_code=404, detail="Exercise not found")
+
+
+# Write helpers, shared with POST /sync/push; none of them commit.
+
+def new_workout(db: Session, user_id: int, payload: WorkoutIn) -> Workout:
+    w = Workout(
+        user_id=user_id,
+        name=payload.name,
+        notes=payload.notes,
+        started_at=payload.started_at or datetime.now(timezone.utc),
+        client_id=payload.client_id,
+        change_seq=reserve(db, user_id),
+    )
+    db.add(w)
+    db.flush()
+    return w
+
+
+def new_set(db: Session, user_id: int, w: Workout, payload: SetIn) -> WorkoutSet:
+    exercise_id = _exercise_id(db, user_id, payload.exercise_id, payload.exercise)
+    if payload.client_id is not None:
+        existing = db.query(WorkoutSet).filter(
+            WorkoutSet.user_id == user_id, WorkoutSet.client_id == payload.client_id
+        ).first()
+        if existing:
+            raise HTTPException(status_code=409, detail="Set with this client_id already exists")
+
+    s = WorkoutSet(
+        workout_id=w.id,
+        user_id=user_id,
+        exercise_id=exercise_id,
+        set_index=payload.set_index,
+        reps=payload.reps,
+        weight_kg=payload.weight_kg,
+        rpe=payload.rpe,
+        performed_at=payload.performed_at or w.started_at,
+        client_id=payload.client_id,
+        change_seq=reserve(db, user_id),
+    )
+    db.add(s)
+    db.flush()
+    sets_added(db, user_id, [s.id])
+    return s
+
+
+def change_set(db: Session, user_id: int, s: WorkoutSet, payload: SetPatch) -> WorkoutSet:
+    # explicit nulls only clear the optional columns
+    changes = {
+        k: v for k, v in payload.model_dump(exclude_unset=True).items()
+        if v is not None or k in ("set_index", "rpe")
+    }
+    if "exercise" in changes or "exercise_id" in changes:
+        changes["exercise_id"] = _exercise_id(db, user_id, changes.pop("exercise_id", None), changes.pop("exercise", None))
+
+    sets_removing(db, user_id, [s.id])
+    for field, value in changes.items():
+        setattr(s, field, value)
+    s.change_seq = reserve(db, user_id)
+    db.flush()
+    sets_added(db, user_id, [s.id])
+    return s
+
+
+def remove_set(db: Session, user_id: int, s: WorkoutSet) -> None:
+    sets_removing(db, user_id, [s.id])
+    tombstone(db, user_id, "set", [s.id])
+    db.delete(s)
+    db.flush()
+
+
+def remove_workout(db: Session, user_id: int, w: Workout) -> None:
+    set_ids = db.execute(select(WorkoutSet.id).where(WorkoutSet.workout_id == w.id)).scalars().all()
+    sets_removing(db, user_id, set_ids)
+    tombstone(db, user_id, "set", set_ids)
+    tombstone(db, user_id, "workout", [w.id])
+    # sets go with the workout (ON DELETE CASCADE)
+    db.execute(delete(Workout).where(Workout.id == w.id))
+
+
+@router.post("/", response_model=WorkoutOut, status_code=201)
+def create_workout(
+    payload: WorkoutIn,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    w = new_workout(db, current_user.id, payload)
+    db.commit()
+    db.refresh(w)
+    return w
+
+
+@router.get("/", response_model=list[WorkoutOut])
+def list_workouts(
+    response: Response,
+    before_id: int | None = Query(None, description="Keyset cursor: the X-Next-Cursor of the previous page"),
+    limit: int = Query(settings.WORKOUTS_PAGE_SIZE, ge=1, le=settings.WORKOUTS_PAGE_SIZE_MAX),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    # newest first
+    q = db.query(Workout).filter(Workout.user_id == current_user.id).order_by(Workout.id.desc())
+    if before_id is not None:
+        q = q.filter(Workout.id < before_id)
+    page = q.limit(limit).all()
+    if len(page) == limit:
+        response.headers["X-Next-Cursor"] = str(page[-1].id)
+    return page
+
+
+@router.post("/ingest", response_model=IngestReport)
+async def ingest(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Bulk upload as NDJSON (application/x-ndjson), one workout or set per line;
+    see app.core.ingest for the line format. Rows are committed per chunk, so
+    a failed line never blocks the rest; the report lists per-line errors.
+    """
+    ingestor = SetIngestor(db, current_user.id)
+    async for line_no, raw in iter_ndjson_lines(request.stream(), settings.INGEST_MAX_LINE_BYTES):
+        if ingestor.add(line_no, raw) >= settings.INGEST_CHUNK_ROWS:
+            await run_in_threadpool(ingestor.flush)
+    await run_in_threadpool(ingestor.flush)
+    return ingestor.report
+
+
+@router.get("/{workout_id}", response_model=WorkoutDetailOut)
+def get_workout(
+    workout_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    w = _own_workout(db, current_user.id, workout_id)
+    w.sets.sort(key=lambda s: (s.performed_at, s.set_index or 0, s.id))
+    return w
+
+
+@router.post("/{workout_id}/sets", response_model=SetOut, status_code=201)
+def add_set(
+    workout_id: int,
+    payload: SetIn,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    w = _own_workout(db, current_user.id, workout_id)
+    s = new_set(db, current_user.id, w, payload)
+    db.commit()
+    db.refresh(s)
+    return s
+
+
+@router.patch("/{workout_id}/sets/{set_id}", response_model=SetOut)
+def update_set(
+    workout_id: int,
+    set_id: int,
+    payload: SetPatch,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    s = _own_set(db, current_user.id, workout_id, set_id)
+    change_set(db, current_user.id, s, payload)
+    db.commit()
+    db.refresh(s)
+    return s
+
+
+@router.delete("/{workout_id}/sets/{set_id}", status_code=204)
+def delete_set(
+    workout_id: int,
+    set_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    s = _own_set(db, current_user.id, workout_id, set_id)
+    remove_set(db, current_user.id, s)
+    db.commit()
+    return Response(status_code=204)
+
+
+@router.delete("/{workout_id}", status_code=204)
+def delete_workout(
+    workout_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    w = _own_workout(db, current_user.id, workout_id)
+    remove_workout(db, current_user.id, w)
+    db.commit()
+    return Response(status_code=204)
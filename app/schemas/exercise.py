@@ -0,0 +1,35 @@
+import re
+from typing import Annotated
+
+from pydantic import AfterValidator, BaseModel, Field
+
+
+def _has_word(name: str) -> str:
+    # search matches on words; a name without any ("+++", "  ") couldn't be indexed or found
+    if not re.search(r"\w", name):
+        raise ValueError("must contain a letter or digit")
+    return name
+
+# an exercise name as clients send it (ExerciseIn, SetIn.exercise, ...)
+ExerciseName = Annotated[str, Field(min_length=1, max_length=100), AfterValidator(_has_word)]
+
+class ExerciseOut(BaseModel):
+    id: int
+    name: str
+    aliases: list[str] = []
+    muscle_group: str | None = None
+    custom: bool  # the user's own, not from the catalog
+
+    class Config:
+        from_attributes = True
+
+class ExerciseIn(BaseModel):
+    name: ExerciseName
+    aliases: list[str] = Field(default_factory=list, max_length=10)
+    muscle_group: str | None = Field(None, max_length=30)
+
+class ExercisePatch(BaseModel):
+    # only the fields sent are changed
+    name: ExerciseName | None = None
+    aliases: list[str] | None = Field(None, max_length=10)
+    muscle_group: str | None = Field(None, max_length=30)
@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Literal
+from pydantic import BaseModel
+
+ExportDataset = Literal["profile", "sessions", "weight", "intake", "workouts", "sets", "all"]
+ExportFormat = Literal["csv", "parquet"]
+
+class ExportJobIn(BaseModel):
+    dataset: ExportDataset = "all"
+    format: ExportFormat = "csv"
+    gzip: bool = False               # single datasets as CSV only; "all" is a ZIP already
+
+class ExportJobOut(BaseModel):
+    token: str
+    dataset: str
+    format: str
+    gzip: bool
+    status: str                      # "pending" | "running" | "done" | "failed"
+    rows: int | None = None
+    size_bytes: int | None = None
+    error: str | None = None
+    created_at: datetime
+    finished_at: datetime | None = None
+    expires_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,28 @@
+from datetime import date
+from pydantic import BaseModel, Field
+
+class WeightLogIn(BaseModel):
+    weight_kg: float = Field(..., gt=0, lt=700)
+
+class WeightLogOut(BaseModel):
+    logged_on: date
+    weight_kg: float
+
+    class Config:
+        from_attributes = True
+
+class IntakeLogIn(BaseModel):
+    kcal: int = Field(..., ge=0, lt=50000)
+
+class IntakeLogOut(BaseModel):
+    logged_on: date
+    kcal: int
+
+    class Config:
+        from_attributes = True
+
+class AdaptiveTdeeOut(BaseModel):
+    # None until there are ADAPTIVE_TDEE_MIN_DAYS of both weight and intake
+    adaptive_tdee: float | None = None
+    weight_trend_kg: float | None = None
+    as_of: date | None = None
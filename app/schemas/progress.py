@@ -0,0 +1,31 @@
+from datetime import date
+from pydantic import BaseModel
+
+class DailyProgressOut(BaseModel):
+    day: date
+    volume_kg: float
+    set_count: int
+    weight_kg: float | None = None
+    intake_kcal: int | None = None
+    target_kcal: float | None = None
+    muscle_sets: dict[str, int] = {}
+
+class WeeklyProgressOut(BaseModel):
+    week_start: date
+    volume_kg: float
+    set_count: int
+    weight_avg_kg: float | None = None
+    weight_days: int
+    intake_kcal: int
+    target_kcal: float
+    intake_days: int
+    on_target_days: int
+    adherence: float | None = None   # intake / target over the logged days
+    muscle_sets: dict[str, int] = {}
+
+class SeriesOut(BaseModel):
+    metric: str
+    total: int                       # points before downsampling
+    x: list[date]
+    y: list[float]
+    trend: list[float] | None = None
@@ -0,0 +1,34 @@
+from datetime import datetime
+from pydantic import BaseModel
+
+class ExerciseRecordOut(BaseModel):
+    exercise_id: int
+    exercise: str
+    epley_kg: float | None = None
+    epley_set_id: int | None = None
+    epley_at: datetime | None = None
+    brzycki_kg: float | None = None
+    brzycki_set_id: int | None = None
+    brzycki_at: datetime | None = None
+    volume_kg: float | None = None
+    volume_set_id: int | None = None
+    volume_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
+
+class RepRecordOut(BaseModel):
+    weight_kg: float
+    reps: int
+    set_id: int
+    achieved_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ExerciseRecordDetailOut(ExerciseRecordOut):
+    reps: list[RepRecordOut] = []    # by weight, lightest first
+
+class SetRecordsOut(BaseModel):
+    set_id: int
+    records: list[str]               # "epley" | "brzycki" | "volume" | "reps"
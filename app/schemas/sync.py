@@ -0,0 +1,35 @@
+from datetime import date
+from typing import Any, Literal
+from pydantic import BaseModel
+
+class ChangeOut(BaseModel):
+    seq: int
+    entity: str                      # "workout" | "set" | "weight" | "intake"
+    op: Literal["upsert", "delete"]
+    data: dict[str, Any]             # the row, or {"key": id-or-day} for deletes
+
+class SyncOut(BaseModel):
+    cursor: int                      # pass back as ?since=
+    has_more: bool
+    reset: bool                      # cursor too old: drop local data, this is a full snapshot
+    changes: list[ChangeOut]
+    profile: dict[str, Any] | None = None  # the user's UserOut, when it changed
+    snapshot: int | None = None      # paging a full sync: pass back as ?snapshot= with the cursor
+
+class PushOp(BaseModel):
+    entity: Literal["workout", "set", "weight", "intake"]
+    op: Literal["upsert", "delete"]
+    id: int | None = None            # server id of an existing workout / set
+    day: date | None = None          # weight / intake entries are keyed by day
+    data: dict[str, Any] = {}        # WorkoutIn, SetIn (+ workout_id / workout), SetPatch, WeightLogIn, IntakeLogIn
+
+class PushIn(BaseModel):
+    ops: list[PushOp]                # at most SYNC_PUSH_MAX_OPS
+
+class PushResult(BaseModel):
+    ok: bool
+    id: int | None = None            # server id of a created / updated workout or set
+    error: str | None = None
+
+class PushOut(BaseModel):
+    results: list[PushResult]        # same order as the ops
@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+
+class TdeeProfileIn(BaseModel):
+    weight_kg: float | None = Field(None, gt=0)
+    height_cm: float | None = Field(None, gt=0)
+    age: int | None = Field(None, gt=0)
+    sex: str | None = None              # "male" | "female"
+    activity_level: str | None = None   # see app.core.tdee.ACTIVITY_MULTIPLIERS
+    goal: str | None = None             # "cut" | "maintain" | "bulk"
+    body_fat_pct: float | None = Field(None, gt=0, lt=100)  # switches to Katch-McArdle
+
+class TdeeBatchIn(BaseModel):
+    profiles: list[TdeeProfileIn] = Field(..., max_length=10000)
+
+class TdeeOut(BaseModel):
+    # None when the profile lacks what the formula needs
+    bmr: float | None = None
+    tdee: float | None = None
+    target_kcal: float | None = None
+    activity_multiplier: float | None = None
+    goal_adjustment: float | None = None
+    formula: str | None = None          # "katch_mcardle" | "mifflin_st_jeor"
@@ -21,6 +21,8 @@ class UserOut(BaseModel):
     weight_kg: float | None = None
     activity_level: str | None = None
     goal: str | None = None
+    adaptive_tdee: float | None = None
+    weight_trend_kg: float | None = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,101 @@
+from datetime import datetime
+from typing import Literal
+from pydantic import BaseModel, Field, model_validator
+
+from app.schemas.exercise import ExerciseName
+
+class WorkoutIn(BaseModel):
+    name: str | None = Field(None, max_length=100)
+    notes: str | None = None
+    started_at: datetime | None = None
+    client_id: str | None = Field(None, min_length=1, max_length=64)
+
+class SetIn(BaseModel):
+    # either a known exercise id or a name (unknown names become custom exercises)
+    exercise_id: int | None = None
+    exercise: ExerciseName | None = None
+    set_index: int | None = Field(None, ge=0, le=1000)
+    reps: int = Field(..., ge=0, le=1000)
+    weight_kg: float = Field(0, ge=0, lt=2000)
+    rpe: float | None = Field(None, ge=0, le=10)
+    performed_at: datetime | None = None  # defaults to the workout's started_at
+    client_id: str | None = Field(None, min_length=1, max_length=64)
+
+    @model_validator(mode="after")
+    def _one_exercise_ref(self):
+        if (self.exercise_id is None) == (self.exercise is None):
+            raise ValueError("give exactly one of exercise_id / exercise")
+        return self
+
+class SetPatch(BaseModel):
+    # only the fields sent are changed
+    exercise_id: int | None = None
+    exercise: ExerciseName | None = None
+    set_index: int | None = Field(None, ge=0, le=1000)
+    reps: int | None = Field(None, ge=0, le=1000)
+    weight_kg: float | None = Field(None, ge=0, lt=2000)
+    rpe: float | None = Field(None, ge=0, le=10)
+    performed_at: datetime | None = None
+
+    @model_validator(mode="after")
+    def _one_exercise_ref(self):
+        if self.exercise_id is not None and self.exercise is not None:
+            raise ValueError("give at most one of exercise_id / exercise")
+        return self
+
+class SetOut(BaseModel):
+    id: int
+    workout_id: int
+    exercise_id: int
+    set_index: int | None = None
+    reps: int
+    weight_kg: float
+    rpe: float | None = None
+    performed_at: datetime
+    client_id: str | None = None
+
+    class Config:
+        from_attributes = True
+
+class WorkoutOut(BaseModel):
+    id: int
+    name: str | None = None
+    notes: str | None = None
+    started_at: datetime
+    client_id: str | None = None
+
+    class Config:
+        from_attributes = True
+
+class WorkoutDetailOut(WorkoutOut):
+    sets: list[SetOut] = []
+
+# ---- NDJSON ingest (POST /workouts/ingest), one object per line ----
+
+class IngestWorkoutLine(WorkoutIn):
+    type: Literal["workout"]
+    client_id: str = Field(..., min_length=1, max_length=64)
+
+class IngestSetLine(SetIn):
+    type: Literal["set"] = "set"
+    # an existing workout id, or the client_id of a workout line / earlier upload
+    workout_id: int | None = None
+    workout: str | None = Field(None, min_length=1, max_length=64)
+
+    @model_validator(mode="after")
+    def _one_workout_ref(self):
+        if (self.workout_id is None) == (self.workout is None):
+            raise ValueError("give exactly one of workout_id / workout")
+        return self
+
+class IngestError(BaseModel):
+    line: int
+    error: str
+
+class IngestReport(BaseModel):
+    lines: int = 0
+    workouts: int = 0        # workout lines upserted
+    inserted: int = 0        # new sets
+    duplicates: int = 0      # sets whose client_id was already stored
+    errors: list[IngestError] = []
+    errors_truncated: bool = False
@@ -0,0 +1,140 @@
+"""
+Benchmark: worker cold start, from a fresh interpreter to the first response.
+
+    python -m benchmarks.bench_cold_start [--runs 7] [--server] [--out FILE] [--compare FILE]
+
+Each run starts a new Python process that times, in order:
+
+- import    `import app.main`
+- create    `create_app()`
+- startup   the lifespan (engines, workers, exercise index load)
+- first     the first request (GET /), which pays for anything still lazy
+
+--server also times `uvicorn --factory app.main:create_app` from spawn to
+the first 200 on /, interpreter start included, which is what an
+autoscaling event waits for. Needs DATABASE_URL and migrations (startup
+loads the exercise index). `--out` and `--compare` work like load_test's,
+on the median total.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from benchmarks.load_test import _free_port, _git_rev
+
+_CHILD = """
+import json, time
+t0 = time.perf_counter()
+import app.main
+t1 = time.perf_counter()
+app = app.main.create_app()
+t2 = time.perf_counter()
+from fastapi.testclient import TestClient  # not part of a real worker; excluded
+t3 = time.perf_counter()
+with TestClient(app) as client:
+    t4 = time.perf_counter()
+    status = client.get("/").status_code
+    t5 = time.perf_counter()
+assert status == 200, status
+ms = lambda a, b: round((b - a) * 1000, 1)
+print(json.dumps({"import": ms(t0, t1), "create": ms(t1, t2), "startup": ms(t3, t4), "first": ms(t4, t5)}))
+"""
+
+PHASES = ("import", "create", "startup", "first")
+
+
+def _child_env() -> dict:
+    return {**os.environ, "RATE_LIMIT_ENABLED": os.getenv("RATE_LIMIT_ENABLED", "false"), "PYTHONWARNINGS": "ignore"}
+
+
+def in_process(runs: int) -> list[dict]:
+    out = []
+    for _ in range(runs):
+        res = subprocess.run([sys.executable, "-c", _CHILD], capture_output=True, text=True, env=_child_env())
+        if res.returncode:
+            raise SystemExit(f"child failed:\n{res.stderr}")
+        row = json.loads(res.stdout.strip().splitlines()[-1])
+        row["total"] = round(sum(row[p] for p in PHASES), 1)
+        out.append(row)
+    return out
+
+
+def server(runs: int) -> list[float]:
+    """Milliseconds from spawning uvicorn to its first 200 on /."""
+    out = []
+    for _ in range(runs):
+        port = _free_port()
+        url = f"http://127.0.0.1:{port}/"
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "--factory", "app.main:create_app",
+             "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+            env=_child_env(),
+        )
+        try:
+            while True:
+                if proc.poll() is not None:
+                    raise SystemExit(f"uvicorn exited with {proc.returncode}")
+                try:
+                    with urllib.request.urlopen(url, timeout=1) as r:
+                        if r.status == 200:
+                            break
+                except OSError:
+                    time.sleep(0.005)
+                if time.perf_counter() - start > 60:
+                    raise SystemExit("uvicorn did not come up within 60s")
+            out.append(round((time.perf_counter() - start) * 1000, 1))
+        finally:
+            proc.terminate()
+            proc.wait()
+    return out
+
+
+def _summary(values: list[float]) -> dict:
+    return {"median": round(statistics.median(values), 1), "min": min(values), "max": max(values)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--server", action="store_true", help="also time uvicorn spawn -> first 200")
+    parser.add_argument("--out", help="write results as JSON")
+    parser.add_argument("--compare", help="baseline JSON from --out; exit 1 if the median total regressed")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    rows = in_process(args.runs)
+    result = {"rev": _git_rev(), "runs": args.runs, "phases": {}}
+    print(f"{'phase':<10} {'median':>9} {'min':>9} {'max':>9}   (ms, {args.runs} runs)")
+    for phase in PHASES + ("total",):
+        s = result["phases"][phase] = _summary([r[phase] for r in rows])
+        print(f"{phase:<10} {s['median']:>9} {s['min']:>9} {s['max']:>9}")
+    if args.server:
+        s = result["phases"]["server"] = _summary(server(args.runs))
+        print(f"{'server':<10} {s['median']:>9} {s['min']:>9} {s['max']:>9}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            base = json.load(f)["phases"]
+        problems = [
+            f"{phase}: median {base[phase]['median']}ms -> {cur['median']}ms"
+            for phase, cur in result["phases"].items()
+            if phase in ("total", "server") and phase in base
+            and cur["median"] > base[phase]["median"] * (1 + args.tolerance)
+        ]
+        for p in problems:
+            print("REGRESSION", p)
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Micro-benchmark: exercise autocomplete from the in-memory index.
+
+    python -m benchmarks.bench_exercise_search [--catalog 2000] [--users 1000] [--custom 20] [--db]
+
+Builds the index from a synthetic catalog ("Incline Dumbbell Bench Press",
+...) plus --custom exercises for each of --users users, then replays typing:
+every prefix of a sample of names, as one user. Prints per-keystroke latency
+in microseconds. --db times the same keystrokes as an ILIKE '%q%' query on
+the local database for comparison (needs DATABASE_URL and migrations).
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from app.core.exercise_index import ExerciseIndex
+
+MODIFIERS = ["", "Incline", "Decline", "Seated", "Standing", "Single-Arm", "Paused", "Deficit", "Close-Grip", "Wide-Grip"]
+EQUIPMENT = ["Barbell", "Dumbbell", "Cable", "Machine", "Kettlebell", "Smith Machine", "Band", "EZ-Bar"]
+MOVEMENTS = [
+    "Bench Press", "Squat", "Deadlift", "Row", "Curl", "Shoulder Press", "Lunge", "Fly", "Pulldown",
+    "Triceps Extension", "Lateral Raise", "Shrug", "Hip Thrust", "Calf Raise", "Split Squat",
+]
+MUSCLES = ["chest", "back", "legs", "shoulders", "arms", "core", "glutes", "calves"]
+
+
+def _rows(args) -> list[SimpleNamespace]:
+    now = datetime.now(timezone.utc)
+    names = sorted({" ".join(p for p in (m, e, mv) if p) for m in MODIFIERS for e in EQUIPMENT for mv in MOVEMENTS})
+    rng = random.Random(7)
+    rng.shuffle(names)
+    rows = []
+    for i, name in enumerate(names[:args.catalog]):
+        alias = "".join(w[0] for w in name.split())  # "IDBP"-style abbreviations
+        rows.append(SimpleNamespace(id=i + 1, user_id=None, name=name, aliases=[alias],
+                                    muscle_group=MUSCLES[i % len(MUSCLES)], updated_at=now))
+    next_id = len(rows) + 1
+    for uid in range(1, args.users + 1):
+        for j in range(args.custom):
+            rows.append(SimpleNamespace(id=next_id, user_id=uid, name=f"{rng.choice(MOVEMENTS)} Variation {j}",
+                                        aliases=[], muscle_group=None, updated_at=now))
+            next_id += 1
+    return rows
+
+
+def _keystrokes(rows, n: int) -> list[str]:
+    rng = random.Random(11)
+    catalog = [r.name for r in rows if r.user_id is None]
+    out = []
+    for name in rng.sample(catalog, min(n, len(catalog))):
+        typed = name.lower()[:12]
+        out.extend(typed[:k] for k in range(1, len(typed) + 1))
+    return out
+
+
+def _report(label: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95)]
+    print(f"{label:<8} {len(samples):>7} queries  mean {statistics.fmean(samples):>9.1f} us  "
+          f"p50 {statistics.median(samples):>9.1f} us  p95 {p95:>9.1f} us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--catalog", type=int, default=2000, help="catalog exercises (max ~1200 distinct)")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--custom", type=int, default=20, help="custom exercises per user")
+    parser.add_argument("--names", type=int, default=200, help="names typed out, 12 keystrokes each at most")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--db", action="store_true", help="also time ILIKE queries on the database")
+    args = parser.parse_args()
+
+    rows = _rows(args)
+    index = ExerciseIndex(interval=3600)
+    start = time.perf_counter()
+    index.upsert(rows)
+    print(f"indexed {len(index)} exercises in {(time.perf_counter() - start) * 1e3:.0f} ms")
+
+    queries = _keystrokes(rows, args.names)
+    user_id = 1
+    for q in queries[:200]:  # warm up
+        index.search(user_id, q, args.limit)
+    samples = []
+    for q in queries:
+        t = time.perf_counter()
+        index.search(user_id, q, args.limit)
+        samples.append((time.perf_counter() - t) * 1e6)
+    _report("memory", samples)
+
+    if args.db:
+        from sqlalchemy import or_, select
+
+        from app.core.database import SessionLocal
+        from app.models.workout import Exercise
+
+        samples = []
+        with SessionLocal() as db:
+            for q in queries:
+                t = time.perf_counter()
+                db.execute(
+                    select(Exercise.id, Exercise.name)
+                    .where(Exercise.name.ilike(f"%{q}%"), or_(Exercise.user_id == user_id, Exercise.user_id.is_(None)))
+                    .order_by(Exercise.name)
+                    .limit(args.limit)
+                ).all()
+                samples.append((time.perf_counter() - t) * 1e6)
+        _report("ILIKE", samples)
+
+
+if __name__ == "__main__":
+    main()
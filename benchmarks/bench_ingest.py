@@ -0,0 +1,111 @@
+"""
+Benchmark: bulk NDJSON set ingest vs one POST per set.
+
+    python -m benchmarks.bench_ingest [--sets 20000] [--single 1000] [--concurrency 8]
+
+Seeds one bench user, boots uvicorn like load_test (or use --base-url),
+then times --single sets posted one by one to /workouts/{id}/sets
+(--concurrency in flight) and --sets sets streamed to /workouts/ingest.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.load_test import BENCH_PASSWORD, boot_server, seed
+
+EXERCISES = ["Bench Press", "Squat", "Deadlift", "Overhead Press", "Barbell Row"]
+
+
+def _set(i: int, run: str) -> dict:
+    return {
+        "exercise": EXERCISES[i % len(EXERCISES)],
+        "set_index": i % 5,
+        "reps": 5 + i % 6,
+        "weight_kg": 60 + (i % 40) * 2.5,
+        "client_id": f"{run}-{i}",
+    }
+
+
+async def one_by_one(client: httpx.AsyncClient, auth: dict, workout_id: int, n: int, concurrency: int, run: str) -> float:
+    queue = iter(range(n))
+    failures = 0
+
+    async def worker():
+        nonlocal failures
+        for i in queue:
+            r = await client.post(f"/workouts/{workout_id}/sets", json=_set(i, run), headers=auth)
+            failures += r.status_code != 201
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    if failures:
+        print(f"  {failures} single POSTs failed")
+    return elapsed
+
+
+async def bulk(client: httpx.AsyncClient, auth: dict, n: int, run: str) -> float:
+    async def body():
+        yield json.dumps({"type": "workout", "client_id": f"{run}-w", "name": "bench bulk"}).encode() + b"\n"
+        batch = []
+        for i in range(n):
+            batch.append(json.dumps({"workout": f"{run}-w", **_set(i, run)}))
+            if len(batch) == 1000:
+                yield ("\n".join(batch) + "\n").encode()
+                batch = []
+        if batch:
+            yield ("\n".join(batch) + "\n").encode()
+
+    start = time.perf_counter()
+    r = await client.post(
+        "/workouts/ingest", content=body(), headers={**auth, "content-type": "application/x-ndjson"}
+    )
+    elapsed = time.perf_counter() - start
+    report = r.json()
+    print(f"  ingest report: inserted={report['inserted']} duplicates={report['duplicates']} errors={len(report['errors'])}")
+    return elapsed
+
+
+async def run(base_url: str, email: str, args) -> None:
+    tag = f"bench{int(time.time())}"
+    async with httpx.AsyncClient(base_url=base_url, timeout=300) as client:
+        tokens = (await client.post("/auth/login", json={"email": email, "password": BENCH_PASSWORD})).json()
+        auth = {"Authorization": f"Bearer {tokens['access_token']}"}
+        workout = (await client.post("/workouts/", json={"name": "bench single"}, headers=auth)).json()
+
+        single = await one_by_one(client, auth, workout["id"], args.single, args.concurrency, tag + "-s")
+        bulk_s = await bulk(client, auth, args.sets, tag + "-b")
+
+    single_rate = args.single / single
+    bulk_rate = args.sets / bulk_s
+    print(f"{'single POST':<12} {args.single:>8} sets {single:>8.2f}s {single_rate:>12,.0f} sets/s")
+    print(f"{'bulk ingest':<12} {args.sets:>8} sets {bulk_s:>8.2f}s {bulk_rate:>12,.0f} sets/s")
+    print(f"speedup      {bulk_rate / single_rate:.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", help="target a running server instead of booting one")
+    parser.add_argument("--sets", type=int, default=20_000, help="sets in the bulk upload")
+    parser.add_argument("--single", type=int, default=1_000, help="sets posted one at a time")
+    parser.add_argument("--concurrency", type=int, default=8, help="single POSTs in flight")
+    args = parser.parse_args()
+
+    email = seed(1, 0)[0]
+    proc = None
+    base_url = args.base_url
+    if not base_url:
+        proc, base_url = boot_server(1)
+    try:
+        asyncio.run(run(base_url, email, args))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+End-to-end load test for the auth/users API.
+
+    python -m benchmarks.load_test --duration 30 --concurrency 32 --out benchmarks/baselines/local.json
+    python -m benchmarks.load_test --compare benchmarks/baselines/local.json
+
+Seeds verified users (and extra idle sessions) straight into DATABASE_URL,
+boots `uvicorn app.main:app` on a free port (or targets --base-url), drives
+a weighted mix of /auth/login, /auth/me, /auth/refresh, /auth/sessions and
+/users/ from --concurrency virtual clients, then prints throughput and
+p50/p95/p99 latency per endpoint. See benchmarks/README.md.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from pathlib import Path
+
+import httpx
+
+BENCH_PASSWORD = "bench-password-123"
+DEFAULT_MIX = "me=55,sessions=15,refresh=10,users=15,login=5"
+
+
+# ---------- seeding ----------
+
+def seed(users: int, sessions_per_user: int) -> list[str]:
+    """Insert bench users (idempotent) with extra idle sessions; returns their emails."""
+    from uuid import uuid4
+
+    from sqlalchemy import func, select
+    from sqlalchemy.dialects.postgresql import insert
+
+    from app.core.database import SessionLocal
+    from app.core.security import get_hasher
+    from app.models import Session, User
+
+    # one Argon2 hash shared by every bench user keeps seeding fast
+    hashed = get_hasher().hash(BENCH_PASSWORD)
+    emails = [f"bench-{i}@fitdojo.bench" for i in range(users)]
+    with SessionLocal() as db:
+        db.execute(
+            insert(User)
+            .values([
+                {"email": e, "hashed_password": hashed, "is_verified": True, "name": f"Bench {i}",
+                 "age": 30, "sex": "male", "height_cm": 178, "weight_kg": 80,
+                 "activity_level": "moderate", "goal": "maintain"}
+                for i, e in enumerate(emails)
+            ])
+            .on_conflict_do_nothing(index_elements=["email"])
+        )
+        ids = db.execute(select(User.id).where(User.email.in_(emails))).scalars().all()
+        have = dict(
+            db.execute(
+                select(Session.user_id, func.count()).where(Session.user_id.in_(ids)).group_by(Session.user_id)
+            ).all()
+        )
+        missing = [
+            {"user_id": uid, "jti": uuid4().hex, "ip": "10.0.0.1", "user_agent": "bench-seed"}
+            for uid in ids
+            for _ in range(max(0, sessions_per_user - have.get(uid, 0)))
+        ]
+        if missing:
+            db.execute(insert(Session).values(missing))
+        db.commit()
+    return emails
+
+
+# ---------- server ----------
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def boot_server(workers: int) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = {**os.environ, "RATE_LIMIT_ENABLED": os.getenv("RATE_LIMIT_ENABLED", "false")}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        env=env,
+    )
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"uvicorn exited with {proc.returncode}")
+        try:
+            if httpx.get(base + "/", timeout=1).status_code == 200:
+                return proc, base
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit("uvicorn did not come up within 30s")
+
+
+# ---------- load ----------
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+
+    def add(self, name: str, seconds: float, ok: bool) -> None:
+        self.latencies.setdefault(name, []).append(seconds)
+        if not ok:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+
+def _pct(sorted_vals: list[float], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    idx = min(len(sorted_vals) - 1, max(0, round(q * (len(sorted_vals) - 1))))
+    return sorted_vals[idx]
+
+
+def summarize(rec: Recorder, elapsed: float) -> dict:
+    out = {}
+    for name, vals in sorted(rec.latencies.items()):
+        vals = sorted(vals)
+        out[name] = {
+            "requests": len(vals),
+            "errors": rec.errors.get(name, 0),
+            "rps": round(len(vals) / elapsed, 2),
+            "p50_ms": round(_pct(vals, 0.50) * 1000, 3),
+            "p95_ms": round(_pct(vals, 0.95) * 1000, 3),
+            "p99_ms": round(_pct(vals, 0.99) * 1000, 3),
+        }
+    return out
+
+
+async def _login(client: httpx.AsyncClient, email: str) -> dict | None:
+    r = await client.post("/auth/login", json={"email": email, "password": BENCH_PASSWORD})
+    return r.json() if r.status_code == 200 else None
+
+
+async def virtual_client(client, email, mix, deadline, rec: Recorder, rng: random.Random) -> None:
+    tokens = await _login(client, email)
+    if tokens is None:
+        rec.add("login", 0.0, False)
+        return
+    names, weights = zip(*mix.items())
+
+    while time.monotonic() < deadline:
+        op = rng.choices(names, weights)[0]
+        auth = {"Authorization": f"Bearer {tokens['access_token']}"}
+        t0 = time.perf_counter()
+        if op == "me":
+            r = await client.get("/auth/me", headers=auth)
+        elif op == "sessions":
+            r = await client.get("/auth/sessions", headers=auth)
+        elif op == "users":
+            r = await client.get("/users/", params={"limit": 50}, headers=auth)
+        elif op == "refresh":
+            r = await client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}, headers=auth)
+            if r.status_code == 200:
+                tokens = {**tokens, **r.json()}
+        elif op == "login":
+            r = await client.post("/auth/login", json={"email": email, "password": BENCH_PASSWORD})
+            if r.status_code == 200:
+                tokens = r.json()
+        else:
+            raise ValueError(op)
+        rec.add(op, time.perf_counter() - t0, r.status_code < 400)
+
+
+async def drive(base_url: str, emails: list[str], mix: dict[str, int], concurrency: int, duration: float, seed_: int):
+    rec = Recorder()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    # no cookie jar: every virtual client authenticates with its own bearer token
+    jar = CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, cookies=jar, timeout=30) as client:
+        started = time.monotonic()
+        deadline = started + duration
+        await asyncio.gather(*(
+            virtual_client(client, emails[i % len(emails)], mix, deadline, rec, random.Random(seed_ + i))
+            for i in range(concurrency)
+        ))
+        elapsed = time.monotonic() - started
+    return summarize(rec, elapsed), elapsed
+
+
+# ---------- baselines ----------
+
+def _git_rev() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Endpoints whose p95 grew or whose throughput fell by more than `tolerance`."""
+    problems = []
+    for name, base in baseline["endpoints"].items():
+        cur = current["endpoints"].get(name)
+        if cur is None:
+            continue
+        if base["p95_ms"] and cur["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            problems.append(f"{name}: p95 {base['p95_ms']}ms -> {cur['p95_ms']}ms")
+        if base["rps"] and cur["rps"] < base["rps"] * (1 - tolerance):
+            problems.append(f"{name}: rps {base['rps']} -> {cur['rps']}")
+    return problems
+
+
+def print_table(endpoints: dict) -> None:
+    print(f"{'endpoint':<10}{'reqs':>8}{'err':>6}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, r in endpoints.items():
+        print(f"{name:<10}{r['requests']:>8}{r['errors']:>6}{r['rps']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="FitDojo API load test")
+    parser.add_argument("--base-url", help="target a running server instead of booting one")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers when booting the server")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--sessions-per-user", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"weighted ops (default {DEFAULT_MIX})")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", type=Path, help="write results as a JSON baseline")
+    parser.add_argument("--compare", type=Path, help="baseline JSON to compare against; exits 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    mix = {k: int(v) for k, v in (part.split("=") for part in args.mix.split(","))}
+    emails = seed(args.users, args.sessions_per_user)
+
+    proc = None
+    base_url = args.base_url
+    if not base_url:
+        proc, base_url = boot_server(args.workers)
+    try:
+        endpoints, elapsed = asyncio.run(
+            drive(base_url, emails, mix, args.concurrency, args.duration, args.seed)
+        )
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(10)
+
+    result = {
+        "meta": {
+            "git_rev": _git_rev(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "elapsed_s": round(elapsed, 2),
+            "args": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+        },
+        "endpoints": endpoints,
+    }
+    print_table(endpoints)
+
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(result, indent=2) + "\n")
+        print(f"wrote {args.out}")
+
+    if args.compare:
+        problems = compare(result, json.loads(args.compare.read_text()), args.tolerance)
+        for p in problems:
+            print("REGRESSION", p)
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""add exercise catalog aliases and updated_at
+
+Revision ID: d72076fd55a3
+Revises: b2a80703edc2
+Create Date: 2026-10-17 21:02:44.471378
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# Starter catalog (user_id NULL): name, muscle group, aliases. Frozen here on
+# purpose; later catalog changes get their own migration.
+CATALOG = [
+    ("Bench Press", "chest", ["Barbell Bench Press", "Flat Bench", "BP"]),
+    ("Incline Bench Press", "chest", ["Incline Barbell Press", "Incline Bench"]),
+    ("Decline Bench Press", "chest", ["Decline Bench"]),
+    ("Dumbbell Bench Press", "chest", ["DB Bench Press", "DB Bench"]),
+    ("Incline Dumbbell Press", "chest", ["Incline DB Press"]),
+    ("Dumbbell Fly", "chest", ["DB Fly", "Chest Fly", "Flye"]),
+    ("Cable Crossover", "chest", ["Cable Fly"]),
+    ("Pec Deck", "chest", ["Machine Fly", "Butterfly"]),
+    ("Push-Up", "chest", ["Pushup", "Press-Up"]),
+    ("Dip", "chest", ["Chest Dip", "Parallel Bar Dip"]),
+    ("Deadlift", "back", ["Conventional Deadlift", "DL"]),
+    ("Sumo Deadlift", "back", ["Sumo DL"]),
+    ("Barbell Row", "back", ["Bent-Over Row", "BB Row", "Pendlay Row"]),
+    ("Dumbbell Row", "back", ["One-Arm Dumbbell Row", "DB Row"]),
+    ("Seated Cable Row", "back", ["Cable Row", "Low Row"]),
+    ("T-Bar Row", "back", ["Landmine Row"]),
+    ("Pull-Up", "back", ["Pullup", "Chin-Up", "Chinup"]),
+    ("Lat Pulldown", "back", ["Pulldown", "Lat Pull-Down"]),
+    ("Face Pull", "shoulders", ["Rope Face Pull"]),
+    ("Back Extension", "back", ["Hyperextension", "Roman Chair Extension"]),
+    ("Shrug", "back", ["Barbell Shrug", "Dumbbell Shrug"]),
+    ("Back Squat", "legs", ["Squat", "Barbell Squat", "High Bar Squat", "Low Bar Squat"]),
+    ("Front Squat", "legs", ["Barbell Front Squat"]),
+    ("Goblet Squat", "legs", ["Kettlebell Squat"]),
+    ("Leg Press", "legs", ["Sled Leg Press"]),
+    ("Hack Squat", "legs", ["Machine Hack Squat"]),
+    ("Bulgarian Split Squat", "legs", ["Rear-Foot Elevated Split Squat", "RFESS", "Split Squat"]),
+    ("Lunge", "legs", ["Walking Lunge", "Reverse Lunge"]),
+    ("Romanian Deadlift", "legs", ["RDL", "Stiff-Leg Deadlift"]),
+    ("Leg Extension", "legs", ["Quad Extension"]),
+    ("Leg Curl", "legs", ["Hamstring Curl", "Lying Leg Curl", "Seated Leg Curl"]),
+    ("Hip Thrust", "glutes", ["Barbell Hip Thrust", "Glute Bridge"]),
+    ("Cable Kickback", "glutes", ["Glute Kickback"]),
+    ("Hip Abduction", "glutes", ["Abductor Machine"]),
+    ("Hip Adduction", "legs", ["Adductor Machine"]),
+    ("Standing Calf Raise", "calves", ["Calf Raise"]),
+    ("Seated Calf Raise", "calves", ["Soleus Raise"]),
+    ("Overhead Press", "shoulders", ["OHP", "Military Press", "Standing Press", "Strict Press"]),
+    ("Seated Dumbbell Press", "shoulders", ["Dumbbell Shoulder Press", "DB Shoulder Press"]),
+    ("Arnold Press", "shoulders", []),
+    ("Push Press", "shoulders", []),
+    ("Lateral Raise", "shoulders", ["Side Raise", "Dumbbell Lateral Raise", "Lat Raise"]),
+    ("Front Raise", "shoulders", ["Dumbbell Front Raise"]),
+    ("Rear Delt Fly", "shoulders", ["Reverse Fly", "Rear Delt Raise"]),
+    ("Upright Row", "shoulders", []),
+    ("Barbell Curl", "arms", ["Bicep Curl", "Biceps Curl", "BB Curl"]),
+    ("Dumbbell Curl", "arms", ["DB Curl", "Alternating Curl"]),
+    ("Hammer Curl", "arms", ["Neutral Grip Curl"]),
+    ("Preacher Curl", "arms", ["Scott Curl"]),
+    ("Cable Curl", "arms", []),
+    ("Triceps Pushdown", "arms", ["Tricep Pushdown", "Rope Pushdown", "Cable Pushdown"]),
+    ("Skull Crusher", "arms", ["Lying Triceps Extension", "EZ-Bar Skull Crusher"]),
+    ("Overhead Triceps Extension", "arms", ["Overhead Tricep Extension", "French Press"]),
+    ("Close-Grip Bench Press", "arms", ["CGBP", "Close Grip Bench"]),
+    ("Wrist Curl", "arms", ["Forearm Curl"]),
+    ("Plank", "core", ["Front Plank"]),
+    ("Side Plank", "core", []),
+    ("Crunch", "core", ["Sit-Up", "Situp"]),
+    ("Cable Crunch", "core", ["Kneeling Cable Crunch"]),
+    ("Hanging Leg Raise", "core", ["Leg Raise", "Hanging Knee Raise"]),
+    ("Ab Wheel Rollout", "core", ["Ab Roller", "Rollout"]),
+    ("Russian Twist", "core", []),
+    ("Pallof Press", "core", ["Anti-Rotation Press"]),
+    ("Power Clean", "full body", ["Clean"]),
+    ("Clean and Jerk", "full body", ["C&J"]),
+    ("Snatch", "full body", ["Power Snatch"]),
+    ("Kettlebell Swing", "full body", ["KB Swing", "Russian Swing"]),
+    ("Farmer's Carry", "full body", ["Farmer Walk", "Farmers Walk", "Loaded Carry"]),
+    ("Burpee", "full body", []),
+    ("Thruster", "full body", ["Squat to Press"]),
+    ("Running", "cardio", ["Run", "Jog", "Treadmill"]),
+    ("Rowing Machine", "cardio", ["Row Erg", "Erg", "Rower"]),
+    ("Cycling", "cardio", ["Bike", "Stationary Bike", "Spin"]),
+    ("Jump Rope", "cardio", ["Skipping"]),
+    ("Stair Climber", "cardio", ["StairMaster", "Step Mill"]),
+]
+
+# revision identifiers, used by Alembic.
+revision: str = 'd72076fd55a3'
+down_revision: Union[str, Sequence[str], None] = 'b2a80703edc2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.add_column('exercises', sa.Column('aliases', postgresql.ARRAY(sa.String(length=100)), server_default='{}', nullable=False))
+    op.add_column('exercises', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    op.create_index(op.f('ix_exercises_updated_at'), 'exercises', ['updated_at'], unique=False)
+    # ### end Alembic commands ###
+
+    # seed the catalog; existing catalog rows with the same name only gain the aliases
+    exercises = sa.table(
+        'exercises',
+        sa.column('user_id', sa.Integer),
+        sa.column('name', sa.String),
+        sa.column('muscle_group', sa.String),
+        sa.column('aliases', postgresql.ARRAY(sa.String)),
+    )
+    stmt = postgresql.insert(exercises).values(
+        [{'user_id': None, 'name': n, 'muscle_group': g, 'aliases': a} for n, g, a in CATALOG]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[sa.text('coalesce(user_id, 0)'), sa.text('lower(name)')],
+        set_={'aliases': stmt.excluded.aliases},
+        where=exercises.c.aliases == sa.text("'{}'"),
+    )
+    op.execute(stmt)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # seeded catalog rows stay: logged sets may point at them
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_index(op.f('ix_exercises_updated_at'), table_name='exercises')
+    op.drop_column('exercises', 'updated_at')
+    op.drop_column('exercises', 'aliases')
+    # ### end Alembic commands ###
@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+
+from app.core.series import ewma
+
+
+def _ewma_loop(y, alpha):
+    out = [y[0]]
+    for v in y[1:]:
+        out.append(out[-1] + alpha * (v - out[-1]))
+    return np.array(out)
+
+
+@pytest.mark.parametrize("alpha", [0.5, 0.95, 1.0])
+def test_ewma_matches_recurrence(alpha):
+    y = np.random.default_rng(0).normal(80.0, 5.0, 2000)
+    got = ewma(y, alpha)
+    assert np.isfinite(got).all()
+    np.testing.assert_allclose(got, _ewma_loop(y, alpha), rtol=1e-9)
@@ -0,0 +1,77 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+
+from app.core.database import Base
+from app.core.sync import changes_since, reserve
+from app.models.log import IntakeLog, WeightLog
+from app.models.sync import SyncTombstone
+from app.models.user import User
+from app.models.workout import Workout, WorkoutSet
+
+
+@compiles(ARRAY, "sqlite")
+def _array_as_json(type_, compiler, **kw):
+    return "JSON"
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    tables = [User, WeightLog, IntakeLog, SyncTombstone, Workout, WorkoutSet]
+    Base.metadata.create_all(engine, tables=[m.__table__ for m in tables] + [Base.metadata.tables["exercises"]])
+    with Session(engine) as db:
+        yield db
+
+
+def _user_with_logs(db, n):
+    user = User(email="a@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    for i in range(n):
+        db.add(WeightLog(user_id=user.id, logged_on=date(2026, 1, 1) + timedelta(days=i), weight_kg=80.0,
+                         change_seq=reserve(db, user.id)))
+    db.flush()
+    return user.id
+
+
+def _pull_all(db, user_id, since, limit):
+    seqs, snapshot = [], None
+    for _ in range(20):
+        page = changes_since(db, user_id, since, limit, snapshot)
+        seqs += [c["seq"] for c in page["changes"]]
+        since, snapshot = page["cursor"], page.get("snapshot")
+        if not page["has_more"]:
+            return seqs, page
+    pytest.fail("sync never finished")
+
+
+def test_full_sync_pages_past_the_floor(db):
+    user_id = _user_with_logs(db, 10)
+    db.execute(update(User).where(User.id == user_id).values(sync_floor=8))
+
+    seqs, last = _pull_all(db, user_id, None, 3)
+    assert seqs == list(range(1, 11))
+    assert last["cursor"] == 10 and "snapshot" not in last
+
+
+def test_stale_cursor_still_resets(db):
+    user_id = _user_with_logs(db, 5)
+    db.execute(update(User).where(User.id == user_id).values(sync_floor=4))
+
+    page = changes_since(db, user_id, 2, 10)
+    assert page["reset"] and [c["seq"] for c in page["changes"]] == [1, 2, 3, 4, 5]
+
+
+def test_snapshot_restarts_when_the_floor_passes_its_start(db):
+    user_id = _user_with_logs(db, 6)
+    page = changes_since(db, user_id, None, 2)
+    assert page["snapshot"] == 6
+    db.execute(update(User).where(User.id == user_id).values(sync_floor=7))
+
+    page = changes_since(db, user_id, page["cursor"], 2, page["snapshot"])
+    assert page["reset"] and [c["seq"] for c in page["changes"]] == [1, 2]